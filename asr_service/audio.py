@@ -0,0 +1,89 @@
+import io
+import logging
+import subprocess
+import tempfile
+import wave
+from typing import Optional
+
+import numpy as np
+import whisper # from openai-whisper
+
+logger = logging.getLogger(__name__)
+
+SAMPLE_RATE = whisper.audio.SAMPLE_RATE # 16 kHz mono float32 is what every Whisper model expects
+
+
+class AudioDecodeError(Exception):
+    """Raised when uploaded bytes cannot be decoded into a waveform."""
+    pass
+
+
+def decode_audio(data: bytes) -> np.ndarray:
+    """
+    Decodes uploaded audio bytes into 16 kHz mono float32 PCM without touching the disk.
+    16-bit PCM WAV at 16 kHz is converted with NumPy alone; everything else is piped through ffmpeg.
+    """
+    audio = _decode_pcm16_wav(data)
+    if audio is not None:
+        return audio
+    return _decode_with_ffmpeg(data)
+
+
+def _decode_pcm16_wav(data: bytes) -> Optional[np.ndarray]:
+    """Fast path for the common 16-bit PCM WAV case; returns None when ffmpeg is needed."""
+    if data[:4] != b"RIFF" or data[8:12] != b"WAVE":
+        return None
+    try:
+        with wave.open(io.BytesIO(data), "rb") as wav:
+            if wav.getsampwidth() != 2 or wav.getframerate() != SAMPLE_RATE or wav.getcomptype() != "NONE":
+                return None
+            channels = wav.getnchannels()
+            frames = wav.readframes(wav.getnframes())
+    except (wave.Error, EOFError):
+        return None
+
+    pcm = np.frombuffer(frames, dtype="<i2")
+    if channels > 1:
+        pcm = pcm[: len(pcm) - len(pcm) % channels].reshape(-1, channels).mean(axis=1)
+    return pcm.astype(np.float32) / 32768.0
+
+
+def _ffmpeg_command(source: str) -> list:
+    return [
+        "ffmpeg", "-nostdin", "-threads", "0",
+        "-i", source,
+        "-f", "s16le", "-ac", "1", "-acodec", "pcm_s16le", "-ar", str(SAMPLE_RATE),
+        "-",
+    ]
+
+
+def _decode_with_ffmpeg(data: bytes) -> np.ndarray:
+    try:
+        out = subprocess.run(
+            _ffmpeg_command("pipe:0"), input=data, capture_output=True, check=True
+        ).stdout
+    except subprocess.CalledProcessError as e:
+        # Containers that keep their index at the end (e.g. some m4a/mp4) need a seekable input
+        logger.debug(f"ffmpeg could not decode from a pipe, retrying from a seekable file: {e.stderr.decode(errors='ignore')[-200:]}")
+        with tempfile.NamedTemporaryFile(prefix="asr_audio_") as tmp:
+            tmp.write(data)
+            tmp.flush()
+            try:
+                out = subprocess.run(
+                    _ffmpeg_command(tmp.name), capture_output=True, check=True
+                ).stdout
+            except subprocess.CalledProcessError as e_file:
+                raise AudioDecodeError(f"Failed to decode audio: {e_file.stderr.decode(errors='ignore')[-200:]}") from e_file
+
+    return np.frombuffer(out, dtype=np.int16).astype(np.float32) / 32768.0
+
+
+def duration_sec(audio: np.ndarray) -> float:
+    return len(audio) / SAMPLE_RATE
+
+
+def frame_energy(audio: np.ndarray, frame_len: int) -> np.ndarray:
+    """Mean power of consecutive non-overlapping frames; a trailing partial frame is dropped."""
+    n_frames = len(audio) // frame_len
+    frames = audio[: n_frames * frame_len].reshape(n_frames, frame_len)
+    return np.mean(np.square(frames, dtype=np.float32), axis=1)
@@ -0,0 +1,119 @@
+"""
+Compares the fp32 Whisper backend with the int8-quantized one on a fixed local audio set.
+
+    python benchmarks/int8_vs_fp32.py /data/asr_eval --model small --language en --threads 8
+
+The directory holds audio files (wav/mp3/flac/m4a/ogg) and, next to each, a `<name>.txt`
+reference transcript. For each backend it reports load time, resident weight size,
+real-time factor (processing time / audio duration, lower is better) and word error rate.
+Run it from the asr_service directory or any directory; the service modules are imported
+from the parent of this script.
+"""
+import argparse
+import os
+import re
+import sys
+import time
+from typing import Dict, List, Tuple
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import torch
+
+from audio import decode_audio, duration_sec
+from ml_models.whisper_asr import WhisperASR
+from ml_models.whisper_int8 import WhisperInt8ASR
+
+AUDIO_EXTENSIONS = (".wav", ".mp3", ".flac", ".m4a", ".ogg")
+BACKENDS = {"fp32": WhisperASR, "int8": WhisperInt8ASR}
+
+
+def normalize(text: str) -> List[str]:
+    return re.sub(r"[^\w\s']", " ", text.lower()).split()
+
+
+def word_errors(reference: List[str], hypothesis: List[str]) -> int:
+    """Word-level Levenshtein distance (substitutions + insertions + deletions)."""
+    previous = list(range(len(hypothesis) + 1))
+    for i, ref_word in enumerate(reference, 1):
+        current = [i]
+        for j, hyp_word in enumerate(hypothesis, 1):
+            current.append(min(
+                previous[j] + 1,
+                current[j - 1] + 1,
+                previous[j - 1] + (ref_word != hyp_word),
+            ))
+        previous = current
+    return previous[-1]
+
+
+def load_dataset(directory: str) -> List[Tuple[str, object, List[str]]]:
+    items = []
+    for name in sorted(os.listdir(directory)):
+        stem, ext = os.path.splitext(name)
+        reference_path = os.path.join(directory, stem + ".txt")
+        if ext.lower() not in AUDIO_EXTENSIONS or not os.path.exists(reference_path):
+            continue
+        with open(os.path.join(directory, name), "rb") as f:
+            audio = decode_audio(f.read())
+        with open(reference_path, encoding="utf-8") as f:
+            reference = normalize(f.read())
+        items.append((name, audio, reference))
+    if not items:
+        raise SystemExit(f"No audio files with .txt references found in {directory}.")
+    return items
+
+
+def run_backend(name: str, model_name: str, dataset, language: str) -> Dict[str, float]:
+    started = time.perf_counter()
+    model = BACKENDS[name]({"model_name": model_name, "device": "cpu", "workers": 1})
+    load_sec = time.perf_counter() - started
+
+    model.predict_sync(dataset[0][1][: 16000 * 5], language=language) # warm-up, not timed
+
+    audio_sec = processing_sec = 0.0
+    errors = reference_words = 0
+    for file_name, audio, reference in dataset:
+        started = time.perf_counter()
+        result = model.predict_sync(audio, language=language, task="transcribe")
+        elapsed = time.perf_counter() - started
+        file_errors = word_errors(reference, normalize(result["text"]))
+        print(f"  [{name}] {file_name}: rtf={elapsed / duration_sec(audio):.3f} wer={file_errors / max(1, len(reference)):.3f}")
+        audio_sec += duration_sec(audio)
+        processing_sec += elapsed
+        errors += file_errors
+        reference_words += len(reference)
+
+    return {
+        "load_sec": load_sec,
+        "size_mb": model.memory_bytes / 2**20,
+        "rtf": processing_sec / audio_sec,
+        "wer": errors / max(1, reference_words),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("audio_dir")
+    parser.add_argument("--model", default="small", help="Whisper checkpoint name (tiny, base, small, ...)")
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--threads", type=int, default=0, help="torch intra-op threads (0 = torch default)")
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    dataset = load_dataset(args.audio_dir)
+    print(f"{len(dataset)} files, {sum(duration_sec(a) for _, a, _ in dataset):.1f}s of audio, "
+          f"model '{args.model}', {torch.get_num_threads()} threads")
+
+    results = {name: run_backend(name, args.model, dataset, args.language) for name in BACKENDS}
+
+    print(f"\n{'backend':<8}{'load s':>9}{'size MB':>10}{'RTF':>9}{'WER':>9}{'speedup':>10}")
+    for name, r in results.items():
+        speedup = results["fp32"]["rtf"] / r["rtf"]
+        print(f"{name:<8}{r['load_sec']:>9.1f}{r['size_mb']:>10.0f}{r['rtf']:>9.3f}{r['wer']:>9.3f}{speedup:>9.2f}x")
+    print(f"\nWER change int8 vs fp32: {(results['int8']['wer'] - results['fp32']['wer']) * 100:+.2f} points")
+
+
+if __name__ == "__main__":
+    main()
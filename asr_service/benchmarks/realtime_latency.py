@@ -0,0 +1,92 @@
+"""
+Replays a WAV file to the /ws/transcribe endpoint at real-time speed and reports
+how long after the audio was sent each partial/final hypothesis arrived.
+
+    python benchmarks/realtime_latency.py speech.wav --url ws://localhost:8011/ws/transcribe --model whisper-small
+
+The WAV file must be 16 kHz mono 16-bit PCM (e.g. `ffmpeg -i in.mp3 -ar 16000 -ac 1 out.wav`).
+Latency of a message = arrival time - time the audio up to its `audio_end` was sent.
+"""
+import argparse
+import asyncio
+import json
+import statistics
+import time
+import wave
+from urllib.parse import urlencode
+
+import websockets # installed with uvicorn[standard]
+
+SAMPLE_RATE = 16000
+
+
+def read_pcm16(path: str) -> bytes:
+    with wave.open(path, "rb") as wav:
+        if wav.getframerate() != SAMPLE_RATE or wav.getnchannels() != 1 or wav.getsampwidth() != 2:
+            raise SystemExit("WAV must be 16 kHz mono 16-bit PCM.")
+        return wav.readframes(wav.getnframes())
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+async def run(args) -> None:
+    pcm = read_pcm16(args.wav)
+    frame_bytes = int(SAMPLE_RATE * args.frame_ms / 1000) * 2
+    query = urlencode({"model_identifier": args.model, "language": args.language, "task": "transcribe"})
+    started = None
+    latencies = {"partial": [], "final": []}
+    transcript = []
+
+    def sent_at(audio_sec: float) -> float:
+        # Frames are sent on a real-time schedule starting at `started`
+        return started + audio_sec
+
+    async with websockets.connect(f"{args.url}?{query}", max_size=None) as ws:
+        async def sender():
+            nonlocal started
+            started = time.monotonic()
+            for i, offset in enumerate(range(0, len(pcm), frame_bytes)):
+                await ws.send(pcm[offset:offset + frame_bytes])
+                next_frame_at = started + (i + 1) * args.frame_ms / 1000
+                await asyncio.sleep(max(0.0, next_frame_at - time.monotonic()))
+            await ws.send(json.dumps({"event": "end"}))
+
+        send_task = asyncio.create_task(sender())
+        async for raw in ws:
+            message = json.loads(raw)
+            if message["type"] in latencies:
+                latencies[message["type"]].append(time.monotonic() - sent_at(message["audio_end"]))
+                if message["type"] == "final":
+                    transcript.append(message["text"])
+            elif message["type"] == "done":
+                break
+            elif message["type"] == "error":
+                raise SystemExit(f"Server error: {message}")
+        await send_task
+
+    audio_sec = len(pcm) / 2 / SAMPLE_RATE
+    print(f"audio: {audio_sec:.1f}s, frame: {args.frame_ms} ms")
+    for kind, values in latencies.items():
+        if not values:
+            print(f"{kind:>8}: no messages")
+            continue
+        print(
+            f"{kind:>8}: n={len(values):4d}  p50={statistics.median(values) * 1000:7.0f} ms  "
+            f"p95={percentile(values, 0.95) * 1000:7.0f} ms  max={max(values) * 1000:7.0f} ms"
+        )
+    if args.show_text:
+        print(" ".join(transcript))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("wav")
+    parser.add_argument("--url", default="ws://localhost:8011/ws/transcribe")
+    parser.add_argument("--model", default="whisper-small")
+    parser.add_argument("--language", default="en")
+    parser.add_argument("--frame-ms", type=int, default=100)
+    parser.add_argument("--show-text", action="store_true")
+    asyncio.run(run(parser.parse_args()))
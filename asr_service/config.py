@@ -28,10 +28,68 @@ class ASRSettings(BaseSettings):
         "whisper-large": { 
             "type": "whisper",
             "model_name": "large-v3", # large, large-v2, large-v3
-        }
+        },
+        # int8-quantized variants for CPU nodes (see benchmarks/int8_vs_fp32.py)
+        "whisper-base-int8": {
+            "type": "whisper-int8",
+            "model_name": "base",
+        },
+        "whisper-small-int8": {
+            "type": "whisper-int8",
+            "model_name": "small",
+        },
+        "whisper-medium-int8": {
+            "type": "whisper-int8",
+            "model_name": "medium",
+        },
     }
     DEFAULT_DEVICE: str = os.getenv("DEFAULT_DEVICE", "cuda" if torch.cuda.is_available() else "cpu")
 
+    # Inference executor: a model config may override the worker count with a "workers" key
+    INFERENCE_WORKERS: int = int(os.getenv("INFERENCE_WORKERS", 1))
+    INFERENCE_QUEUE_SIZE: int = int(os.getenv("INFERENCE_QUEUE_SIZE", 8)) # waiting requests per model before 429
+    INFERENCE_RETRY_AFTER_SEC: int = int(os.getenv("INFERENCE_RETRY_AFTER_SEC", 5))
+
+    # Resident model budget (weights of all loaded models); least recently used idle models are evicted. 0 = unlimited
+    MODEL_MEMORY_BUDGET_MB: int = int(os.getenv("MODEL_MEMORY_BUDGET_MB", 0))
+
+    # Long-form mode: audio from LONGFORM_MIN_AUDIO_SEC up is split at quiet points and chunks run in parallel
+    LONGFORM_MIN_AUDIO_SEC: float = float(os.getenv("LONGFORM_MIN_AUDIO_SEC", 600))
+    LONGFORM_CHUNK_SEC: float = float(os.getenv("LONGFORM_CHUNK_SEC", 120))
+    LONGFORM_OVERLAP_SEC: float = float(os.getenv("LONGFORM_OVERLAP_SEC", 2))
+    LONGFORM_SPLIT_SEARCH_SEC: float = float(os.getenv("LONGFORM_SPLIT_SEARCH_SEC", 10)) # how far to look for silence
+
+    # Streaming endpoint: audio is decoded window by window and segments are sent as each window finishes
+    STREAM_CHUNK_SEC: float = float(os.getenv("STREAM_CHUNK_SEC", 30))
+    STREAM_SPLIT_SEARCH_SEC: float = float(os.getenv("STREAM_SPLIT_SEARCH_SEC", 5))
+
+    # Real-time WebSocket sessions
+    REALTIME_MAX_SESSIONS: int = int(os.getenv("REALTIME_MAX_SESSIONS", 16))
+    REALTIME_STEP_SEC: float = float(os.getenv("REALTIME_STEP_SEC", 0.5)) # new audio needed before re-decoding
+    REALTIME_MIN_DECODE_SEC: float = float(os.getenv("REALTIME_MIN_DECODE_SEC", 1.0))
+    REALTIME_MAX_BUFFER_SEC: float = float(os.getenv("REALTIME_MAX_BUFFER_SEC", 15)) # uncommitted audio before a forced commit
+
+    # Voice activity detection pre-pass (energy + spectral flatness, NumPy only)
+    VAD_ENABLED: bool = os.getenv("VAD_ENABLED", "false").lower() == "true" # default when the request doesn't say
+    VAD_ENERGY_MARGIN_DB: float = float(os.getenv("VAD_ENERGY_MARGIN_DB", 12)) # above the recording's noise floor
+    VAD_MAX_FLATNESS: float = float(os.getenv("VAD_MAX_FLATNESS", 0.5))
+    VAD_MIN_SPEECH_MS: int = int(os.getenv("VAD_MIN_SPEECH_MS", 250))
+    VAD_MIN_SILENCE_MS: int = int(os.getenv("VAD_MIN_SILENCE_MS", 600)) # shorter pauses stay in
+    VAD_PAD_MS: int = int(os.getenv("VAD_PAD_MS", 200))
+
+    # Transcription result cache keyed by audio hash + model/language/task
+    RESULT_CACHE_ENABLED: bool = os.getenv("RESULT_CACHE_ENABLED", "true").lower() == "true"
+    RESULT_CACHE_MAX_ENTRIES: int = int(os.getenv("RESULT_CACHE_MAX_ENTRIES", 1024)) # in-memory LRU tier
+    RESULT_CACHE_DIR: str = os.getenv("RESULT_CACHE_DIR", "") # empty disables the on-disk tier
+    RESULT_CACHE_DISK_MAX_MB: int = int(os.getenv("RESULT_CACHE_DISK_MAX_MB", 1024))
+    RESULT_CACHE_TTL_SEC: int = int(os.getenv("RESULT_CACHE_TTL_SEC", 7 * 24 * 3600))
+
+    # Micro-batching of short clips for the same model/language/task
+    BATCHING_ENABLED: bool = os.getenv("BATCHING_ENABLED", "true").lower() == "true"
+    BATCH_MAX_SIZE: int = int(os.getenv("BATCH_MAX_SIZE", 8))
+    BATCH_MAX_WAIT_MS: int = int(os.getenv("BATCH_MAX_WAIT_MS", 10))
+    BATCH_MAX_AUDIO_SEC: float = float(os.getenv("BATCH_MAX_AUDIO_SEC", 15)) # must fit one 30 s Whisper window
+
     class Config:
         env_file = ".env.asr"
         env_file_encoding = 'utf-8'
@@ -9,6 +9,8 @@ class ASRResponse(BaseModel):
     transcribed_text: str
     language_detected: Optional[str] = None
     segments: Optional[List[Dict[str, Any]]] = Field(None, description="List of transcribed segments with timestamps.")
+    audio_duration_sec: Optional[float] = Field(None, description="Duration of the uploaded audio.")
+    skipped_audio_sec: Optional[float] = Field(None, description="Audio skipped as silence by the VAD pre-pass.")
     processed_at: datetime.datetime 
     status: str = "success"
     message: str = "Transcription successful."
@@ -24,5 +26,6 @@ class ErrorResponse(BaseModel):
 
 class ASRModelCreate(BaseModel):
     name: str = Field(..., example="whisper-tiny")
-    type: str = "whisper"
+    type: str = Field("whisper", description="'whisper' or 'whisper-int8' (CPU, int8-quantized).")
     model_name: str = "tiny"
+    workers: Optional[int] = Field(None, ge=1, description="Inference workers for this model. Defaults to INFERENCE_WORKERS.")
@@ -10,6 +10,7 @@ sys.path.append('/home/orange_lime/ITMO_projects/ml_billing_service/')
 
 from router import router as asr_router
 from config import asr_settings # Import settings
+from ml_models.model_registry import model_registry
 
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
 logger = logging.getLogger(__name__)
@@ -22,6 +23,7 @@ async def lifespan(app: FastAPI):
     # Models are loaded lazily by the registry on first request
     yield
     logger.info("ASR service shutting down...")
+    model_registry.shutdown()
 
 app = FastAPI(
     title="ASR",
@@ -1,13 +1,41 @@
 import abc
-from typing import Any, Dict 
+import asyncio
+from typing import Any, Callable, Dict, Optional, Union
+
+import numpy as np
+
+from ml_models.executor import InferenceExecutor
 
 class AbstractMLModel(abc.ABC):
     """Abstract base class for ML models in the ASR service."""
+
+    # Attached by the ModelRegistry; None means "use the default asyncio thread pool".
+    executor: Optional[InferenceExecutor] = None
+
+    @property
+    def memory_bytes(self) -> int:
+        """Approximate resident size of the model's weights, used for the registry's memory budget."""
+        return 0
+
+    def unload(self) -> None:
+        """Releases the model's weights. Called by the registry when the model is evicted."""
+        pass
+
+    async def run_inference(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Runs a blocking call on the model's inference executor so the event loop stays free."""
+        if self.executor is None:
+            return await asyncio.to_thread(fn, *args, **kwargs)
+        return await self.executor.submit(fn, *args, **kwargs)
+
+    async def predict(self, audio: Union[str, np.ndarray], **kwargs: Any) -> Dict[str, Any]:
+        """Performs inference on the given audio without blocking the event loop."""
+        return await self.run_inference(self.predict_sync, audio, **kwargs)
+
     @abc.abstractmethod
-    async def predict(self, audio_file_path: str, **kwargs: Any) -> Dict[str, Any]:
+    def predict_sync(self, audio: Union[str, np.ndarray], **kwargs: Any) -> Dict[str, Any]:
         """
-        Performs inference on the given audio file.
+        Blocking inference on an audio file path or a 16 kHz mono float32 waveform.
         kwargs can include language, task, etc.
         Should return a dictionary, e.g., {"text": "...", "language": "en", "segments": [...]}
         """
-        raise NotImplementedError
\ No newline at end of file
+        raise NotImplementedError
@@ -0,0 +1,103 @@
+import asyncio
+import logging
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from ml_models.base import AbstractMLModel
+from config import asr_settings
+from audio import SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+BatchKey = Tuple[str, Optional[str], str] # (model_identifier, language, task)
+
+
+class BatchScheduler:
+    """
+    Dynamic micro-batching for short clips.
+    Requests for the same model/language/task are collected for up to `max_wait_ms`
+    (or until `max_batch_size` clips are waiting) and run through the model's
+    `predict_batch_sync` as one job on its inference executor.
+    """
+
+    def __init__(self, max_batch_size: int, max_wait_ms: int, max_audio_sec: float, enabled: bool = True):
+        self.enabled = enabled and max_batch_size > 1
+        self.max_batch_size = max_batch_size
+        self.max_wait_sec = max_wait_ms / 1000
+        self.max_audio_samples = int(max_audio_sec * SAMPLE_RATE)
+        self._pending: Dict[BatchKey, List[Tuple[np.ndarray, asyncio.Future]]] = {}
+        self._timers: Dict[BatchKey, asyncio.TimerHandle] = {}
+        self._running: Set[asyncio.Task] = set()
+
+    def accepts(self, model: AbstractMLModel, audio: Any) -> bool:
+        return (
+            self.enabled
+            and hasattr(model, "predict_batch_sync")
+            and isinstance(audio, np.ndarray)
+            and len(audio) <= self.max_audio_samples
+        )
+
+    async def submit(
+        self,
+        model_identifier: str,
+        model: AbstractMLModel,
+        audio: np.ndarray,
+        language: Optional[str],
+        task: str,
+    ) -> Dict[str, Any]:
+        loop = asyncio.get_running_loop()
+        key = (model_identifier, language, task)
+        future = loop.create_future()
+
+        pending = self._pending.setdefault(key, [])
+        pending.append((audio, future))
+        if len(pending) >= self.max_batch_size:
+            self._flush(key, model)
+        elif len(pending) == 1:
+            self._timers[key] = loop.call_later(self.max_wait_sec, self._flush, key, model)
+
+        return await future
+
+    def _flush(self, key: BatchKey, model: AbstractMLModel) -> None:
+        timer = self._timers.pop(key, None)
+        if timer is not None:
+            timer.cancel()
+        batch = self._pending.pop(key, [])
+        if not batch:
+            return
+        task = asyncio.get_running_loop().create_task(self._run_batch(key, model, batch))
+        self._running.add(task)
+        task.add_done_callback(self._running.discard)
+
+    async def _run_batch(
+        self, key: BatchKey, model: AbstractMLModel, batch: List[Tuple[np.ndarray, asyncio.Future]]
+    ) -> None:
+        # Requests cancelled while waiting for the batch window don't need decoding
+        batch = [(audio, future) for audio, future in batch if not future.done()]
+        if not batch:
+            return
+
+        model_identifier, language, task = key
+        logger.debug(f"Running batch of {len(batch)} clips for '{model_identifier}' (lang: {language}, task: {task})")
+        try:
+            results = await model.run_inference(
+                model.predict_batch_sync, [audio for audio, _ in batch], language=language, task=task
+            )
+        except Exception as e:
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        for (_, future), result in zip(batch, results):
+            if not future.done():
+                future.set_result(result)
+
+
+batch_scheduler = BatchScheduler(
+    max_batch_size=asr_settings.BATCH_MAX_SIZE,
+    max_wait_ms=asr_settings.BATCH_MAX_WAIT_MS,
+    max_audio_sec=asr_settings.BATCH_MAX_AUDIO_SEC,
+    enabled=asr_settings.BATCHING_ENABLED,
+)
@@ -0,0 +1,91 @@
+import asyncio
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict
+
+logger = logging.getLogger(__name__)
+
+
+class InferenceQueueFullError(Exception):
+    """Raised when a model's inference queue has no free slots left."""
+
+    def __init__(self, model_identifier: str, retry_after: int):
+        super().__init__(f"Inference queue for '{model_identifier}' is full.")
+        self.model_identifier = model_identifier
+        self.retry_after = retry_after
+
+
+class InferenceExecutor:
+    """
+    Bounded worker pool that runs blocking model inference off the event loop.
+    At most `workers` jobs run at once and at most `queue_size` more wait for a worker;
+    anything beyond that is rejected with InferenceQueueFullError instead of piling up.
+    """
+
+    def __init__(self, name: str, workers: int = 1, queue_size: int = 8, retry_after: int = 5):
+        self.name = name
+        self.workers = max(1, workers)
+        self.queue_size = max(0, queue_size)
+        self.retry_after = retry_after
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix=f"asr-{name}")
+        self._lock = threading.Lock()
+        self._pending = 0  # queued + running jobs, released when the worker really finishes
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+
+    @property
+    def capacity(self) -> int:
+        return self.workers + self.queue_size
+
+    @property
+    def is_busy(self) -> bool:
+        return self._pending > 0
+
+    async def submit(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        """Runs `fn` on a worker thread, or raises InferenceQueueFullError if the queue is full."""
+        with self._lock:
+            if self._pending >= self.capacity:
+                self._rejected += 1
+                logger.warning(f"Inference queue for '{self.name}' is full ({self._pending}/{self.capacity}).")
+                raise InferenceQueueFullError(self.name, self.retry_after)
+            self._pending += 1
+
+        try:
+            future = self._pool.submit(self._run, fn, *args, **kwargs)
+        except Exception:
+            self._release()
+            raise
+        # The slot is freed when the worker is done, not when the caller stops waiting:
+        # a cancelled request must not let new work in while its job still occupies a thread.
+        future.add_done_callback(lambda _: self._release())
+        return await asyncio.wrap_future(future)
+
+    def _run(self, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Any:
+        with self._lock:
+            self._running += 1
+        try:
+            return fn(*args, **kwargs)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+
+    def _release(self) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "workers": self.workers,
+                "queue_size": self.queue_size,
+                "running": self._running,
+                "queued": self._pending - self._running,
+                "completed": self._completed,
+                "rejected": self._rejected,
+            }
+
+    def shutdown(self, wait: bool = False) -> None:
+        self._pool.shutdown(wait=wait, cancel_futures=True)
@@ -0,0 +1,121 @@
+import asyncio
+import logging
+from collections import Counter
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from ml_models.base import AbstractMLModel
+from config import asr_settings
+from audio import SAMPLE_RATE, frame_energy
+
+logger = logging.getLogger(__name__)
+
+SPLIT_FRAME_LEN = int(0.03 * SAMPLE_RATE) # 30 ms frames when looking for a quiet split point
+
+
+@dataclass
+class AudioChunk:
+    """A window of the original audio, in samples. Only segments centred in [own_start, own_end) are kept."""
+    start: int
+    end: int
+    own_start: int
+    own_end: int
+
+
+def split_audio(
+    audio: np.ndarray, chunk_sec: float, overlap_sec: float, search_sec: float
+) -> List[AudioChunk]:
+    """
+    Splits audio roughly every `chunk_sec` at the quietest 30 ms frame within `search_sec`
+    of the target point, and pads each window with `overlap_sec` of context on both sides.
+    """
+    chunk_len = int(chunk_sec * SAMPLE_RATE)
+    if len(audio) <= chunk_len:
+        return [AudioChunk(0, len(audio), 0, len(audio))]
+
+    energy = frame_energy(audio, SPLIT_FRAME_LEN)
+    search_frames = max(1, int(search_sec * SAMPLE_RATE) // SPLIT_FRAME_LEN)
+    splits = [0]
+    target = chunk_len
+    while len(audio) - target > chunk_len // 4: # don't leave a tiny tail chunk
+        centre = target // SPLIT_FRAME_LEN
+        lo = max(splits[-1] // SPLIT_FRAME_LEN + 1, centre - search_frames)
+        hi = min(len(energy), centre + search_frames + 1)
+        split = (lo + int(np.argmin(energy[lo:hi]))) * SPLIT_FRAME_LEN if lo < hi else target
+        splits.append(split)
+        target = split + chunk_len
+    splits.append(len(audio))
+
+    overlap = int(overlap_sec * SAMPLE_RATE)
+    return [
+        AudioChunk(
+            start=max(0, own_start - overlap),
+            end=min(len(audio), own_end + overlap),
+            own_start=own_start,
+            own_end=own_end,
+        )
+        for own_start, own_end in zip(splits, splits[1:])
+    ]
+
+
+def merge_chunk_results(chunks: List[AudioChunk], results: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Shifts chunk segment timestamps onto the original timeline and keeps each segment
+    only in the chunk that owns its midpoint, so text in the overlaps appears once.
+    """
+    segments: List[Dict[str, Any]] = []
+    for chunk, result in zip(chunks, results):
+        offset = chunk.start / SAMPLE_RATE
+        own_start, own_end = chunk.own_start / SAMPLE_RATE, chunk.own_end / SAMPLE_RATE
+        for segment in result.get("segments") or []:
+            start, end = segment["start"] + offset, segment["end"] + offset
+            if not own_start <= (start + end) / 2 < own_end:
+                continue
+            segments.append({
+                **segment,
+                "id": len(segments),
+                "seek": segment.get("seek", 0) + int(offset * 100), # in 10 ms mel frames, like Whisper
+                "start": round(start, 3),
+                "end": round(end, 3),
+            })
+
+    languages = Counter(r.get("language_detected") for r in results if r.get("language_detected"))
+    return {
+        "text": "".join(segment["text"] for segment in segments),
+        "language_detected": languages.most_common(1)[0][0] if languages else None,
+        "segments": segments,
+    }
+
+
+async def transcribe_longform(
+    model: AbstractMLModel, audio: np.ndarray, language: Optional[str], task: str
+) -> Dict[str, Any]:
+    """Transcribes overlapping chunks concurrently on the model's workers and merges the segments."""
+    chunks = split_audio(
+        audio,
+        chunk_sec=asr_settings.LONGFORM_CHUNK_SEC,
+        overlap_sec=asr_settings.LONGFORM_OVERLAP_SEC,
+        search_sec=asr_settings.LONGFORM_SPLIT_SEARCH_SEC,
+    )
+    # One request keeps at most one chunk per worker in flight, leaving queue slots to other requests
+    workers = model.executor.workers if model.executor is not None else 1
+    limiter = asyncio.Semaphore(workers)
+    logger.info(f"Long-form transcription: {len(chunks)} chunks on {workers} workers.")
+
+    async def transcribe_chunk(chunk: AudioChunk) -> Dict[str, Any]:
+        async with limiter:
+            return await model.predict(audio[chunk.start:chunk.end], language=language, task=task)
+
+    tasks = [asyncio.create_task(transcribe_chunk(chunk)) for chunk in chunks]
+    try:
+        results = await asyncio.gather(*tasks)
+    except BaseException:
+        # One chunk failed (or the request went away): the rest would only keep the workers busy.
+        # Done by hand because the ASR image runs Python 3.10, which has no TaskGroup.
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        raise
+    return merge_chunk_results(chunks, results)
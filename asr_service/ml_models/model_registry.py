@@ -1,8 +1,13 @@
-from typing import Dict, Type, Any
+from collections import OrderedDict
+from contextlib import asynccontextmanager
+from typing import AsyncIterator, Dict, Type, Any, Optional
+import asyncio
 import logging
 
 from ml_models.base import AbstractMLModel
+from ml_models.executor import InferenceExecutor
 from ml_models.whisper_asr import WhisperASR
+from ml_models.whisper_int8 import WhisperInt8ASR
 
 from config import asr_settings
 from contracts import ASRModelCreate
@@ -11,82 +16,188 @@ from contracts import ASRModelCreate
 logger = logging.getLogger(__name__)
 
 class ModelRegistry:
-    def __init__(self):
+    """
+    Loads ASR models on demand and keeps them resident within MODEL_MEMORY_BUDGET_MB.
+    Models are evicted least-recently-used first; a model pinned by `use_model`
+    (i.e. with requests queued or running) is never evicted.
+    Concurrent first requests for the same identifier share a single load.
+    """
+
+    def __init__(self, memory_budget_bytes: int = 0):
         self._model_type_map: Dict[str, Type[AbstractMLModel]] = {
             "whisper": WhisperASR,
+            "whisper-int8": WhisperInt8ASR, # dynamic int8 quantization, CPU only
         }
-        self._loaded_models: Dict[str, AbstractMLModel] = {}
+        self.memory_budget_bytes = memory_budget_bytes # 0 disables eviction
+        self._loaded_models: "OrderedDict[str, AbstractMLModel]" = OrderedDict() # LRU order, oldest first
+        self._loading: Dict[str, asyncio.Future] = {}
+        self._in_use: Dict[str, int] = {}
+        self._added_model_configs: Dict[str, Dict[str, Any]] = {}
+        self._known_sizes: Dict[str, int] = {} # sizes of models loaded before, to make room up front
         logger.info("ASR ModelRegistry initialized.")
         # logger.info(f"Available ASR model types: {list(self._model_type_map.keys())}")
         # logger.info(f"Configured ASR models from settings: {list(asr_settings.MODEL_CONFIGS.keys())}")
 
 
     async def add_model(self, model_params: ASRModelCreate) -> AbstractMLModel:
-        if model_params.name in self._loaded_models:
-            logger.debug(f"ASR model already exist. Use model from cache: {model_params.name}")
-            return self._loaded_models[model_params.name]
-        
-        logger.info(f"Load ASR model: {model_params.name}")
-        # TODO: create model_class: AbstractMLModel instead of using config
-        model_class = self._model_type_map.get(model_params.type)
+        model_config = {"type": model_params.type, "model_name": model_params.model_name}
+        if model_params.workers is not None:
+            model_config["workers"] = model_params.workers
+        # Remembered so the model can be reloaded after it has been evicted
+        self._added_model_configs[model_params.name] = model_config
+        return await self.get_model(model_params.name)
+
+
+    async def get_model(self, model_identifier: str) -> AbstractMLModel:
+        if model_identifier in self._loaded_models:
+            logger.debug(f"Using cached ASR model: {model_identifier}")
+            self._loaded_models.move_to_end(model_identifier)
+            return self._loaded_models[model_identifier]
+
+        model_config = (
+            self._added_model_configs.get(model_identifier)
+            or asr_settings.MODEL_CONFIGS.get(model_identifier)
+        )
+        if not model_config:
+            logger.error(f"ASR model identifier '{model_identifier}' not found in config.")
+            raise ValueError(f"Unknown ASR model identifier: {model_identifier}")
+
+        config_params = dict(model_config.get("config_params", {}))
+        if "workers" in model_config:
+            config_params["workers"] = model_config["workers"]
+        return await self._get_or_load(
+            model_identifier,
+            model_config.get("type"),
+            model_config.get("model_name"),
+            config_params,
+        )
+
+
+    @asynccontextmanager
+    async def use_model(self, model_identifier: str) -> AsyncIterator[AbstractMLModel]:
+        """Returns a loaded model pinned against eviction until the block exits."""
+        self._in_use[model_identifier] = self._in_use.get(model_identifier, 0) + 1
+        try:
+            yield await self.get_model(model_identifier)
+        finally:
+            self._in_use[model_identifier] -= 1
+            if not self._in_use[model_identifier]:
+                del self._in_use[model_identifier]
+
+
+    async def _get_or_load(
+        self,
+        model_identifier: str,
+        model_type: Optional[str],
+        model_name: Optional[str],
+        config_params: Dict[str, Any],
+    ) -> AbstractMLModel:
+        """Single-flight load: concurrent callers for one identifier await the same load."""
+        loading = self._loading.get(model_identifier)
+        if loading is None:
+            logger.info(f"Load ASR model: {model_identifier}")
+            loading = asyncio.ensure_future(
+                self._create_model(model_identifier, model_type, model_name, config_params)
+            )
+            self._loading[model_identifier] = loading
+            loading.add_done_callback(lambda _: self._loading.pop(model_identifier, None))
+        else:
+            logger.debug(f"ASR model '{model_identifier}' is already loading, waiting for it.")
+        # Shielded so that one cancelled request does not abort the load for everyone else
+        return await asyncio.shield(loading)
+
+
+    async def _create_model(
+        self,
+        model_identifier: str,
+        model_type: Optional[str],
+        model_name: Optional[str],
+        config_params: Dict[str, Any],
+    ) -> AbstractMLModel:
+        """Instantiates a model off the event loop, attaches its inference executor and caches it."""
+        model_class = self._model_type_map.get(model_type)
 
         if not model_class:
-            logger.error(f"Unknown ASR model type '{model_params.type}' for {model_params.name}.")
-            raise ValueError(f"Unknown ASR model type: {model_params.type}")
+            logger.error(f"Unknown ASR model type '{model_type}' for {model_identifier}.")
+            raise ValueError(f"Unknown ASR model type: {model_type}")
+
+        self._evict(required_bytes=self._known_sizes.get(model_identifier, 0))
 
         try:
             instance_config = {
-                "model_name": model_params.model_name,
+                "model_name": model_name,
+                **config_params
             }
             if "device" not in instance_config: # ensure device is passed if not in config_params
                 instance_config["device"] = asr_settings.DEFAULT_DEVICE
-
-            model_instance = model_class(config=instance_config) 
-            self._loaded_models[model_params.name] = model_instance
-            logger.info(f"ASR model '{model_params.model_name}' loaded and cached.")
-
+            instance_config.setdefault("workers", asr_settings.INFERENCE_WORKERS)
+
+            model_instance = await asyncio.to_thread(model_class, config=instance_config)
+            model_instance.executor = InferenceExecutor(
+                name=model_identifier,
+                workers=instance_config["workers"],
+                queue_size=asr_settings.INFERENCE_QUEUE_SIZE,
+                retry_after=asr_settings.INFERENCE_RETRY_AFTER_SEC,
+            )
         except Exception as e:
-            logger.exception(f"Error loading ASR model '{model_params.name}'")
-            raise RuntimeError(f"Failed to load ASR model '{model_params.name}'.") from e
-
+            logger.exception(f"Error loading ASR model '{model_identifier}'")
+            raise RuntimeError(f"Failed to load ASR model '{model_identifier}'.") from e
+
+        self._known_sizes[model_identifier] = model_instance.memory_bytes
+        self._loaded_models[model_identifier] = model_instance
+        logger.info(
+            f"ASR model '{model_identifier}' loaded and cached "
+            f"({model_instance.memory_bytes / 2**20:.0f} MB, resident total {self.resident_bytes / 2**20:.0f} MB)."
+        )
+        self._evict(keep=model_identifier)
+        return model_instance
+
+
+    @property
+    def resident_bytes(self) -> int:
+        return sum(model.memory_bytes for model in self._loaded_models.values())
+
+
+    def _is_pinned(self, model_identifier: str) -> bool:
+        model = self._loaded_models[model_identifier]
+        return self._in_use.get(model_identifier, 0) > 0 or (model.executor is not None and model.executor.is_busy)
+
+
+    def _evict(self, required_bytes: int = 0, keep: Optional[str] = None) -> None:
+        """Evicts idle models, least recently used first, until the budget fits `required_bytes` more."""
+        if not self.memory_budget_bytes:
+            return
+        for model_identifier in list(self._loaded_models):
+            if self.resident_bytes + required_bytes <= self.memory_budget_bytes:
+                return
+            if model_identifier == keep or self._is_pinned(model_identifier):
+                continue
+            model = self._loaded_models.pop(model_identifier)
+            if model.executor is not None:
+                model.executor.shutdown()
+            model.unload()
+            logger.info(f"Evicted ASR model '{model_identifier}' to stay within the memory budget.")
+
+        if self.resident_bytes + required_bytes > self.memory_budget_bytes:
+            logger.warning(
+                f"ASR models use {self.resident_bytes / 2**20:.0f} MB (+{required_bytes / 2**20:.0f} MB requested), "
+                f"over the {self.memory_budget_bytes / 2**20:.0f} MB budget; remaining models are in use."
+            )
+
+    def stats(self) -> Dict[str, Dict[str, Any]]:
+        """Inference executor statistics and resident size per loaded model."""
+        return {
+            identifier: {
+                **(model.executor.stats() if model.executor is not None else {}),
+                "memory_mb": round(model.memory_bytes / 2**20, 1),
+                "in_use": self._in_use.get(identifier, 0),
+            }
+            for identifier, model in self._loaded_models.items()
+        }
 
-    async def get_model(self, model_identifier: str) -> AbstractMLModel:
-        if model_identifier in self._loaded_models:
-            logger.debug(f"Using cached ASR model: {model_identifier}")
-            return self._loaded_models[model_identifier]
-        else:
-            # logger.error(f"ASR model identifier '{model_identifier}' not found.")
-            # raise ValueError(f"Unknown ASR model identifier: {model_identifier}")
+    def shutdown(self) -> None:
+        for model in self._loaded_models.values():
+            if model.executor is not None:
+                model.executor.shutdown()
 
-            logger.info(f"Load ASR model: {model_identifier}")
-            model_config_from_settings = asr_settings.MODEL_CONFIGS.get(model_identifier)
-
-            if not model_config_from_settings:
-                logger.error(f"ASR model identifier '{model_identifier}' not found in config.")
-                raise ValueError(f"Unknown ASR model identifier: {model_identifier}")
-
-            model_type = model_config_from_settings.get("type")
-            model_class = self._model_type_map.get(model_type)
-
-            if not model_class:
-                logger.error(f"Unknown ASR model type '{model_type}' for {model_identifier}.")
-                raise ValueError(f"Unknown ASR model type: {model_type}")
-
-            # TODO: use add method
-            try:
-                instance_config = {
-                    "model_name": model_config_from_settings.get("model_name"),
-                    **model_config_from_settings.get("config_params", {})
-                }
-                if "device" not in instance_config:
-                    instance_config["device"] = asr_settings.DEFAULT_DEVICE
-
-                model_instance = model_class(config=instance_config)
-                self._loaded_models[model_identifier] = model_instance
-                logger.info(f"ASR model '{model_identifier}' loaded and cached.")
-                return model_instance
-            except Exception as e:
-                logger.exception(f"Error loading ASR model '{model_identifier}'")
-                raise RuntimeError(f"Failed to load ASR model '{model_identifier}'.") from e
-
-model_registry = ModelRegistry()
\ No newline at end of file
+model_registry = ModelRegistry(memory_budget_bytes=asr_settings.MODEL_MEMORY_BUDGET_MB * 2**20)
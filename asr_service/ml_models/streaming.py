@@ -0,0 +1,53 @@
+import logging
+from typing import Any, AsyncIterator, Dict, Optional
+
+import numpy as np
+
+from ml_models.base import AbstractMLModel
+from ml_models.longform import split_audio
+from config import asr_settings
+from audio import SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+PROMPT_CHARS = 200 # tail of the previous window passed as initial_prompt for continuity
+
+
+async def iter_transcription(
+    model: AbstractMLModel, audio: np.ndarray, language: Optional[str], task: str
+) -> AsyncIterator[Dict[str, Any]]:
+    """
+    Transcribes audio window by window (split at quiet points) and yields each window's
+    result as soon as it is decoded, with segment timestamps on the original timeline.
+    Closing the iterator stops before the next window is submitted.
+    """
+    chunks = split_audio(
+        audio,
+        chunk_sec=asr_settings.STREAM_CHUNK_SEC,
+        overlap_sec=0,
+        search_sec=asr_settings.STREAM_SPLIT_SEARCH_SEC,
+    )
+    prompt: Optional[str] = None
+    segment_id = 0
+    for chunk in chunks:
+        result = await model.predict(
+            audio[chunk.start:chunk.end], language=language, task=task, initial_prompt=prompt
+        )
+        # Keep the first detected language for the remaining windows, like a single Whisper pass does
+        language = language or result.get("language_detected")
+
+        offset = chunk.start / SAMPLE_RATE
+        segments = []
+        for segment in result.get("segments") or []:
+            segments.append({
+                **segment,
+                "id": segment_id,
+                "seek": segment.get("seek", 0) + int(offset * 100),
+                "start": round(segment["start"] + offset, 3),
+                "end": round(segment["end"] + offset, 3),
+            })
+            segment_id += 1
+
+        text = result.get("text", "")
+        prompt = text[-PROMPT_CHARS:] or None
+        yield {"text": text, "language_detected": result.get("language_detected"), "segments": segments}
@@ -1,11 +1,17 @@
 import whisper # from openai-whisper
 import torch
+import gc
 import logging
 import os
-from typing import Any, Dict, Optional
+import queue
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Union
+
+import numpy as np
 
 from ml_models.base import AbstractMLModel # Corrected import
 from config import asr_settings
+from audio import duration_sec
 
 logger = logging.getLogger(__name__)
 
@@ -15,48 +21,97 @@ class WhisperASR(AbstractMLModel):
     def __init__(self, config: Dict[str, Any]):
         self.model_name = config.get("model_name", "base")
         self.device = config.get("device", asr_settings.DEFAULT_DEVICE)
+        # Whisper installs kv-cache hooks on the model for every decode, so one instance
+        # must not be used by two threads at once: each inference worker gets its own replica.
+        self.replicas = max(1, int(config.get("workers", 1)))
         self.model_download_root = asr_settings.MODEL_CACHE_DIRECTORY
         try:
             os.makedirs(self.model_download_root, exist_ok=True)
         except:
-           logger.info(f"Failed to create '{self.model_download_root}'.") 
+           logger.info(f"Failed to create '{self.model_download_root}'.")
 
-        logger.info(f"Initializing Whisper model: {self.model_name} on device: {self.device}")
+        logger.info(f"Initializing Whisper model: {self.model_name} on device: {self.device} (replicas: {self.replicas})")
         logger.info(f"Models will be downloaded/cached at: {self.model_download_root}")
 
+        self._idle_models: "queue.Queue[Any]" = queue.Queue()
+        self._memory_bytes = 0
         try:
-            self.model = whisper.load_model(
-                self.model_name,
-                device=self.device,
-                download_root=self.model_download_root
-            )
+            for _ in range(self.replicas):
+                model = self._load_model()
+                self._memory_bytes += self._model_size_bytes(model)
+                self._idle_models.put(model)
             logger.info(f"Whisper model '{self.model_name}' loaded successfully onto '{self.device}'.")
         except Exception as e:
             logger.error(f"Failed to load Whisper model '{self.model_name}': {e}")
             raise RuntimeError(f"Whisper model loading failed: {e}") from e
 
-    async def predict(self, audio_file_path: str, **kwargs: Any) -> Dict[str, Any]:
+    def _load_model(self) -> Any:
+        return whisper.load_model(
+            self.model_name,
+            device=self.device,
+            download_root=self.model_download_root
+        )
+
+    @staticmethod
+    def _model_size_bytes(model: Any) -> int:
+        return sum(t.numel() * t.element_size() for t in (*model.parameters(), *model.buffers()))
+
+    @property
+    def memory_bytes(self) -> int:
+        return self._memory_bytes
+
+    def unload(self) -> None:
+        while not self._idle_models.empty():
+            self._idle_models.get_nowait()
+        gc.collect()
+        if self.device == "cuda" and torch.cuda.is_available():
+            torch.cuda.empty_cache()
+        logger.info(f"Whisper model '{self.model_name}' unloaded.")
+
+    @contextmanager
+    def _acquire_model(self) -> Iterator[Any]:
+        """Checks out an idle replica for the duration of one inference call."""
+        model = self._idle_models.get()
+        try:
+            yield model
+        finally:
+            self._idle_models.put(model)
+
+    @property
+    def _fp16(self) -> bool:
+        return torch.cuda.is_available() and self.device == "cuda"
+
+    def _transcribe_options(self, language: Optional[str], initial_prompt: Optional[str] = None) -> Dict[str, Any]:
+        options: Dict[str, Any] = {"fp16": self._fp16}
+        if language:
+            options["language"] = language
+        if initial_prompt:
+            options["initial_prompt"] = initial_prompt
+        return options
+
+    def predict_sync(self, audio: Union[str, np.ndarray], **kwargs: Any) -> Dict[str, Any]:
         """
-        Transcribes audio using the loaded Whisper model.
-        kwargs can include 'language' (str) and 'task' (str: 'transcribe' or 'translate').
+        Transcribes audio using the loaded Whisper model. Blocking; called from the inference executor.
+        kwargs can include 'language' (str), 'task' (str: 'transcribe' or 'translate')
+        and 'initial_prompt' (str, text preceding this audio).
         """
-        if not os.path.exists(audio_file_path):
-            logger.error(f"Audio file not found at: {audio_file_path}")
-            raise FileNotFoundError(f"Audio file not found: {audio_file_path}")
+        if isinstance(audio, str) and not os.path.exists(audio):
+            logger.error(f"Audio file not found at: {audio}")
+            raise FileNotFoundError(f"Audio file not found: {audio}")
 
         language = kwargs.get("language")
         task = kwargs.get("task", "transcribe") # Default to transcribe
+        audio_label = audio if isinstance(audio, str) else f"<{duration_sec(audio):.1f}s waveform>"
 
-        logger.info(f"Transcribing audio: {audio_file_path} with model: {self.model_name}, lang: {language}, task: {task}")
+        logger.info(f"Transcribing audio: {audio_label} with model: {self.model_name}, lang: {language}, task: {task}")
 
         try:
-            transcribe_options = {"fp16": torch.cuda.is_available() and self.device == "cuda"}
-            if language:
-                transcribe_options["language"] = language
-            result = self.model.transcribe(audio_file_path, task=task, **transcribe_options)
+            with self._acquire_model() as model:
+                result = model.transcribe(
+                    audio, task=task, **self._transcribe_options(language, kwargs.get("initial_prompt"))
+                )
 
-
-            logger.info(f"Transcription successful for: {audio_file_path}")
+            logger.info(f"Transcription successful for: {audio_label}")
             return {
                 "text": result.get("text", ""),
                 "language_detected": result.get("language", None),
@@ -64,8 +119,53 @@ class WhisperASR(AbstractMLModel):
             }
 
         except Exception as e:
-            logger.error(f"Error during Whisper transcription for {audio_file_path}: {e}")
+            logger.error(f"Error during Whisper transcription for {audio_label}: {e}")
             raise RuntimeError(f"Transcription failed: {e}") from e
         finally:
              if self.device == "cuda" and torch.cuda.is_available():
-                 torch.cuda.empty_cache()
\ No newline at end of file
+                 torch.cuda.empty_cache()
+
+    def predict_batch_sync(
+        self, audios: List[np.ndarray], language: Optional[str] = None, task: str = "transcribe"
+    ) -> List[Dict[str, Any]]:
+        """
+        Transcribes several short clips (each within one 30 s Whisper window) in a single
+        encoder pass and a batched greedy decode. Returns one result dict per clip.
+        """
+        logger.info(f"Batch transcribing {len(audios)} clips with model: {self.model_name}, lang: {language}, task: {task}")
+        try:
+            with self._acquire_model() as model:
+                mel_batch = torch.stack([
+                    whisper.log_mel_spectrogram(whisper.pad_or_trim(audio), n_mels=model.dims.n_mels)
+                    for audio in audios
+                ]).to(model.device)
+                options = whisper.DecodingOptions(
+                    task=task, language=language, fp16=self._fp16, without_timestamps=True
+                )
+                decoded = whisper.decode(model, mel_batch, options)
+
+            return [
+                {
+                    "text": result.text,
+                    "language_detected": result.language,
+                    "segments": [{
+                        "id": 0,
+                        "seek": 0,
+                        "start": 0.0,
+                        "end": round(duration_sec(audio), 3),
+                        "text": result.text,
+                        "tokens": result.tokens,
+                        "temperature": result.temperature,
+                        "avg_logprob": result.avg_logprob,
+                        "compression_ratio": result.compression_ratio,
+                        "no_speech_prob": result.no_speech_prob,
+                    }],
+                }
+                for audio, result in zip(audios, decoded)
+            ]
+        except Exception as e:
+            logger.error(f"Error during Whisper batch transcription: {e}")
+            raise RuntimeError(f"Batch transcription failed: {e}") from e
+        finally:
+             if self.device == "cuda" and torch.cuda.is_available():
+                 torch.cuda.empty_cache()
@@ -0,0 +1,129 @@
+import logging
+from typing import Any, Dict, List, Optional
+
+import numpy as np
+
+from ml_models.base import AbstractMLModel
+from config import asr_settings
+from audio import SAMPLE_RATE, frame_energy
+
+logger = logging.getLogger(__name__)
+
+PROMPT_CHARS = 200
+SILENCE_FRAME_LEN = int(0.03 * SAMPLE_RATE)
+SILENCE_TAIL_SEC = 0.5 # a hypothesis ending in this much quiet audio is treated as a finished phrase
+SILENCE_POWER = 10 ** (-40 / 10) # -40 dBFS
+
+
+class RealtimeSession:
+    """
+    Rolling audio buffer for one live-captioning connection.
+    Only audio after the last committed (final) segment is kept and re-decoded; each decode
+    emits a partial hypothesis for that unstable tail, and segments are committed as final once
+    they are followed by another segment, the hypothesis is stable and ends in silence, or the
+    buffer reaches REALTIME_MAX_BUFFER_SEC.
+    """
+
+    def __init__(self, model: AbstractMLModel, language: Optional[str], task: str):
+        self.model = model
+        self.language = language
+        self.task = task
+        self.max_buffer_samples = int(asr_settings.REALTIME_MAX_BUFFER_SEC * SAMPLE_RATE)
+        self.step_samples = int(asr_settings.REALTIME_STEP_SEC * SAMPLE_RATE)
+        self.min_decode_samples = int(asr_settings.REALTIME_MIN_DECODE_SEC * SAMPLE_RATE)
+
+        self._buffer = np.zeros(0, dtype=np.float32)
+        self._buffer_start = 0 # absolute sample index of _buffer[0]
+        self._received = 0 # absolute samples received so far
+        self._decoded_upto = 0 # value of _received at the last decode
+        self._previous_tail: Optional[str] = None
+        self._committed_tail = "" # end of the committed transcript, used as the decoding prompt
+        self.dropped_samples = 0
+
+    @property
+    def received_sec(self) -> float:
+        return self._received / SAMPLE_RATE
+
+    def append(self, pcm16: bytes) -> None:
+        """Adds a frame of 16 kHz mono little-endian 16-bit PCM."""
+        usable = len(pcm16) - len(pcm16) % 2
+        samples = np.frombuffer(pcm16[:usable], dtype="<i2").astype(np.float32) / 32768.0
+        self._buffer = np.concatenate([self._buffer, samples])
+        self._received += len(samples)
+
+        # Hard memory bound if decoding falls behind: keep at most twice the commit window
+        overflow = len(self._buffer) - 2 * self.max_buffer_samples
+        if overflow > 0:
+            self._buffer = self._buffer[overflow:]
+            self._buffer_start += overflow
+            self.dropped_samples += overflow
+            logger.warning(f"Realtime session fell behind, dropped {overflow / SAMPLE_RATE:.2f}s of audio.")
+
+    def ready(self) -> bool:
+        return (
+            len(self._buffer) >= self.min_decode_samples
+            and self._received - self._decoded_upto >= self.step_samples
+        )
+
+    async def decode(self, final: bool = False) -> List[Dict[str, Any]]:
+        """Re-decodes the uncommitted tail and returns the 'final'/'partial' messages to send."""
+        if not len(self._buffer):
+            return []
+        snapshot = self._buffer.copy()
+        snapshot_start = self._buffer_start
+        self._decoded_upto = self._received
+        audio_end = (snapshot_start + len(snapshot)) / SAMPLE_RATE
+
+        result = await self.model.predict(
+            snapshot, language=self.language, task=self.task, initial_prompt=self._committed_tail or None
+        )
+        segments = [s for s in result.get("segments") or [] if s.get("text", "").strip()]
+        tail_text = "".join(s["text"] for s in segments).strip()
+
+        if final or len(snapshot) >= self.max_buffer_samples:
+            committed, pending, cut = segments, [], len(snapshot)
+        elif tail_text and tail_text == self._previous_tail and self._ends_in_silence(snapshot):
+            committed, pending, cut = segments, [], len(snapshot)
+        elif len(segments) > 1:
+            committed, pending = segments[:-1], segments[-1:]
+            cut = min(len(snapshot), int(committed[-1]["end"] * SAMPLE_RATE))
+        else:
+            committed, pending, cut = [], segments, 0
+
+        offset = snapshot_start / SAMPLE_RATE
+        messages = [
+            {
+                "type": "final",
+                "text": s["text"].strip(),
+                "start": round(offset + s["start"], 3),
+                "end": round(offset + min(s["end"], len(snapshot) / SAMPLE_RATE), 3),
+                "audio_end": round(audio_end, 3),
+            }
+            for s in committed
+        ]
+
+        if cut:
+            # Audio received while decoding stays in the buffer after the cut
+            drop = cut - (self._buffer_start - snapshot_start)
+            if drop > 0:
+                self._buffer = self._buffer[drop:]
+                self._buffer_start += drop
+            self._committed_tail = (self._committed_tail + "".join(s["text"] for s in committed))[-PROMPT_CHARS:]
+
+        pending_text = "".join(s["text"] for s in pending).strip()
+        self._previous_tail = pending_text if cut else tail_text
+        if pending_text and not final:
+            messages.append({
+                "type": "partial",
+                "text": pending_text,
+                "start": round(offset + pending[0]["start"], 3),
+                "end": round(audio_end, 3),
+                "audio_end": round(audio_end, 3),
+            })
+        return messages
+
+    @staticmethod
+    def _ends_in_silence(audio: np.ndarray) -> bool:
+        tail = audio[-int(SILENCE_TAIL_SEC * SAMPLE_RATE):]
+        energy = frame_energy(tail, SILENCE_FRAME_LEN)
+        return len(energy) > 0 and float(energy.max()) < SILENCE_POWER
@@ -0,0 +1,186 @@
+import asyncio
+import hashlib
+import json
+import logging
+import os
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+
+from config import asr_settings
+
+logger = logging.getLogger(__name__)
+
+
+class TranscriptionCache:
+    """
+    Content-addressed cache of transcription results.
+    Keys combine the SHA-256 of the uploaded audio with model, language, task and the
+    endpoint's decoding mode.
+    An in-memory LRU tier is checked first; an optional on-disk tier (one JSON file
+    per entry) survives restarts. Both tiers expire entries after `ttl_sec`.
+    """
+
+    def __init__(
+        self,
+        max_entries: int,
+        ttl_sec: int,
+        disk_dir: Optional[str] = None,
+        disk_max_bytes: int = 0,
+    ):
+        self.max_entries = max_entries
+        self.ttl_sec = ttl_sec
+        self.disk_dir = disk_dir or None
+        self.disk_max_bytes = disk_max_bytes
+        self._memory: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._disk_lock = threading.Lock()
+        self._disk_bytes = 0
+        self._counters = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "stores": 0}
+
+        if self.disk_dir:
+            os.makedirs(self.disk_dir, exist_ok=True)
+            self._disk_bytes = sum(size for _, size, _ in self._disk_entries())
+            logger.info(f"Transcription disk cache at '{self.disk_dir}' ({self._disk_bytes / 2**20:.1f} MB).")
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 or self.disk_dir is not None
+
+    @staticmethod
+    def make_key(
+        audio_digest: str,
+        model_identifier: str,
+        language: Optional[str],
+        task: Optional[str],
+        vad: bool = False,
+        mode: str = "",
+    ) -> str:
+        """`mode` keeps apart endpoints that decode the same audio differently, e.g. "stream"."""
+        parts = [audio_digest, model_identifier, language or "", task or "", "vad" if vad else ""]
+        if mode: # left out for /transcribe so its existing entries stay valid
+            parts.append(mode)
+        return hashlib.sha256("|".join(parts).encode()).hexdigest()
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._memory.get(key)
+        if entry is not None:
+            stored_at, payload = entry
+            if time.time() - stored_at <= self.ttl_sec:
+                self._memory.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                return payload
+            del self._memory[key]
+
+        if self.disk_dir:
+            disk_entry = await asyncio.to_thread(self._read_disk, key)
+            if disk_entry is not None:
+                self._counters["disk_hits"] += 1
+                self._remember(key, *disk_entry)
+                return disk_entry[1]
+
+        self._counters["misses"] += 1
+        return None
+
+    async def put(self, key: str, payload: Dict[str, Any]) -> None:
+        stored_at = time.time()
+        self._remember(key, stored_at, payload)
+        self._counters["stores"] += 1
+        if self.disk_dir:
+            try:
+                await asyncio.to_thread(self._write_disk, key, payload)
+            except OSError as e:
+                logger.warning(f"Failed to write transcription cache entry {key}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        lookups = self._counters["memory_hits"] + self._counters["disk_hits"] + self._counters["misses"]
+        return {
+            **self._counters,
+            "hit_ratio": round((lookups - self._counters["misses"]) / lookups, 3) if lookups else 0.0,
+            "memory_entries": len(self._memory),
+            "disk_mb": round(self._disk_bytes / 2**20, 1) if self.disk_dir else None,
+        }
+
+    def _remember(self, key: str, stored_at: float, payload: Dict[str, Any]) -> None:
+        if self.max_entries <= 0:
+            return
+        self._memory[key] = (stored_at, payload)
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key[:2], f"{key}.json")
+
+    def _read_disk(self, key: str) -> Optional[Tuple[float, Dict[str, Any]]]:
+        path = self._path(key)
+        try:
+            stored_at = os.path.getmtime(path)
+            if time.time() - stored_at > self.ttl_sec:
+                self._remove(path)
+                return None
+            with open(path, "r", encoding="utf-8") as f:
+                return stored_at, json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logger.warning(f"Dropping unreadable transcription cache entry {path}: {e}")
+            self._remove(path)
+            return None
+
+    def _write_disk(self, key: str, payload: Dict[str, Any]) -> None:
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        data = json.dumps(payload, default=float).encode("utf-8")
+        tmp_path = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(data)
+        os.replace(tmp_path, path) # atomic, so readers never see a partial entry
+        with self._disk_lock:
+            self._disk_bytes += len(data)
+            over_budget = self.disk_max_bytes and self._disk_bytes > self.disk_max_bytes
+        if over_budget:
+            self._prune_disk()
+
+    def _disk_entries(self):
+        """Yields (path, size, mtime) for every entry in the disk tier."""
+        for root, _, files in os.walk(self.disk_dir):
+            for name in files:
+                if not name.endswith(".json"):
+                    continue
+                path = os.path.join(root, name)
+                try:
+                    st = os.stat(path)
+                except FileNotFoundError:
+                    continue
+                yield path, st.st_size, st.st_mtime
+
+    def _prune_disk(self) -> None:
+        """Drops expired entries, then the oldest ones, until the disk tier is at 90% of its budget."""
+        with self._disk_lock:
+            now = time.time()
+            entries = sorted(self._disk_entries(), key=lambda entry: entry[2])
+            total = sum(size for _, size, _ in entries)
+            target = int(self.disk_max_bytes * 0.9)
+            for path, size, mtime in entries:
+                if total <= target and now - mtime <= self.ttl_sec:
+                    continue
+                if self._remove(path):
+                    total -= size
+            self._disk_bytes = total
+
+    @staticmethod
+    def _remove(path: str) -> bool:
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
+
+
+transcription_cache = TranscriptionCache(
+    max_entries=asr_settings.RESULT_CACHE_MAX_ENTRIES if asr_settings.RESULT_CACHE_ENABLED else 0,
+    ttl_sec=asr_settings.RESULT_CACHE_TTL_SEC,
+    disk_dir=asr_settings.RESULT_CACHE_DIR if asr_settings.RESULT_CACHE_ENABLED else None,
+    disk_max_bytes=asr_settings.RESULT_CACHE_DISK_MAX_MB * 2**20,
+)
@@ -1,18 +1,74 @@
+import asyncio
 import datetime
+import hashlib
+import json
 import logging
-import tempfile
-import os
-import shutil
-from fastapi import APIRouter, HTTPException, status, UploadFile, File, Form
-from typing import Optional
+from fastapi import APIRouter, HTTPException, Request, WebSocket, WebSocketDisconnect, status, UploadFile, File, Form
+from fastapi.responses import StreamingResponse
+from typing import Any, AsyncIterator, Dict, Optional, Tuple
 
 from contracts import ASRResponse, ErrorResponse, ASRModelCreate
 from ml_models.model_registry import model_registry
+from ml_models.executor import InferenceQueueFullError
+from ml_models.batching import batch_scheduler
+from ml_models.longform import transcribe_longform
+from ml_models.streaming import iter_transcription
+from audio import decode_audio, duration_sec, AudioDecodeError
+from result_cache import transcription_cache
+from realtime import RealtimeSession
+from vad import trim_silence, map_segments
 from config import asr_settings
 
 logger = logging.getLogger(__name__)
 router = APIRouter(tags=["asr"])
 
+UPLOAD_CHUNK_SIZE = 1024 * 1024
+_active_realtime_sessions = 0
+
+
+async def _read_upload(audio_file: UploadFile) -> Tuple[bytearray, str]:
+    """Reads the upload in chunks, hashing each chunk as it arrives (no second pass over the data)."""
+    digest = hashlib.sha256()
+    data = bytearray()
+    while chunk := await audio_file.read(UPLOAD_CHUNK_SIZE):
+        digest.update(chunk)
+        data += chunk
+    return data, digest.hexdigest()
+
+
+def _build_response(model_identifier: str, result: Dict[str, Any], message: str) -> ASRResponse:
+    return ASRResponse(
+        model_identifier=model_identifier,
+        transcribed_text=result.get("text", "No text transcribed."),
+        language_detected=result.get("language_detected"),
+        segments=result.get("segments"),
+        audio_duration_sec=result.get("audio_duration_sec"),
+        skipped_audio_sec=result.get("skipped_audio_sec"),
+        processed_at=datetime.datetime.now(datetime.timezone.utc),
+        status="success",
+        message=message,
+    )
+
+
+def _cache_payload(result: Dict[str, Any]) -> Dict[str, Any]:
+    return {
+        "text": result.get("text", "No text transcribed."),
+        "language_detected": result.get("language_detected"),
+        "segments": result.get("segments"),
+        "audio_duration_sec": result.get("audio_duration_sec"),
+        "skipped_audio_sec": result.get("skipped_audio_sec"),
+    }
+
+
+@router.get("/health", summary="Service health and inference queue state")
+async def health():
+    return {
+        "status": "ok",
+        "models": model_registry.stats(),
+        "result_cache": transcription_cache.stats(),
+        "realtime_sessions": _active_realtime_sessions,
+    }
+
 
 @router.post(
     "/models", summary="Add new ASR model"
@@ -50,6 +106,14 @@ async def transcribe_audio(
         "transcribe",
         description="Task to perform: 'transcribe' or 'translate'.",
     ),
+    long_form: Optional[bool] = Form(
+        None,
+        description="Split the audio into chunks transcribed in parallel. Defaults to on for long recordings.",
+    ),
+    vad: Optional[bool] = Form(
+        None,
+        description="Skip silence with voice activity detection before inference. Defaults to VAD_ENABLED.",
+    ),
 ):
     """
     Transcribes an uploaded audio file using a specified Whisper ASR model.
@@ -58,36 +122,80 @@ async def transcribe_audio(
         f"Received /transcribe request for model: '{model_identifier}', file: '{audio_file.filename}'"
     )
 
-    # Create a temporary directory to save the uploaded file safely
-    temp_dir = tempfile.mkdtemp(prefix="asr_audio_")
-    temp_file_path = os.path.join(temp_dir, audio_file.filename)
-
     try:
-        with open(temp_file_path, "wb") as buffer:
-            shutil.copyfileobj(audio_file.file, buffer)
+        use_vad = asr_settings.VAD_ENABLED if vad is None else vad
+        audio_bytes, audio_digest = await _read_upload(audio_file)
+        cache_key = transcription_cache.make_key(audio_digest, model_identifier, language, task, vad=use_vad)
+        cached_result = await transcription_cache.get(cache_key) if transcription_cache.enabled else None
+        if cached_result is not None:
+            logger.info(f"Serving '{audio_file.filename}' for model '{model_identifier}' from the result cache.")
+            return _build_response(model_identifier, cached_result, "Transcription successful (cached).")
+
+        audio = await asyncio.to_thread(decode_audio, audio_bytes)
+        del audio_bytes
         logger.debug(
-            f"Audio file '{audio_file.filename}' saved temporarily to '{temp_file_path}'"
+            f"Audio file '{audio_file.filename}' decoded in memory ({len(audio)} samples)"
         )
 
-        model_instance = await model_registry.get_model(model_identifier)
+        audio_duration = duration_sec(audio)
+        speech_regions = None
+        if use_vad:
+            audio, speech_regions = await asyncio.to_thread(trim_silence, audio)
+            logger.info(
+                f"VAD kept {duration_sec(audio):.1f}s of {audio_duration:.1f}s of '{audio_file.filename}'."
+            )
 
-        transcription_result = await model_instance.predict(
-            audio_file_path=temp_file_path, language=language, task=task
-        )
+        async with model_registry.use_model(model_identifier) as model_instance:
+            if long_form is None:
+                long_form = duration_sec(audio) >= asr_settings.LONGFORM_MIN_AUDIO_SEC
+
+            if not len(audio):
+                transcription_result = {"text": "", "language_detected": None, "segments": []}
+            elif long_form:
+                transcription_result = await transcribe_longform(
+                    model_instance, audio, language, task
+                )
+            elif batch_scheduler.accepts(model_instance, audio):
+                transcription_result = await batch_scheduler.submit(
+                    model_identifier, model_instance, audio, language, task
+                )
+            else:
+                transcription_result = await model_instance.predict(
+                    audio, language=language, task=task
+                )
         logger.info(
             f"Transcription successful for '{audio_file.filename}' with model '{model_identifier}'."
         )
+        transcription_result["audio_duration_sec"] = round(audio_duration, 3)
+        if speech_regions is not None:
+            transcription_result["segments"] = map_segments(transcription_result.get("segments") or [], speech_regions)
+            transcription_result["skipped_audio_sec"] = round(audio_duration - duration_sec(audio), 3)
+        if transcription_cache.enabled:
+            await transcription_cache.put(cache_key, _cache_payload(transcription_result))
 
-        return ASRResponse(
-            model_identifier=model_identifier,
-            transcribed_text=transcription_result.get("text", "No text transcribed."),
-            language_detected=transcription_result.get("language_detected"),
-            segments=transcription_result.get("segments"),
-            processed_at=datetime.datetime.now(datetime.timezone.utc),
-            status="success",
-            message="Transcription successful.",
-        )
+        return _build_response(model_identifier, transcription_result, "Transcription successful.")
 
+    except AudioDecodeError as e:
+        logger.warning(f"Could not decode '{audio_file.filename}': {e}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ErrorResponse(
+                message="Audio file could not be decoded.",
+                model_identifier=model_identifier,
+                error_type=e.__class__.__name__,
+            ).model_dump(),
+        )
+    except InferenceQueueFullError as e:
+        logger.warning(f"Rejecting /transcribe for model '{model_identifier}': inference queue is full.")
+        raise HTTPException(
+            status_code=status.HTTP_429_TOO_MANY_REQUESTS,
+            detail=ErrorResponse(
+                message="Inference queue is full. Retry later.",
+                model_identifier=model_identifier,
+                error_type=e.__class__.__name__,
+            ).model_dump(),
+            headers={"Retry-After": str(e.retry_after)},
+        )
     except Exception as e:
         logger.exception(
             f"Unexpected error during /transcribe for model '{model_identifier}'"
@@ -103,11 +211,207 @@ async def transcribe_audio(
     finally:
         if audio_file:
             await audio_file.close()
-        if os.path.exists(temp_dir):
+
+
+def _ndjson(record: Dict[str, Any]) -> bytes:
+    return (json.dumps(record, default=str) + "\n").encode("utf-8")
+
+
+@router.post(
+    "/transcribe/stream",
+    summary="Transcribe audio, streaming segments as NDJSON while they are decoded",
+)
+async def transcribe_audio_stream(
+    request: Request,
+    model_identifier: str = Form(
+        "whisper-small", description="Identifier of the Whisper model."
+    ),
+    audio_file: UploadFile = File(..., description="The audio file to transcribe."),
+    language: Optional[str] = Form(
+        "en",
+        description="Optional: Language of the audio.",
+    ),
+    task: Optional[str] = Form(
+        "transcribe",
+        description="Task to perform: 'transcribe' or 'translate'.",
+    ),
+):
+    """
+    Streams newline-delimited JSON: one {"type": "segment", ...} record per Whisper segment
+    as soon as its window is decoded, then a final {"type": "result", ...} record with the
+    same fields as ASRResponse, or a {"type": "error", ...} record if inference fails.
+    Remaining windows are not decoded once the client disconnects.
+    """
+    logger.info(
+        f"Received /transcribe/stream request for model: '{model_identifier}', file: '{audio_file.filename}'"
+    )
+    try:
+        audio_bytes, audio_digest = await _read_upload(audio_file)
+        # Windowed decoding segments differently from /transcribe, so its results are cached apart
+        cache_key = transcription_cache.make_key(audio_digest, model_identifier, language, task, mode="stream")
+        cached_result = await transcription_cache.get(cache_key) if transcription_cache.enabled else None
+        audio = None if cached_result is not None else await asyncio.to_thread(decode_audio, audio_bytes)
+        del audio_bytes
+    except AudioDecodeError as e:
+        logger.warning(f"Could not decode '{audio_file.filename}': {e}")
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=ErrorResponse(
+                message="Audio file could not be decoded.",
+                model_identifier=model_identifier,
+                error_type=e.__class__.__name__,
+            ).model_dump(),
+        )
+    finally:
+        await audio_file.close()
+
+    def segment_record(segment: Dict[str, Any]) -> bytes:
+        return _ndjson({
+            "type": "segment",
+            "id": segment.get("id"),
+            "start": segment.get("start"),
+            "end": segment.get("end"),
+            "text": segment.get("text"),
+        })
+
+    async def stream() -> AsyncIterator[bytes]:
+        if cached_result is not None:
+            for segment in cached_result.get("segments") or []:
+                yield segment_record(segment)
+            response = _build_response(model_identifier, cached_result, "Transcription successful (cached).")
+            yield _ndjson({"type": "result", **response.model_dump(mode="json")})
+            return
+
+        texts, segments, language_detected = [], [], None
+        try:
+            async with model_registry.use_model(model_identifier) as model_instance:
+                windows = iter_transcription(model_instance, audio, language, task)
+                try:
+                    async for window in windows:
+                        texts.append(window["text"])
+                        segments.extend(window["segments"])
+                        language_detected = language_detected or window["language_detected"]
+                        for segment in window["segments"]:
+                            yield segment_record(segment)
+                        if await request.is_disconnected():
+                            logger.info(f"Client disconnected from /transcribe/stream for '{model_identifier}', stopping.")
+                            return
+                finally:
+                    await windows.aclose()
+        except InferenceQueueFullError as e:
+            logger.warning(f"Rejecting /transcribe/stream for model '{model_identifier}': inference queue is full.")
+            yield _ndjson({"type": "error", "retry_after": e.retry_after, **ErrorResponse(
+                message="Inference queue is full. Retry later.",
+                model_identifier=model_identifier,
+                error_type=e.__class__.__name__,
+            ).model_dump()})
+            return
+        except Exception as e:
+            logger.exception(f"Unexpected error during /transcribe/stream for model '{model_identifier}'")
+            yield _ndjson({"type": "error", **ErrorResponse(
+                message="An unexpected server error occurred.",
+                model_identifier=model_identifier,
+                error_type=e.__class__.__name__,
+            ).model_dump()})
+            return
+
+        result = {
+            "text": "".join(texts),
+            "language_detected": language_detected,
+            "segments": segments,
+            "audio_duration_sec": round(duration_sec(audio), 3),
+        }
+        if transcription_cache.enabled:
+            await transcription_cache.put(cache_key, _cache_payload(result))
+        response = _build_response(model_identifier, result, "Transcription successful.")
+        yield _ndjson({"type": "result", **response.model_dump(mode="json")})
+
+    return StreamingResponse(stream(), media_type="application/x-ndjson")
+
+
+@router.websocket("/ws/transcribe")
+async def transcribe_realtime(
+    websocket: WebSocket,
+    model_identifier: str = "whisper-small",
+    language: Optional[str] = "en",
+    task: str = "transcribe",
+):
+    """
+    Live transcription. The client sends binary frames of 16 kHz mono 16-bit little-endian PCM
+    and a text frame {"event": "end"} when done. The server sends {"type": "partial"|"final",
+    "text", "start", "end", "audio_end"} messages and {"type": "done"} after the last final.
+    """
+    global _active_realtime_sessions
+    if _active_realtime_sessions >= asr_settings.REALTIME_MAX_SESSIONS:
+        logger.warning("Rejecting realtime session: session limit reached.")
+        await websocket.close(code=1013) # try again later
+        return
+
+    # Counted before the first await so concurrent handshakes can't all pass the check above
+    _active_realtime_sessions += 1
+    try:
+        await websocket.accept()
+        logger.info(f"Realtime session opened for model '{model_identifier}'.")
+        async with model_registry.use_model(model_identifier) as model_instance:
+            session = RealtimeSession(model_instance, language, task)
+            new_audio = asyncio.Event()
+            finished = asyncio.Event()
+
+            async def receive_audio():
+                while True:
+                    message = await websocket.receive()
+                    if message["type"] == "websocket.disconnect":
+                        raise WebSocketDisconnect(message.get("code", 1000))
+                    if message.get("bytes"):
+                        session.append(message["bytes"])
+                        new_audio.set()
+                    elif message.get("text") and json.loads(message["text"]).get("event") == "end":
+                        finished.set()
+                        new_audio.set()
+                        return
+
+            async def decode_audio_stream():
+                while not finished.is_set():
+                    await new_audio.wait()
+                    new_audio.clear()
+                    if finished.is_set() or not session.ready():
+                        continue
+                    try:
+                        messages = await session.decode()
+                    except InferenceQueueFullError:
+                        continue # skip this step; the next frame triggers another attempt
+                    for message in messages:
+                        await websocket.send_json(message)
+                for message in await session.decode(final=True):
+                    await websocket.send_json(message)
+                await websocket.send_json({"type": "done", "audio_sec": round(session.received_sec, 3)})
+
+            receiver = asyncio.create_task(receive_audio())
+            decoder = asyncio.create_task(decode_audio_stream())
             try:
-                shutil.rmtree(temp_dir)
-                logger.debug(f"Cleaned up temporary directory: {temp_dir}")
-            except Exception as e_cleanup:
-                logger.error(
-                    f"Error cleaning up temp directory {temp_dir}: {e_cleanup}"
-                )
+                done, _ = await asyncio.wait({receiver, decoder}, return_when=asyncio.FIRST_COMPLETED)
+                if receiver in done:
+                    receiver.result() # re-raises a disconnect
+                    await decoder
+                else:
+                    decoder.result()
+            finally:
+                for task_ in (receiver, decoder):
+                    task_.cancel()
+        await websocket.close()
+
+    except WebSocketDisconnect:
+        logger.info(f"Realtime client for model '{model_identifier}' disconnected.")
+    except Exception as e:
+        logger.exception(f"Unexpected error in realtime session for model '{model_identifier}'")
+        try:
+            await websocket.send_json({"type": "error", **ErrorResponse(
+                message="An unexpected server error occurred.",
+                model_identifier=model_identifier,
+                error_type=e.__class__.__name__,
+            ).model_dump()})
+            await websocket.close(code=1011)
+        except Exception:
+            pass
+    finally:
+        _active_realtime_sessions -= 1
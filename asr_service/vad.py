@@ -0,0 +1,118 @@
+import bisect
+import logging
+from dataclasses import dataclass
+from typing import Any, Dict, List, Tuple
+
+import numpy as np
+
+from config import asr_settings
+from audio import SAMPLE_RATE
+
+logger = logging.getLogger(__name__)
+
+FRAME_LEN = int(0.03 * SAMPLE_RATE) # 30 ms
+FRAMES_PER_BLOCK = 4096 # frames analysed per FFT block, keeps memory flat on long files
+ABSOLUTE_FLOOR_DB = -50.0 # nothing quieter than this counts as speech
+
+
+@dataclass
+class SpeechRegion:
+    """Maps a stretch of the trimmed audio back to the original recording (all values in samples)."""
+    trimmed_start: int
+    original_start: int
+    length: int
+
+
+def _frame_features(audio: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Per-frame energy in dBFS and spectral flatness (0 = tonal/voiced, 1 = white noise)."""
+    n_frames = len(audio) // FRAME_LEN
+    window = np.hanning(FRAME_LEN).astype(np.float32)
+    energy_db = np.empty(n_frames, dtype=np.float32)
+    flatness = np.empty(n_frames, dtype=np.float32)
+    for first in range(0, n_frames, FRAMES_PER_BLOCK):
+        last = min(n_frames, first + FRAMES_PER_BLOCK)
+        frames = audio[first * FRAME_LEN:last * FRAME_LEN].reshape(-1, FRAME_LEN)
+        energy_db[first:last] = 10 * np.log10(np.mean(np.square(frames), axis=1) + 1e-10)
+        power = np.square(np.abs(np.fft.rfft(frames * window, axis=1))) + 1e-10
+        flatness[first:last] = np.exp(np.mean(np.log(power), axis=1)) / np.mean(power, axis=1)
+    return energy_db, flatness
+
+
+def _runs(mask: np.ndarray) -> List[Tuple[int, int]]:
+    """[start, end) index pairs of consecutive True values."""
+    edges = np.diff(np.concatenate([[0], mask.astype(np.int8), [0]]))
+    return list(zip(np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)))
+
+
+def detect_speech(audio: np.ndarray) -> List[Tuple[int, int]]:
+    """
+    Energy/spectral voice activity detection. A frame is speech when it is louder than the
+    recording's noise floor by VAD_ENERGY_MARGIN_DB and not noise-like (flatness below
+    VAD_MAX_FLATNESS). Short gaps are bridged, short blips dropped and regions padded.
+    Returns [start, end) sample ranges.
+    """
+    if len(audio) < FRAME_LEN:
+        return []
+    energy_db, flatness = _frame_features(audio)
+    noise_floor_db = float(np.percentile(energy_db, 10))
+    threshold_db = max(ABSOLUTE_FLOOR_DB, noise_floor_db + asr_settings.VAD_ENERGY_MARGIN_DB)
+    speech = (energy_db > threshold_db) & (flatness < asr_settings.VAD_MAX_FLATNESS)
+
+    frame_ms = 1000 * FRAME_LEN / SAMPLE_RATE
+    min_gap = int(asr_settings.VAD_MIN_SILENCE_MS / frame_ms)
+    min_speech = int(asr_settings.VAD_MIN_SPEECH_MS / frame_ms)
+    pad = int(asr_settings.VAD_PAD_MS / frame_ms)
+
+    for start, end in _runs(~speech):
+        if 0 < start and end < len(speech) and end - start < min_gap:
+            speech[start:end] = True
+
+    regions: List[Tuple[int, int]] = []
+    for start, end in _runs(speech):
+        if end - start < min_speech:
+            continue
+        start, end = max(0, start - pad) * FRAME_LEN, min(len(speech), end + pad) * FRAME_LEN
+        if regions and start <= regions[-1][1]:
+            regions[-1] = (regions[-1][0], max(regions[-1][1], end))
+        else:
+            regions.append((start, end))
+    if regions and regions[-1][1] >= len(speech) * FRAME_LEN:
+        regions[-1] = (regions[-1][0], len(audio)) # include the trailing partial frame
+    return regions
+
+
+def trim_silence(audio: np.ndarray) -> Tuple[np.ndarray, List[SpeechRegion]]:
+    """Concatenates the speech regions of `audio` and returns them with the mapping back."""
+    regions: List[SpeechRegion] = []
+    trimmed_start = 0
+    for start, end in detect_speech(audio):
+        regions.append(SpeechRegion(trimmed_start, start, end - start))
+        trimmed_start += end - start
+    trimmed = np.concatenate([audio[r.original_start:r.original_start + r.length] for r in regions]) \
+        if regions else np.zeros(0, dtype=np.float32)
+    logger.debug(f"VAD kept {len(trimmed) / SAMPLE_RATE:.1f}s of {len(audio) / SAMPLE_RATE:.1f}s in {len(regions)} regions.")
+    return trimmed, regions
+
+
+def _to_original_time(seconds: float, regions: List[SpeechRegion], starts: List[int], is_end: bool) -> float:
+    """Converts a timestamp on the trimmed timeline to the original recording's timeline."""
+    sample = seconds * SAMPLE_RATE
+    # An end time exactly on a region join belongs to the earlier region, not after the skipped gap
+    index = (bisect.bisect_left if is_end else bisect.bisect_right)(starts, sample) - 1
+    region = regions[max(0, index)]
+    return (region.original_start + min(max(sample - region.trimmed_start, 0), region.length)) / SAMPLE_RATE
+
+
+def map_segments(segments: List[Dict[str, Any]], regions: List[SpeechRegion]) -> List[Dict[str, Any]]:
+    """Moves segment timestamps from the trimmed audio back onto the original timeline."""
+    if not regions:
+        return segments
+    starts = [r.trimmed_start for r in regions]
+    return [
+        {
+            **segment,
+            "start": round(_to_original_time(segment["start"], regions, starts, is_end=False), 3),
+            "end": round(_to_original_time(segment["end"], regions, starts, is_end=True), 3),
+        }
+        for segment in segments
+    ]
@@ -0,0 +1,85 @@
+"""
+Simulates several ASR replicas in-process and drives the billing API's ASR client against them,
+to compare model-affinity routing with plain least-outstanding routing.
+
+    python -m benchmarks.asr_balancer_simulation --replicas 4 --models 12 --requests 2000
+
+Each stub replica keeps at most `--warm-models` models loaded (LRU); a request for a model it
+doesn't have pays `--cold-ms` on top of `--service-ms`. Model popularity is Zipf-distributed.
+Reports requests and cold loads per replica, load spread (max/min requests) and wall time.
+No network or ASR service is needed: replicas are served through httpx.MockTransport.
+"""
+import argparse
+import asyncio
+import io
+import random
+import time
+
+import httpx
+
+from core.entities.audio_input import AudioInput
+from infrastructure.web.asr_balancer import AsrBalancer
+from infrastructure.web.prediction_service_impl import HttpServicePrediction
+from tests.asr_stubs import StubReplica
+
+
+async def simulate(name: str, affinity: int, args) -> None:
+    random.seed(args.seed)
+    replicas = {
+        f"http://asr-{i}": StubReplica(f"http://asr-{i}", args.warm_models, args.service_ms / 1000, args.cold_ms / 1000)
+        for i in range(args.replicas)
+    }
+
+    async def route(request: httpx.Request) -> httpx.Response:
+        return await replicas[f"{request.url.scheme}://{request.url.host}"].handle(request)
+
+    balancer = AsrBalancer(list(replicas), affinity=affinity, max_outstanding=args.max_outstanding)
+    models = [f"model-{i}" for i in range(args.models)]
+    weights = [1 / (rank + 1) ** args.zipf for rank in range(args.models)]
+    workload = random.choices(models, weights=weights, k=args.requests)
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(route)) as client:
+        service = HttpServicePrediction(balancer, client, "/transcribe")
+        health_task = asyncio.create_task(balancer.run_health_checks(client, 0.2))
+        semaphore = asyncio.Semaphore(args.concurrency)
+
+        async def one(model: str) -> None:
+            async with semaphore:
+                audio = AudioInput(filename="a.wav", content_type="audio/wav", source=io.BytesIO(b"\0" * 1024))
+                await service.get_prediction(model_name=model, file=audio)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(one(model) for model in workload))
+        elapsed = time.perf_counter() - started
+        health_task.cancel()
+
+    counts = [r.requests for r in replicas.values()]
+    print(f"\n{name} (affinity={affinity}): {elapsed:.2f}s wall, "
+          f"{sum(r.cold_loads for r in replicas.values())} cold loads, "
+          f"spread max/min={max(counts) / max(1, min(counts)):.2f}")
+    for url, replica in replicas.items():
+        endpoint = next(e for e in balancer.endpoints if e.url == url)
+        print(f"  {url}: requests={replica.requests:5d} cold_loads={replica.cold_loads:4d} spillovers={endpoint.spillovers:4d}")
+
+
+async def main(args) -> None:
+    print(f"{args.replicas} replicas x {args.warm_models} warm models, {args.models} models (zipf {args.zipf}), "
+          f"{args.requests} requests, {args.concurrency} concurrent")
+    await simulate("no affinity (every replica preferred)", args.replicas, args)
+    await simulate("model affinity", args.affinity, args)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--replicas", type=int, default=4)
+    parser.add_argument("--models", type=int, default=12)
+    parser.add_argument("--warm-models", type=int, default=4, help="models each replica keeps loaded")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--affinity", type=int, default=2)
+    parser.add_argument("--max-outstanding", type=int, default=8)
+    parser.add_argument("--service-ms", type=float, default=20)
+    parser.add_argument("--cold-ms", type=float, default=200)
+    parser.add_argument("--zipf", type=float, default=1.0)
+    parser.add_argument("--seed", type=int, default=7)
+    asyncio.run(main(parser.parse_args()))
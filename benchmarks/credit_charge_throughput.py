@@ -0,0 +1,100 @@
+"""
+Measures how many credit charges per second one user can sustain under concurrency.
+
+    python -m benchmarks.credit_charge_throughput --concurrency 32 --charges 2000
+
+Run from the repository root against a Postgres database (DATABASE_URL, as for the API).
+Two strategies are compared, each charge in its own transaction like a request would:
+
+  locked  - the previous flow: SELECT ... FOR UPDATE, a second SELECT and an ORM write of
+            the new balance, then a fourth SELECT to report the remaining credits
+  ledger  - one statement: conditional balance UPDATE + ledger INSERT (SQLAlchemyCreditLedgerRepository)
+
+A throwaway user is created for the run and removed afterwards.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+from sqlalchemy import delete, select
+from sqlalchemy.ext.asyncio import create_async_engine, AsyncSession
+from sqlalchemy.orm import sessionmaker
+
+from config.settings import settings
+from infrastructure.db.database import create_tables
+from infrastructure.db.models import UserDB, CreditLedgerDB
+from infrastructure.db.credit_ledger_repository_impl import SQLAlchemyCreditLedgerRepository
+
+
+async def charge_locked(session: AsyncSession, user_id: uuid.UUID, cost: int) -> int:
+    locked = (await session.execute(select(UserDB).where(UserDB.id == user_id).with_for_update())).scalar_one()
+    db_user = (await session.execute(select(UserDB).where(UserDB.id == user_id))).scalar_one()
+    db_user.credits = locked.credits - cost
+    await session.flush()
+    await session.commit()
+    return (await session.execute(select(UserDB.credits).where(UserDB.id == user_id))).scalar_one()
+
+
+async def charge_ledger(session: AsyncSession, user_id: uuid.UUID, cost: int) -> int:
+    balance = await SQLAlchemyCreditLedgerRepository(session).charge(user_id, cost)
+    await session.commit()
+    return balance
+
+
+STRATEGIES = {"locked": charge_locked, "ledger": charge_ledger}
+
+
+async def run_strategy(name: str, session_factory, user_id: uuid.UUID, args) -> None:
+    charge = STRATEGIES[name]
+    remaining = args.charges
+    latencies = []
+
+    async def worker():
+        nonlocal remaining
+        while remaining > 0:
+            remaining -= 1
+            async with session_factory() as session:
+                started = time.perf_counter()
+                await charge(session, user_id, 1)
+                latencies.append(time.perf_counter() - started)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(worker() for _ in range(args.concurrency)))
+    elapsed = time.perf_counter() - started
+    ordered = sorted(latencies)
+    print(
+        f"{name:>7}: {len(latencies) / elapsed:8.0f} charges/s  "
+        f"p50={statistics.median(ordered) * 1000:6.1f} ms  "
+        f"p95={ordered[int(0.95 * (len(ordered) - 1))] * 1000:6.1f} ms"
+    )
+
+
+async def main(args) -> None:
+    await create_tables()
+    engine = create_async_engine(settings.DATABASE_URL, pool_size=args.concurrency, max_overflow=0)
+    session_factory = sessionmaker(bind=engine, class_=AsyncSession, expire_on_commit=False)
+    user_id = uuid.uuid4()
+    async with session_factory() as session:
+        session.add(UserDB(id=user_id, username=f"bench-{user_id}", hashed_password="-", credits=10 * args.charges))
+        await session.commit()
+
+    print(f"{args.charges} charges, {args.concurrency} concurrent workers, one user")
+    try:
+        for name in args.strategies:
+            await run_strategy(name, session_factory, user_id, args)
+    finally:
+        async with session_factory() as session:
+            await session.execute(delete(CreditLedgerDB).where(CreditLedgerDB.user_id == user_id))
+            await session.execute(delete(UserDB).where(UserDB.id == user_id))
+            await session.commit()
+        await engine.dispose()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--concurrency", type=int, default=32)
+    parser.add_argument("--charges", type=int, default=2000)
+    parser.add_argument("--strategies", nargs="+", choices=list(STRATEGIES), default=list(STRATEGIES))
+    asyncio.run(main(parser.parse_args()))
@@ -0,0 +1,97 @@
+"""
+Checks that a login storm only slows down /users/token and not the rest of the API.
+
+    python -m benchmarks.login_burst --url http://localhost:8000/api/v1 --logins 400 --concurrency 100
+
+Registers a throwaway user, then samples GET /predict/history at a steady rate three times:
+before, during and after a burst of concurrent POST /users/token calls. It reports p50/p99
+latency for each phase and for the logins themselves. With hashing off the event loop the
+history p99 during the burst should stay close to the baseline.
+"""
+import argparse
+import asyncio
+import statistics
+import time
+import uuid
+
+import httpx
+
+
+def percentile(values, q):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(q * (len(ordered) - 1))))]
+
+
+def report(name, values):
+    if not values:
+        print(f"{name:>18}: no samples")
+        return
+    print(
+        f"{name:>18}: n={len(values):4d}  p50={statistics.median(values) * 1000:7.1f} ms  "
+        f"p99={percentile(values, 0.99) * 1000:7.1f} ms"
+    )
+
+
+async def login(client: httpx.AsyncClient, username: str, password: str) -> str:
+    response = await client.post("/users/token", data={"username": username, "password": password})
+    response.raise_for_status()
+    return response.json()["access_token"]
+
+
+async def sample_history(client: httpx.AsyncClient, token: str, stop: asyncio.Event, interval: float, out: list):
+    headers = {"Authorization": f"Bearer {token}"}
+    while not stop.is_set():
+        started = time.perf_counter()
+        response = await client.get("/predict/history", params={"limit": 10}, headers=headers)
+        response.raise_for_status()
+        out.append(time.perf_counter() - started)
+        await asyncio.sleep(max(0.0, interval - (time.perf_counter() - started)))
+
+
+async def run(args) -> None:
+    username, password = f"bench-{uuid.uuid4().hex[:12]}", uuid.uuid4().hex
+    limits = httpx.Limits(max_connections=args.concurrency + 4)
+    async with httpx.AsyncClient(base_url=args.url, timeout=60, limits=limits) as client:
+        (await client.post("/users/register", json={"username": username, "password": password})).raise_for_status()
+        token = await login(client, username, password)
+
+        phases = {}
+        login_latencies, login_errors = [], 0
+        for phase in ("baseline", "during burst", "after"):
+            samples, stop = [], asyncio.Event()
+            sampler = asyncio.create_task(sample_history(client, token, stop, 1 / args.rate, samples))
+            if phase == "during burst":
+                semaphore = asyncio.Semaphore(args.concurrency)
+
+                async def one_login():
+                    nonlocal login_errors
+                    async with semaphore:
+                        started = time.perf_counter()
+                        try:
+                            await login(client, username, password)
+                            login_latencies.append(time.perf_counter() - started)
+                        except httpx.HTTPStatusError:
+                            login_errors += 1 # 503 once the hashing queue is full
+
+                await asyncio.gather(*(one_login() for _ in range(args.logins)))
+            else:
+                await asyncio.sleep(args.phase_sec)
+            stop.set()
+            await sampler
+            phases[phase] = samples
+
+    print(f"{args.logins} logins, {args.concurrency} concurrent; history sampled at {args.rate}/s")
+    for phase, samples in phases.items():
+        report(f"history {phase}", samples)
+    report("logins", login_latencies)
+    print(f"{'rejected logins':>18}: {login_errors}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000/api/v1")
+    parser.add_argument("--logins", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--rate", type=float, default=20, help="history requests per second")
+    parser.add_argument("--phase-sec", type=float, default=10, help="length of the baseline and after phases")
+    asyncio.run(run(parser.parse_args()))
@@ -12,10 +12,66 @@ class Settings(BaseSettings):
     SECRET_KEY: str = os.getenv("SECRET_KEY", "default_secret")
     ALGORITHM: str = os.getenv("ALGORITHM", "HS256")
     ACCESS_TOKEN_EXPIRE_MINUTES: int = int(os.getenv("ACCESS_TOKEN_EXPIRE_MINUTES", 30))
+    PRINCIPAL_CACHE_TTL_SEC: int = int(os.getenv("PRINCIPAL_CACHE_TTL_SEC", 60)) # 0 disables the cache
+    PRINCIPAL_CACHE_MAX_ENTRIES: int = int(os.getenv("PRINCIPAL_CACHE_MAX_ENTRIES", 10000))
+
+    # Password hashing
+    BCRYPT_ROUNDS: int = int(os.getenv("BCRYPT_ROUNDS", 12)) # Existing hashes are upgraded on next login
+    PASSWORD_HASH_WORKERS: int = int(os.getenv("PASSWORD_HASH_WORKERS", 2))
+    PASSWORD_HASH_QUEUE_SIZE: int = int(os.getenv("PASSWORD_HASH_QUEUE_SIZE", 64))
 
     # ASR Service settings
     ASR_SERVICE_URL: str = os.getenv("ASR_SERVICE_URL", "http://asr_service:8011") # Updated port, service name
+    ASR_SERVICE_URLS: str = os.getenv("ASR_SERVICE_URLS", "") # Comma-separated replicas; defaults to ASR_SERVICE_URL
+    ASR_MODEL_AFFINITY: int = int(os.getenv("ASR_MODEL_AFFINITY", 2)) # Preferred replicas per model
+    ASR_REPLICA_MAX_OUTSTANDING: int = int(os.getenv("ASR_REPLICA_MAX_OUTSTANDING", 8)) # Spill over past this
+    ASR_HEALTH_CHECK_INTERVAL_SEC: float = float(os.getenv("ASR_HEALTH_CHECK_INTERVAL_SEC", 10))
+    ASR_HEALTH_CHECK_TIMEOUT_SEC: float = float(os.getenv("ASR_HEALTH_CHECK_TIMEOUT_SEC", 2))
+    ASR_BREAKER_FAILURE_THRESHOLD: int = int(os.getenv("ASR_BREAKER_FAILURE_THRESHOLD", 5)) # Consecutive failures that open a replica's circuit
+    ASR_BREAKER_OPEN_SEC: float = float(os.getenv("ASR_BREAKER_OPEN_SEC", 30)) # Fail fast this long before a half-open probe
+    ASR_RETRY_ATTEMPTS: int = int(os.getenv("ASR_RETRY_ATTEMPTS", 2)) # Extra attempts, only for requests that never reached a replica
+    ASR_RETRY_BACKOFF_BASE_SEC: float = float(os.getenv("ASR_RETRY_BACKOFF_BASE_SEC", 0.1))
+    ASR_RETRY_BACKOFF_MAX_SEC: float = float(os.getenv("ASR_RETRY_BACKOFF_MAX_SEC", 2))
+    ASR_HEDGE_ENABLED: bool = os.getenv("ASR_HEDGE_ENABLED", "false").lower() == "true" # Duplicate slow requests to a second replica
+    ASR_HEDGE_MAX_BYTES: int = int(os.getenv("ASR_HEDGE_MAX_BYTES", 10 * 1024 * 1024)) # Only short clips are hedged (buffered in memory)
+    ASR_HEDGE_MIN_DELAY_SEC: float = float(os.getenv("ASR_HEDGE_MIN_DELAY_SEC", 1)) # Floor for the p95-based hedge delay
     ASR_REQUEST_TIMEOUT_SEC: int = int(os.getenv("ASR_REQUEST_TIMEOUT_SEC", 300)) # Increased timeout for ASR
+    ASR_CONNECT_TIMEOUT_SEC: float = float(os.getenv("ASR_CONNECT_TIMEOUT_SEC", 5))
+    ASR_POOL_TIMEOUT_SEC: float = float(os.getenv("ASR_POOL_TIMEOUT_SEC", 30)) # Wait for a free pooled connection
+    ASR_HTTP_MAX_CONNECTIONS: int = int(os.getenv("ASR_HTTP_MAX_CONNECTIONS", 100))
+    ASR_HTTP_MAX_KEEPALIVE_CONNECTIONS: int = int(os.getenv("ASR_HTTP_MAX_KEEPALIVE_CONNECTIONS", 20))
+    ASR_HTTP_KEEPALIVE_EXPIRY_SEC: float = float(os.getenv("ASR_HTTP_KEEPALIVE_EXPIRY_SEC", 30))
+    ASR_UPLOAD_CHUNK_BYTES: int = int(os.getenv("ASR_UPLOAD_CHUNK_BYTES", 1024 * 1024)) # Upload streaming chunk size
+    ASR_HTTP2: bool = os.getenv("ASR_HTTP2", "false").lower() == "true" # Needs httpx[http2]
+
+    # Batch transcription
+    BATCH_MAX_FILES: int = int(os.getenv("BATCH_MAX_FILES", 100))
+    BATCH_MAX_MEMBER_BYTES: int = int(os.getenv("BATCH_MAX_MEMBER_BYTES", 200 * 1024 * 1024)) # Per file extracted from a zip
+    BATCH_MAX_ARCHIVE_BYTES: int = int(os.getenv("BATCH_MAX_ARCHIVE_BYTES", 1024 * 1024 * 1024)) # All files extracted from one zip
+    BATCH_ASR_CONCURRENCY: int = int(os.getenv("BATCH_ASR_CONCURRENCY", 4)) # ASR calls in flight per batch request
+
+    # Asynchronous transcription jobs
+    JOB_WORKERS: int = int(os.getenv("JOB_WORKERS", 4)) # Dispatcher coroutines per API process (0 disables them)
+    JOB_POLL_INTERVAL_SEC: float = float(os.getenv("JOB_POLL_INTERVAL_SEC", 1)) # Idle wait when the queue is empty
+    JOB_ASR_TIMEOUT_SEC: int = int(os.getenv("JOB_ASR_TIMEOUT_SEC", 3600)) # Jobs may run far longer than sync requests
+    JOB_MAX_ATTEMPTS: int = int(os.getenv("JOB_MAX_ATTEMPTS", 3))
+    JOB_AUDIO_DIR: str = os.getenv("JOB_AUDIO_DIR", "job_audio") # Must be shared by every API process that runs workers
+    JOB_WEBHOOK_TIMEOUT_SEC: float = float(os.getenv("JOB_WEBHOOK_TIMEOUT_SEC", 10))
+    JOB_WEBHOOK_ATTEMPTS: int = int(os.getenv("JOB_WEBHOOK_ATTEMPTS", 3))
+    JOB_WEBHOOK_SECRET: str = os.getenv("JOB_WEBHOOK_SECRET", "") # HMAC-SHA256 signs callbacks when set
+    JOB_WEBHOOK_ALLOWED_HOSTS: str = os.getenv("JOB_WEBHOOK_ALLOWED_HOSTS", "") # Comma-separated; when set, the only callback hosts (may be internal)
+
+    # Model catalog cache: how often each process checks whether another one changed the catalog
+    MODEL_CATALOG_REFRESH_SEC: int = int(os.getenv("MODEL_CATALOG_REFRESH_SEC", 5))
+
+    # Credit hold settings
+    CREDIT_HOLD_TTL_SEC: int = int(os.getenv("CREDIT_HOLD_TTL_SEC", int(os.getenv("ASR_REQUEST_TIMEOUT_SEC", 300)) + 60)) # Must outlive the ASR call
+    CREDIT_HOLD_SWEEP_INTERVAL_SEC: int = int(os.getenv("CREDIT_HOLD_SWEEP_INTERVAL_SEC", 30))
+
+    @property
+    def asr_service_urls(self) -> list[str]:
+        urls = [url.strip() for url in self.ASR_SERVICE_URLS.split(",") if url.strip()]
+        return urls or [self.ASR_SERVICE_URL]
 
     class Config:
         # If not using load_dotenv(), pydantic can load from .env directly
@@ -0,0 +1,32 @@
+import asyncio
+import hashlib
+from dataclasses import dataclass
+from typing import AsyncIterator, BinaryIO, Optional
+
+@dataclass
+class AudioInput:
+    """
+    Audio to transcribe, read lazily from a seekable file (e.g. the upload's spool file)
+    so it is never held in memory as a whole. Can be iterated more than once, e.g. for retries.
+    """
+    filename: str
+    content_type: str
+    source: BinaryIO
+    size_bytes: Optional[int] = None # known up front if the upload reported it, exact after a full read
+    sha256: Optional[str] = None # set after a full read
+    chunk_size: int = 1024 * 1024
+
+    async def iter_chunks(self) -> AsyncIterator[bytes]:
+        """Reads the source from the start in `chunk_size` pieces, computing size and hash as it goes."""
+        digest = hashlib.sha256()
+        size = 0
+        await asyncio.to_thread(self.source.seek, 0)
+        while True:
+            chunk = await asyncio.to_thread(self.source.read, self.chunk_size)
+            if not chunk:
+                break
+            digest.update(chunk)
+            size += len(chunk)
+            yield chunk
+        self.size_bytes = size
+        self.sha256 = digest.hexdigest()
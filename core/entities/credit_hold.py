@@ -0,0 +1,13 @@
+import uuid
+import datetime
+from dataclasses import dataclass, field
+
+@dataclass
+class CreditHold:
+    """Credits reserved for an in-flight prediction, captured on success or released on failure."""
+    user_id: uuid.UUID
+    amount: int
+    expires_at: datetime.datetime
+    status: str = 'held' # 'held', 'captured', 'released', 'expired'
+    created_at: datetime.datetime = field(default_factory=lambda: datetime.datetime.now(datetime.timezone.utc))
+    id: uuid.UUID = field(default_factory=uuid.uuid4)
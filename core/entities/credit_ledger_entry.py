@@ -0,0 +1,15 @@
+import uuid
+import datetime
+from dataclasses import dataclass
+from typing import Optional
+
+@dataclass
+class CreditLedgerEntry:
+    """One credit movement. Positive amounts add to the balance, negative ones spend it."""
+    user_id: uuid.UUID
+    amount: int
+    kind: str # 'charge', 'refund', 'grant'
+    balance_after: int
+    reference_id: Optional[uuid.UUID] = None # credit hold the movement belongs to, if any
+    created_at: Optional[datetime.datetime] = None
+    id: Optional[int] = None
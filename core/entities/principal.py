@@ -0,0 +1,10 @@
+import uuid
+from dataclasses import dataclass
+
+@dataclass(frozen=True)
+class Principal:
+    """The authenticated caller as resolved from an access token; no balance or password hash."""
+    id: uuid.UUID
+    username: str
+    is_active: bool = True
+    is_admin: bool = False
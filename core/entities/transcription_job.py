@@ -0,0 +1,29 @@
+import uuid
+import datetime
+from dataclasses import dataclass, field
+from typing import Optional
+
+@dataclass
+class TranscriptionJob:
+    """A queued transcription; the audio waits in a file at `audio_path` until a worker picks it up."""
+    user_id: uuid.UUID
+    model_name: str
+    audio_path: str
+    filename: str
+    content_type: Optional[str] = None
+    size_bytes: Optional[int] = None
+    language: Optional[str] = None
+    task: Optional[str] = None
+    callback_url: Optional[str] = None
+    status: str = 'queued' # 'queued', 'running', 'completed', 'failed'
+    attempts: int = 0
+    # When a worker may claim the job: for queued jobs the earliest start, for running ones the lease expiry
+    run_after: datetime.datetime = field(default_factory=lambda: datetime.datetime.now(datetime.timezone.utc))
+    prediction_id: Optional[uuid.UUID] = None
+    result_text: Optional[str] = None
+    error_message: Optional[str] = None
+    webhook_status: Optional[str] = None # 'delivered', 'failed'; None without a callback_url
+    created_at: datetime.datetime = field(default_factory=lambda: datetime.datetime.now(datetime.timezone.utc))
+    started_at: Optional[datetime.datetime] = None
+    finished_at: Optional[datetime.datetime] = None
+    id: uuid.UUID = field(default_factory=uuid.uuid4)
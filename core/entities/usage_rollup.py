@@ -0,0 +1,15 @@
+import uuid
+import datetime
+from dataclasses import dataclass
+
+@dataclass
+class UsageRollup:
+    """Usage totals of one user on one model for one UTC day."""
+    user_id: uuid.UUID
+    model_name: str
+    day: datetime.date
+    request_count: int = 0
+    success_count: int = 0
+    failed_count: int = 0
+    credits_charged: int = 0
+    audio_seconds: float = 0.0
@@ -0,0 +1,21 @@
+import abc
+import uuid
+import datetime
+from typing import List
+from ..entities.credit_hold import CreditHold
+
+
+class AbstractCreditHoldRepository(abc.ABC):
+    @abc.abstractmethod
+    async def add(self, hold: CreditHold) -> CreditHold:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def transition(self, hold_id: uuid.UUID, from_status: str, to_status: str) -> bool:
+        """Moves a hold between statuses only if it is still in `from_status`. Returns whether it did."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def expire_overdue(self, now: datetime.datetime) -> List[CreditHold]:
+        """Marks held holds past their expiry as 'expired' and returns them."""
+        raise NotImplementedError
@@ -0,0 +1,30 @@
+import abc
+import uuid
+from typing import List, Optional
+from ..entities.credit_ledger_entry import CreditLedgerEntry
+
+
+class AbstractCreditLedgerRepository(abc.ABC):
+    """
+    Append-only record of credit movements. Each write also moves the user's balance
+    counter in the same statement, so reading a balance never needs to sum the ledger.
+    """
+
+    @abc.abstractmethod
+    async def charge(self, user_id: uuid.UUID, amount: int, reference_id: Optional[uuid.UUID] = None) -> int:
+        """
+        Spends `amount` if the balance covers it and returns the new balance.
+        Raises InsufficientCreditsError otherwise.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def credit(
+        self, user_id: uuid.UUID, amount: int, kind: str, reference_id: Optional[uuid.UUID] = None
+    ) -> Optional[int]:
+        """Adds `amount` as a 'refund' or 'grant'. Returns the new balance, or None if the user doesn't exist."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def get_entries(self, user_id: uuid.UUID, limit: int = 100, offset: int = 0) -> List[CreditLedgerEntry]:
+        raise NotImplementedError
@@ -19,6 +19,11 @@ class AbstractMLModelRepository(abc.ABC):
     @abc.abstractmethod
     async def list_all(self) -> List[MLModel]:
         raise NotImplementedError
+
+    @abc.abstractmethod
+    async def get_catalog_version(self) -> int:
+        """Counter that changes whenever the set of models changes."""
+        raise NotImplementedError
     
 class AbstractMLModelService(abc.ABC):
     @abc.abstractmethod
@@ -1,7 +1,17 @@
 import abc
 import uuid
-from typing import List, Optional, Any
+import datetime
+from typing import AsyncIterator, Dict, List, Optional, Any, Tuple
 from ..entities.prediction import Prediction
+from ..entities.audio_input import AudioInput
+
+
+class PredictionServiceUnavailableError(Exception):
+    """The prediction backend can't take requests right now (e.g. every replica's circuit is open)."""
+
+    def __init__(self, message: str, retry_after: int = 5):
+        super().__init__(message)
+        self.retry_after = retry_after
 
 
 class AbstractPredictionRepository(abc.ABC):
@@ -9,6 +19,11 @@ class AbstractPredictionRepository(abc.ABC):
     async def add(self, prediction: Prediction) -> Prediction:
         raise NotImplementedError
 
+    @abc.abstractmethod
+    async def add_many(self, predictions: List[Prediction]) -> List[Prediction]:
+        """Inserts all predictions in one statement."""
+        raise NotImplementedError
+
     @abc.abstractmethod
     async def get_by_id(self, prediction_id: uuid.UUID) -> Optional[Prediction]:
         raise NotImplementedError
@@ -19,14 +34,46 @@ class AbstractPredictionRepository(abc.ABC):
     ) -> List[Prediction]:
         raise NotImplementedError
 
+    @abc.abstractmethod
+    async def get_page_by_user_id(
+        self,
+        user_id: uuid.UUID,
+        limit: int = 100,
+        after: Optional[Tuple[datetime.datetime, uuid.UUID]] = None,
+        include_output: bool = True,
+    ) -> List[Prediction]:
+        """
+        Newest-first page of a user's predictions strictly after the (timestamp, id) key `after`.
+        Without `include_output` the transcript is not loaded and output_data is None.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    def stream_rows(
+        self,
+        user_id: Optional[uuid.UUID] = None,
+        since: Optional[datetime.datetime] = None,
+        until: Optional[datetime.datetime] = None,
+        model_name: Optional[str] = None,
+        status: Optional[str] = None,
+        include_output: bool = True,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Yields predictions as plain dicts, oldest first, from a server-side cursor.
+        `user_id=None` means all users. Memory stays flat regardless of the result size.
+        """
+        raise NotImplementedError
+
 
 class AbstractPredictionService(abc.ABC):
     @abc.abstractmethod
     async def get_prediction(
         self,
         model_name,
-        file: tuple[str, bytes, str], # TODO: data class
+        file: AudioInput,
         lang: Optional[str] = None,
         task: Optional[str] = None,
-    ) -> Prediction:
+    ) -> Dict[str, Any]:
+        """Sends the audio to the ASR service and returns its JSON response."""
         raise NotImplementedError
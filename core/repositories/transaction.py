@@ -0,0 +1,13 @@
+import abc
+
+
+class AbstractTransactionManager(abc.ABC):
+    """Lets use cases end the current transaction early, e.g. before a long external call."""
+
+    @abc.abstractmethod
+    async def commit(self) -> None:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def rollback(self) -> None:
+        raise NotImplementedError
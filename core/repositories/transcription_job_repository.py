@@ -0,0 +1,54 @@
+import abc
+import uuid
+import datetime
+from typing import Optional
+from ..entities.transcription_job import TranscriptionJob
+
+
+class AbstractTranscriptionJobRepository(abc.ABC):
+    @abc.abstractmethod
+    async def add(self, job: TranscriptionJob) -> TranscriptionJob:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def get_by_id(self, job_id: uuid.UUID) -> Optional[TranscriptionJob]:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def claim(self, now: datetime.datetime, lease_until: datetime.datetime) -> Optional[TranscriptionJob]:
+        """
+        Marks the oldest due job as running until `lease_until` and returns it. Due are queued
+        jobs whose run_after has passed and running jobs whose lease expired (their worker died).
+        Concurrent workers never get the same job.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def finish(
+        self,
+        job_id: uuid.UUID,
+        attempt: int,
+        status: str,
+        prediction_id: Optional[uuid.UUID] = None,
+        result_text: Optional[str] = None,
+        error_message: Optional[str] = None,
+    ) -> Optional[TranscriptionJob]:
+        """
+        Moves a running job to 'completed' or 'failed'. Only applies while the job is still at
+        `attempt`, so a worker whose lease ran out can't overwrite the one that took over.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def requeue(
+        self, job_id: uuid.UUID, attempt: int, run_after: datetime.datetime, error_message: Optional[str] = None, count_attempt: bool = True
+    ) -> bool:
+        """
+        Puts a running job (still at `attempt`) back in the queue; `count_attempt=False` hands the
+        attempt back, e.g. on shutdown. Returns whether it did.
+        """
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def set_webhook_status(self, job_id: uuid.UUID, webhook_status: str) -> None:
+        raise NotImplementedError
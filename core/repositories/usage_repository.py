@@ -0,0 +1,25 @@
+import abc
+import uuid
+import datetime
+from typing import List, Optional, Tuple
+from ..entities.prediction import Prediction
+from ..entities.usage_rollup import UsageRollup
+
+
+class AbstractUsageRepository(abc.ABC):
+    @abc.abstractmethod
+    async def record(self, prediction: Prediction, audio_seconds: float = 0.0) -> None:
+        """Adds one recorded prediction to its (user, model, day) rollup."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def record_many(self, items: List[Tuple[Prediction, float]]) -> None:
+        """Adds (prediction, audio_seconds) pairs to their rollups in bulk."""
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def get_by_user_id(
+        self, user_id: uuid.UUID, since: Optional[datetime.date] = None, until: Optional[datetime.date] = None
+    ) -> List[UsageRollup]:
+        """Rollups for `since <= day < until`, ordered by day and model."""
+        raise NotImplementedError
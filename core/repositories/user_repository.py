@@ -3,6 +3,14 @@ import uuid
 from typing import Optional
 from ..entities.user import User
 
+
+class InsufficientCreditsError(Exception):
+    def __init__(self, user_id: uuid.UUID, required: int):
+        super().__init__(f"Insufficient credits. Required: {required}")
+        self.user_id = user_id
+        self.required = required
+
+
 class AbstractUserRepository(abc.ABC):
     @abc.abstractmethod
     async def add(self, user: User) -> User:
@@ -12,6 +20,10 @@ class AbstractUserRepository(abc.ABC):
     async def get_by_id(self, user_id: uuid.UUID) -> Optional[User]:
         raise NotImplementedError
 
+    @abc.abstractmethod
+    async def get_by_id_for_update(self, user_id: uuid.UUID) -> Optional[User]:
+        raise NotImplementedError
+
     @abc.abstractmethod
     async def get_by_username(self, username: str) -> Optional[User]:
         raise NotImplementedError
@@ -19,3 +31,11 @@ class AbstractUserRepository(abc.ABC):
     @abc.abstractmethod
     async def update_credits(self, user_id: uuid.UUID, new_credit_balance: int) -> Optional[User]:
         raise NotImplementedError
+
+    @abc.abstractmethod
+    async def set_active(self, user_id: uuid.UUID, is_active: bool) -> Optional[User]:
+        raise NotImplementedError
+
+    @abc.abstractmethod
+    async def update_password_hash(self, user_id: uuid.UUID, hashed_password: str) -> None:
+        raise NotImplementedError
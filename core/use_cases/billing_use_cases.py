@@ -0,0 +1,88 @@
+import uuid
+import datetime
+import logging
+from typing import List, Optional, Tuple
+
+from ..entities.credit_hold import CreditHold
+from ..repositories.user_repository import InsufficientCreditsError
+from ..repositories.credit_ledger_repository import AbstractCreditLedgerRepository
+from ..repositories.credit_hold_repository import AbstractCreditHoldRepository
+
+logger = logging.getLogger(__name__)
+
+
+class BillingUseCases:
+    """
+    Hold/capture/release reservation of credits. A hold deducts the cost up front so the
+    balance can't be spent twice while the prediction runs; capture keeps it, release and
+    expiry give it back. Every balance change goes through the ledger.
+    """
+
+    def __init__(
+        self,
+        ledger_repo: AbstractCreditLedgerRepository,
+        hold_repo: AbstractCreditHoldRepository,
+        hold_ttl_sec: int,
+    ):
+        self.ledger_repo = ledger_repo
+        self.hold_repo = hold_repo
+        self.hold_ttl_sec = hold_ttl_sec
+
+    async def reserve(self, user_id: uuid.UUID, amount: int, ttl_sec: Optional[int] = None) -> Tuple[CreditHold, int]:
+        """
+        Charges the cost with a single conditional statement and records the hold.
+        Returns the hold and the balance left after it; the caller commits right after.
+        `ttl_sec` overrides the default TTL, which only covers a single ASR call.
+        """
+        hold = CreditHold(
+            user_id=user_id,
+            amount=amount,
+            expires_at=datetime.datetime.now(datetime.timezone.utc)
+            + datetime.timedelta(seconds=ttl_sec if ttl_sec is not None else self.hold_ttl_sec),
+        )
+        credits_remaining = await self.ledger_repo.charge(user_id, amount, reference_id=hold.id)
+        return await self.hold_repo.add(hold), credits_remaining
+
+    async def capture(self, hold: CreditHold) -> None:
+        if await self.hold_repo.transition(hold.id, "held", "captured"):
+            return
+        # The hold expired (and was refunded) while the prediction ran; charge the work that was done
+        logger.warning(f"Credit hold {hold.id} expired before capture, charging user {hold.user_id} directly.")
+        try:
+            await self.ledger_repo.charge(hold.user_id, hold.amount, reference_id=hold.id)
+        except InsufficientCreditsError:
+            logger.error(f"User {hold.user_id} spent the expired hold {hold.id}; the prediction is not charged.")
+
+    async def release(self, hold: CreditHold) -> None:
+        if await self.hold_repo.transition(hold.id, "held", "released"):
+            await self.ledger_repo.credit(hold.user_id, hold.amount, "refund", reference_id=hold.id)
+
+    async def settle(self, hold: CreditHold, charged: int) -> Optional[int]:
+        """
+        Keeps `charged` of the hold and refunds the rest, e.g. for a batch with some failed files.
+        Returns the new balance if it changed.
+        """
+        if charged >= hold.amount:
+            await self.capture(hold)
+            return None
+        if charged <= 0:
+            if await self.hold_repo.transition(hold.id, "held", "released"):
+                return await self.ledger_repo.credit(hold.user_id, hold.amount, "refund", reference_id=hold.id)
+            return None
+        if await self.hold_repo.transition(hold.id, "held", "captured"):
+            return await self.ledger_repo.credit(hold.user_id, hold.amount - charged, "refund", reference_id=hold.id)
+        logger.warning(f"Credit hold {hold.id} expired before settlement, charging user {hold.user_id} directly.")
+        try:
+            return await self.ledger_repo.charge(hold.user_id, charged, reference_id=hold.id)
+        except InsufficientCreditsError:
+            logger.error(f"User {hold.user_id} spent the expired hold {hold.id}; {charged} credits are not charged.")
+            return None
+
+    async def release_expired_holds(self) -> List[CreditHold]:
+        """Refunds holds abandoned past their expiry, e.g. by a crashed worker."""
+        expired = await self.hold_repo.expire_overdue(datetime.datetime.now(datetime.timezone.utc))
+        for hold in expired:
+            await self.ledger_repo.credit(hold.user_id, hold.amount, "refund", reference_id=hold.id)
+        if expired:
+            logger.info(f"Released {len(expired)} expired credit holds.")
+        return expired
@@ -1,13 +1,22 @@
 import uuid
+import math
 import datetime
 import logging
-from typing import Tuple, List, Optional # Added Optional
-import io
+from typing import Any, Dict, Tuple, List, Optional # Added Optional
+import asyncio
 
 from ..entities.prediction import Prediction
+from ..entities.audio_input import AudioInput
 from ..repositories.user_repository import AbstractUserRepository
 from ..repositories.ml_model_repository import AbstractMLModelRepository
-from ..repositories.prediction_repository import AbstractPredictionRepository, AbstractPredictionService
+from ..repositories.prediction_repository import (
+    AbstractPredictionRepository,
+    AbstractPredictionService,
+    PredictionServiceUnavailableError,
+)
+from ..repositories.transaction import AbstractTransactionManager
+from ..repositories.usage_repository import AbstractUsageRepository
+from .billing_use_cases import BillingUseCases
 
 logger = logging.getLogger(__name__)
 
@@ -18,75 +27,103 @@ class PredictionUseCases:
         user_repo: AbstractUserRepository,
         model_repo: AbstractMLModelRepository,
         prediction_repo: AbstractPredictionRepository,
-        prediction_service: AbstractPredictionService
+        prediction_service: AbstractPredictionService,
+        usage_repo: AbstractUsageRepository,
+        billing: BillingUseCases,
+        tx: AbstractTransactionManager,
     ):
         self.user_repo = user_repo
         self.model_repo = model_repo
         self.prediction_repo = prediction_repo
         self.prediction_service = prediction_service
+        self.usage_repo = usage_repo
+        self.billing = billing
+        self.tx = tx
 
     async def make_prediction(
         self,
         user_id: uuid.UUID,
         model_name: str,
-        audio_file_content: bytes,
-        audio_filename: str,
-        audio_content_type: str,
+        audio: AudioInput,
         asr_language_param: Optional[str]=None,
         asr_task_param: Optional[str]=None
-    ) -> Tuple[Optional[str], uuid.UUID, str, str]: # (transcribed_text, prediction_db_id, model_identifier_str, status_str)
+    ) -> Tuple[Optional[str], uuid.UUID, str, str, int]: # (transcribed_text, prediction_db_id, model_identifier_str, status_str, credits_remaining)
 
         final_status_str = 'pending'
         cost_charged = 0
         error_message = None
         transcribed_text_from_asr = None
         prediction_db_id = None
+        audio_seconds = 0.0
 
 
         # Logged input data for PredictionDB
         logged_input_metadata = {
-            "original_filename": audio_filename,
-            "content_type": audio_content_type,
-            "size_bytes": len(audio_file_content),
+            "original_filename": audio.filename,
+            "content_type": audio.content_type,
+            "size_bytes": audio.size_bytes,
             "asr_language_param": asr_language_param,
             "asr_task_param": asr_task_param,
         }
 
+        # Phase 1: reserve the cost in a short transaction so the user row isn't locked during the ASR call
         try:
-            # Fetch user and DB model entry
-            user = await self.user_repo.get_by_id_for_update(user_id)
             db_model_entry = await self.model_repo.get_by_name(model_name)
             logged_input_metadata["requested_model_name"] = model_name
+            hold, credits_remaining = await self.billing.reserve(user_id, db_model_entry.cost)
+            await self.tx.commit()
+        except Exception as e:
+            await self.tx.rollback()
+            logger.warning(f"Prediction error for user {user_id}: {e}")
+            raise e
+
+        # Phase 2: call the external ASR service with no transaction open
+        unavailable_error = None
+        try:
+            asr_response_data = await self.prediction_service.get_prediction(
+                model_name=model_name,
+                file=audio,
+                lang=asr_language_param,
+                task=asr_task_param,
+            )
+            logger.debug(f"ASR service response data: {asr_response_data}")
+            if asr_response_data.get("audio_duration_sec") is not None:
+                audio_seconds = float(asr_response_data["audio_duration_sec"])
+                logged_input_metadata["audio_duration_sec"] = audio_seconds
+
+            if asr_response_data.get("status") == "success":
+                transcribed_text_from_asr = asr_response_data.get("transcribed_text")
+                final_status_str = 'success'
+                cost_charged = db_model_entry.cost
+            else:
+                final_status_str = 'failed'
+                error_message = asr_response_data.get("message", "ASR service indicated failure without details.")
+                logger.error(f"ASR service failed for {model_name}: {error_message}")
+
+        except PredictionServiceUnavailableError as e:
+            # Expected under overload, no traceback; surfaced to the caller as-is after bookkeeping
+            logger.warning(f"ASR service unavailable for {model_name}: {e}")
+            final_status_str = 'failed'
+            error_message = f"ASR service unavailable: {e}"
+            unavailable_error = e
+        except Exception as e:
+            logger.exception(f"Unexpected error calling ASR for {model_name}")
+            final_status_str = 'failed'
+            error_message = f"ASR service call failed: {e}"
+
+        # Size and hash are known once the upload has been streamed to the ASR service
+        logged_input_metadata["size_bytes"] = audio.size_bytes
+        logged_input_metadata["sha256"] = audio.sha256
+
+        # Phase 3: capture or release the hold and record the attempt in a second short transaction
+        try:
+            if final_status_str == 'success':
+                await self.billing.capture(hold)
+            else:
+                await self.billing.release(hold)
 
-            # Check Credits
-            if user.credits < db_model_entry.cost:
-                raise Exception(f"Insufficient credits. Required: {db_model_entry.cost}, Current: {user.credits}")
-
-            # Call External ASR Service
-            try:
-                asr_response_data = await self.prediction_service.get_prediction(
-                    model_name=model_name,
-                    file=io.BytesIO(audio_file_content), # TODO: dataclass
-                    lang=asr_language_param,
-                    task=asr_task_param,
-                )
-                logger.debug(f"ASR service response data: {asr_response_data}")
-
-                if asr_response_data.get("status") == "success":
-                    transcribed_text_from_asr = asr_response_data.get("transcribed_text")
-                    final_status_str = 'success'
-                    cost_charged = db_model_entry.cost 
-                else:
-                    final_status_str = 'failed'
-                    error_message = asr_response_data.get("message", "ASR service indicated failure without details.")
-                    logger.error(f"ASR service failed for {model_name}: {error_message}")
-
-            except Exception as e:
-                logger.exception(f"Unexpected error calling ASR for {model_name}")
-
-            # Record Prediction Attempt
             prediction_to_save = Prediction(
-                user_id=user.id,
+                user_id=user_id,
                 model_name=db_model_entry.name,
                 input_data=logged_input_metadata,
                 output_data=transcribed_text_from_asr,
@@ -97,20 +134,143 @@ class PredictionUseCases:
             )
             saved_prediction = await self.prediction_repo.add(prediction_to_save)
             prediction_db_id = saved_prediction.id
+            await self.usage_repo.record(saved_prediction, audio_seconds)
+            await self.tx.commit()
+        except Exception as e:
+            # The hold stays 'held' and is refunded by the expiry sweeper
+            await self.tx.rollback()
+            logger.warning(f"Prediction error for user {user_id}: {e}")
+            raise e
 
-            # Deduct Credits
-            if final_status_str == 'success':
-                await self.user_repo.update_credits(user.id, user.credits - cost_charged)
-                return transcribed_text_from_asr, prediction_db_id, model_name, final_status_str
-            else:
-                raise Exception(error_message or "ASR processing failed for an unknown reason.")
+        if final_status_str == 'success':
+            return transcribed_text_from_asr, prediction_db_id, model_name, final_status_str, credits_remaining
+        logger.warning(f"Prediction error for user {user_id}: {error_message}")
+        if unavailable_error is not None:
+            raise unavailable_error
+        raise Exception(error_message or "ASR processing failed for an unknown reason.")
 
+
+    async def make_batch_prediction(
+        self,
+        user_id: uuid.UUID,
+        model_name: str,
+        audio_files: List[AudioInput],
+        asr_language_param: Optional[str] = None,
+        asr_task_param: Optional[str] = None,
+        concurrency: int = 4,
+    ) -> Tuple[List[Dict[str, Any]], int]: # (per-file results in input order, credits_remaining)
+        """
+        Transcribes many files for one reservation: a single hold for the whole batch, at most
+        `concurrency` ASR calls in flight, then one settlement that refunds the failed files,
+        one bulk insert of the predictions and one usage upsert.
+        """
+        # Phase 1: one reservation for the whole batch
+        try:
+            db_model_entry = await self.model_repo.get_by_name(model_name)
+            if db_model_entry is None:
+                raise ValueError(f"Model '{model_name}' not found.")
+            # The hold must outlive every round of ASR calls, not just one, or the sweeper refunds it mid-batch
+            rounds = math.ceil(len(audio_files) / max(1, concurrency))
+            hold, credits_remaining = await self.billing.reserve(
+                user_id, db_model_entry.cost * len(audio_files), ttl_sec=rounds * self.billing.hold_ttl_sec
+            )
+            await self.tx.commit()
         except Exception as e:
-            logger.warning(f"Prediction error for user {user_id}: {e}")
-            raise e 
+            await self.tx.rollback()
+            logger.warning(f"Batch prediction error for user {user_id}: {e}")
+            raise e
+
+        # Phase 2: bounded fan-out to the ASR service, no transaction open
+        semaphore = asyncio.Semaphore(max(1, concurrency))
+
+        async def transcribe_one(audio: AudioInput) -> Tuple[str, Optional[str], Optional[str], float]:
+            async with semaphore:
+                try:
+                    response = await self.prediction_service.get_prediction(
+                        model_name=model_name,
+                        file=audio,
+                        lang=asr_language_param,
+                        task=asr_task_param,
+                    )
+                except Exception as e:
+                    logger.warning(f"ASR call failed for a batch item of user {user_id}: {e}")
+                    return 'failed', None, f"ASR service call failed: {e}", 0.0
+            audio_seconds = float(response.get("audio_duration_sec") or 0.0)
+            if response.get("status") == "success":
+                return 'success', response.get("transcribed_text"), None, audio_seconds
+            return 'failed', None, response.get("message", "ASR service indicated failure without details."), audio_seconds
 
+        outcomes = await asyncio.gather(*(transcribe_one(audio) for audio in audio_files))
+
+        # Phase 3: settle the hold and record everything in one short transaction
+        now = datetime.datetime.now(datetime.timezone.utc)
+        predictions: List[Prediction] = []
+        usage: List[Tuple[Prediction, float]] = []
+        for audio, (status, text, error, audio_seconds) in zip(audio_files, outcomes):
+            input_metadata = {
+                "original_filename": audio.filename,
+                "content_type": audio.content_type,
+                "size_bytes": audio.size_bytes,
+                "sha256": audio.sha256,
+                "asr_language_param": asr_language_param,
+                "asr_task_param": asr_task_param,
+                "requested_model_name": model_name,
+                "batch_hold_id": str(hold.id),
+            }
+            if audio_seconds:
+                input_metadata["audio_duration_sec"] = audio_seconds
+            prediction = Prediction(
+                user_id=user_id,
+                model_name=db_model_entry.name,
+                input_data=input_metadata,
+                output_data=text,
+                timestamp=now,
+                status=status,
+                cost_charged=db_model_entry.cost if status == 'success' else 0,
+                error_message=error,
+            )
+            predictions.append(prediction)
+            usage.append((prediction, audio_seconds))
+
+        charged = sum(p.cost_charged for p in predictions)
+        try:
+            new_balance = await self.billing.settle(hold, charged)
+            if new_balance is not None:
+                credits_remaining = new_balance
+            await self.prediction_repo.add_many(predictions)
+            await self.usage_repo.record_many(usage)
+            await self.tx.commit()
+        except Exception as e:
+            # The hold stays 'held' and is refunded by the expiry sweeper
+            await self.tx.rollback()
+            logger.warning(f"Batch prediction error for user {user_id}: {e}")
+            raise e
+
+        results = [
+            {
+                "filename": audio.filename,
+                "prediction_id": prediction.id,
+                "status": prediction.status,
+                "result": prediction.output_data,
+                "cost_charged": prediction.cost_charged,
+                "error_message": prediction.error_message,
+            }
+            for audio, prediction in zip(audio_files, predictions)
+        ]
+        return results, credits_remaining
 
     async def get_user_predictions(
         self, user_id: uuid.UUID, limit: int = 10, offset: int = 0
     ) -> List[Prediction]:
-        return await self.prediction_repo.get_by_user_id(user_id, limit=limit, offset=offset)
\ No newline at end of file
+        return await self.prediction_repo.get_by_user_id(user_id, limit=limit, offset=offset)
+
+    async def get_user_predictions_page(
+        self,
+        user_id: uuid.UUID,
+        limit: int = 10,
+        after: Optional[Tuple[datetime.datetime, uuid.UUID]] = None,
+        include_output: bool = True,
+    ) -> List[Prediction]:
+        return await self.prediction_repo.get_page_by_user_id(
+            user_id, limit=limit, after=after, include_output=include_output
+        )
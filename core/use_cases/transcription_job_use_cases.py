@@ -0,0 +1,139 @@
+import uuid
+import datetime
+import logging
+from typing import Optional
+
+from ..entities.audio_input import AudioInput
+from ..entities.transcription_job import TranscriptionJob
+from ..repositories.user_repository import AbstractUserRepository, InsufficientCreditsError
+from ..repositories.ml_model_repository import AbstractMLModelRepository
+from ..repositories.prediction_repository import PredictionServiceUnavailableError
+from ..repositories.transaction import AbstractTransactionManager
+from ..repositories.transcription_job_repository import AbstractTranscriptionJobRepository
+from .prediction_use_cases import PredictionUseCases
+
+logger = logging.getLogger(__name__)
+
+
+class TranscriptionJobUseCases:
+    """
+    Asynchronous transcriptions. Submitting only validates and queues the job; a worker
+    later claims it and runs it through PredictionUseCases, so the hold, the charge on
+    completion, the prediction record and the usage rollup work exactly as for a
+    synchronous request.
+    """
+
+    def __init__(
+        self,
+        job_repo: AbstractTranscriptionJobRepository,
+        user_repo: AbstractUserRepository,
+        model_repo: AbstractMLModelRepository,
+        tx: AbstractTransactionManager,
+        max_attempts: int = 3,
+        lease_sec: int = 3600,
+    ):
+        self.job_repo = job_repo
+        self.user_repo = user_repo
+        self.model_repo = model_repo
+        self.tx = tx
+        self.max_attempts = max_attempts
+        self.lease_sec = lease_sec
+
+    async def submit_job(self, job: TranscriptionJob) -> TranscriptionJob:
+        """
+        Queues the job. Credits are only checked here, not reserved: the hold is taken when a
+        worker starts the job and captured when it completes.
+        """
+        db_model_entry = await self.model_repo.get_by_name(job.model_name)
+        if db_model_entry is None:
+            raise ValueError(f"Model '{job.model_name}' not found.")
+        user = await self.user_repo.get_by_id(job.user_id)
+        if user is None or user.credits < db_model_entry.cost:
+            raise InsufficientCreditsError(job.user_id, db_model_entry.cost)
+
+        job = await self.job_repo.add(job)
+        await self.tx.commit()
+        logger.info(f"Queued transcription job {job.id} on '{job.model_name}' for user {job.user_id}")
+        return job
+
+    async def get_job(self, user_id: uuid.UUID, job_id: uuid.UUID) -> Optional[TranscriptionJob]:
+        job = await self.job_repo.get_by_id(job_id)
+        if job is None or job.user_id != user_id:
+            return None
+        return job
+
+    async def claim_next_job(self) -> Optional[TranscriptionJob]:
+        """
+        Leases the next due job and commits, so the row lock is held only for the claim.
+        A job that has used up its attempts is failed instead and returned already finished.
+        """
+        now = datetime.datetime.now(datetime.timezone.utc)
+        job = await self.job_repo.claim(now, now + datetime.timedelta(seconds=self.lease_sec))
+        await self.tx.commit()
+        if job is None or job.attempts <= self.max_attempts:
+            return job
+
+        # Only reachable through expired leases, i.e. the job's workers kept dying mid-job
+        logger.error(f"Transcription job {job.id} abandoned {job.attempts - 1} times, giving up.")
+        job = await self.job_repo.finish(
+            job.id, job.attempts, "failed", error_message=f"Gave up after {self.max_attempts} attempts."
+        )
+        await self.tx.commit()
+        return job
+
+    async def run_job(
+        self, job: TranscriptionJob, audio: AudioInput, prediction_use_cases: PredictionUseCases
+    ) -> Optional[TranscriptionJob]:
+        """
+        Runs a claimed job and records the outcome. Returns the updated job, or None if its
+        lease ran out meanwhile and another worker has taken it over.
+        """
+        try:
+            transcribed_text, prediction_id, _, _, _ = await prediction_use_cases.make_prediction(
+                user_id=job.user_id,
+                model_name=job.model_name,
+                audio=audio,
+                asr_language_param=job.language,
+                asr_task_param=job.task,
+            )
+        except PredictionServiceUnavailableError as e:
+            if job.attempts < self.max_attempts:
+                run_after = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=e.retry_after)
+                requeued = await self.job_repo.requeue(job.id, job.attempts, run_after, error_message=str(e))
+                await self.tx.commit()
+                if not requeued:
+                    logger.warning(f"Transcription job {job.id} was taken over by another worker; attempt {job.attempts} not requeued.")
+                    return None
+                logger.info(f"Transcription job {job.id} requeued: {e}")
+                job.status, job.run_after, job.error_message = "queued", run_after, str(e)
+                return job
+            finished = await self.job_repo.finish(job.id, job.attempts, "failed", error_message=str(e))
+        except Exception as e:
+            # InsufficientCreditsError included: the balance may have been spent since submission
+            logger.warning(f"Transcription job {job.id} failed: {e}")
+            finished = await self.job_repo.finish(job.id, job.attempts, "failed", error_message=str(e))
+        else:
+            finished = await self.job_repo.finish(
+                job.id, job.attempts, "completed", prediction_id=prediction_id, result_text=transcribed_text
+            )
+        await self.tx.commit()
+        if finished is None:
+            logger.warning(f"Transcription job {job.id} was taken over by another worker; result of attempt {job.attempts} dropped.")
+        return finished
+
+    async def fail_job(self, job: TranscriptionJob, error_message: str) -> Optional[TranscriptionJob]:
+        """Fails a claimed job that can't be run at all, e.g. because its audio is gone."""
+        finished = await self.job_repo.finish(job.id, job.attempts, "failed", error_message=error_message)
+        await self.tx.commit()
+        return finished
+
+    async def release_job(self, job: TranscriptionJob) -> None:
+        """Hands an interrupted job (e.g. on shutdown) straight back to the queue without using up an attempt."""
+        await self.job_repo.requeue(
+            job.id, job.attempts, datetime.datetime.now(datetime.timezone.utc), count_attempt=False
+        )
+        await self.tx.commit()
+
+    async def record_webhook(self, job_id: uuid.UUID, delivered: bool) -> None:
+        await self.job_repo.set_webhook_status(job_id, "delivered" if delivered else "failed")
+        await self.tx.commit()
@@ -0,0 +1,27 @@
+import uuid
+import datetime
+from typing import Any, Dict, Optional
+
+from ..repositories.usage_repository import AbstractUsageRepository
+
+
+class UsageUseCases:
+    def __init__(self, usage_repo: AbstractUsageRepository):
+        self.usage_repo = usage_repo
+
+    async def get_usage_summary(
+        self, user_id: uuid.UUID, since: Optional[datetime.date] = None, until: Optional[datetime.date] = None
+    ) -> Dict[str, Any]:
+        """Totals and per-day, per-model rows; reads O(days x models) rollup rows, never raw predictions."""
+        rollups = await self.usage_repo.get_by_user_id(user_id, since=since, until=until)
+        return {
+            "user_id": user_id,
+            "since": since,
+            "until": until,
+            "request_count": sum(r.request_count for r in rollups),
+            "success_count": sum(r.success_count for r in rollups),
+            "failed_count": sum(r.failed_count for r in rollups),
+            "credits_charged": sum(r.credits_charged for r in rollups),
+            "audio_seconds": round(sum(r.audio_seconds for r in rollups), 3),
+            "days": rollups,
+        }
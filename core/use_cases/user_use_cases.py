@@ -1,13 +1,16 @@
 import uuid
-from typing import Optional
+from typing import List, Optional
 from ..entities.user import User
+from ..entities.credit_ledger_entry import CreditLedgerEntry
 from ..repositories.user_repository import AbstractUserRepository
+from ..repositories.credit_ledger_repository import AbstractCreditLedgerRepository
 from infrastructure.auth.hashing import Hasher
 
 
 class UserUseCases:
-    def __init__(self, user_repo: AbstractUserRepository):
+    def __init__(self, user_repo: AbstractUserRepository, ledger_repo: AbstractCreditLedgerRepository):
         self.user_repo = user_repo
+        self.ledger_repo = ledger_repo
         self.hasher = Hasher()
 
     async def register_user(
@@ -17,11 +20,13 @@ class UserUseCases:
         if existing_user:
             raise ValueError("Username already registered")
 
-        hashed_password = self.hasher.get_password_hash(password)
-        new_user = User(
-            username=username, hashed_password=hashed_password, credits=initial_credits
-        )
-        return await self.user_repo.add(new_user)
+        hashed_password = await self.hasher.hash_password(password)
+        new_user = User(username=username, hashed_password=hashed_password, credits=0)
+        user = await self.user_repo.add(new_user)
+        # Starting credits are a ledger grant so the ledger always sums to the balance
+        if initial_credits:
+            user.credits = await self.ledger_repo.credit(user.id, initial_credits, "grant")
+        return user
 
     async def get_user_by_username(self, username: str) -> Optional[User]:
         return await self.user_repo.get_by_username(username)
@@ -33,10 +38,24 @@ class UserUseCases:
         user = await self.get_user_by_username(username)
         if not user or not user.is_active:
             return None
-        if not self.hasher.verify_password(password, user.hashed_password):
+        valid, new_hash = await self.hasher.verify_and_update_password(password, user.hashed_password)
+        if not valid:
             return None
+        if new_hash:
+            # Work factor changed since this hash was made; upgrade it while we have the password
+            await self.user_repo.update_password_hash(user.id, new_hash)
+            user.hashed_password = new_hash
+        return user
+
+    async def set_user_active(self, user_id: uuid.UUID, is_active: bool) -> User:
+        user = await self.user_repo.set_active(user_id, is_active)
+        if not user:
+            raise ValueError("User not found")
         return user
 
+    async def get_credit_ledger(self, user_id: uuid.UUID, limit: int = 100, offset: int = 0) -> List[CreditLedgerEntry]:
+        return await self.ledger_repo.get_entries(user_id, limit=limit, offset=offset)
+
     async def check_user_credits(self, user_id: uuid.UUID) -> int:
         user = await self.user_repo.get_by_id(user_id)
         if not user:
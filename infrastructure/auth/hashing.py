@@ -1,6 +1,109 @@
+import asyncio
+import logging
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional, Tuple
+
 from passlib.context import CryptContext
 
-pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+from config.settings import settings
+
+logger = logging.getLogger(__name__)
+
+# Hashes made with a different work factor are flagged by needs_update and rehashed on login
+pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto", bcrypt__rounds=settings.BCRYPT_ROUNDS)
+
+
+class HashingBusyError(Exception):
+    """Raised when the password hashing queue has no free slots left."""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Password hashing queue is full.")
+        self.retry_after = retry_after
+
+
+class HashingExecutor:
+    """
+    Bounded thread pool for bcrypt, which is CPU-bound and releases the GIL while hashing.
+    At most `workers` hashes run at once and `queue_size` more wait; beyond that callers get
+    HashingBusyError, so a login storm queues up here instead of stalling the event loop.
+    """
+
+    def __init__(self, workers: int = 2, queue_size: int = 64, retry_after: int = 1):
+        self.workers = max(1, workers)
+        self.queue_size = max(0, queue_size)
+        self.retry_after = retry_after
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="bcrypt")
+        self._lock = threading.Lock()
+        self._pending = 0 # queued + running
+        self._running = 0
+        self._completed = 0
+        self._rejected = 0
+        self._wait_sec_total = 0.0
+        self._run_sec_total = 0.0
+
+    @property
+    def capacity(self) -> int:
+        return self.workers + self.queue_size
+
+    async def submit(self, fn: Callable[..., Any], *args: Any) -> Any:
+        with self._lock:
+            if self._pending >= self.capacity:
+                self._rejected += 1
+                logger.warning(f"Password hashing queue is full ({self._pending}/{self.capacity}).")
+                raise HashingBusyError(self.retry_after)
+            self._pending += 1
+
+        try:
+            future = self._pool.submit(self._run, time.perf_counter(), fn, *args)
+        except Exception:
+            self._release()
+            raise
+        future.add_done_callback(lambda _: self._release())
+        return await asyncio.wrap_future(future)
+
+    def _run(self, submitted_at: float, fn: Callable[..., Any], *args: Any) -> Any:
+        started = time.perf_counter()
+        with self._lock:
+            self._running += 1
+            self._wait_sec_total += started - submitted_at
+        try:
+            return fn(*args)
+        finally:
+            with self._lock:
+                self._running -= 1
+                self._completed += 1
+                self._run_sec_total += time.perf_counter() - started
+
+    def _release(self) -> None:
+        with self._lock:
+            self._pending -= 1
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            completed = max(1, self._completed)
+            return {
+                "workers": self.workers,
+                "queue_size": self.queue_size,
+                "running": self._running,
+                "queued": self._pending - self._running,
+                "completed": self._completed,
+                "rejected": self._rejected,
+                "avg_wait_ms": round(1000 * self._wait_sec_total / completed, 2),
+                "avg_hash_ms": round(1000 * self._run_sec_total / completed, 2),
+                "bcrypt_rounds": settings.BCRYPT_ROUNDS,
+            }
+
+    def shutdown(self, wait: bool = False) -> None:
+        self._pool.shutdown(wait=wait, cancel_futures=True)
+
+
+hashing_executor = HashingExecutor(
+    workers=settings.PASSWORD_HASH_WORKERS,
+    queue_size=settings.PASSWORD_HASH_QUEUE_SIZE,
+)
+
 
 class Hasher:
     @staticmethod
@@ -10,3 +113,12 @@ class Hasher:
     @staticmethod
     def get_password_hash(password: str) -> str:
         return pwd_context.hash(password)
+
+    @staticmethod
+    async def verify_and_update_password(plain_password: str, hashed_password: str) -> Tuple[bool, Optional[str]]:
+        """Verifies off the event loop. Returns (valid, new_hash); new_hash is set when the work factor changed."""
+        return await hashing_executor.submit(pwd_context.verify_and_update, plain_password, hashed_password)
+
+    @staticmethod
+    async def hash_password(password: str) -> str:
+        return await hashing_executor.submit(pwd_context.hash, password)
@@ -0,0 +1,83 @@
+import time
+import uuid
+import logging
+from collections import OrderedDict
+from typing import Dict, Optional, Set, Tuple
+
+from config.settings import settings
+from core.entities.principal import Principal
+
+logger = logging.getLogger(__name__)
+
+
+class PrincipalCache:
+    """
+    In-process LRU of principals resolved from access tokens, keyed by token.
+    An entry lives for at most `ttl_sec` and never past the token's `exp`, so an expired
+    token can't be served from cache. Entries are dropped explicitly when a user changes
+    (e.g. is deactivated); other API processes catch up within `ttl_sec`.
+    """
+
+    def __init__(self, ttl_sec: int, max_entries: int):
+        self.ttl_sec = ttl_sec
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[str, Tuple[Principal, float]]" = OrderedDict()
+        self._tokens_by_user: Dict[uuid.UUID, Set[str]] = {}
+        self.hits = 0
+        self.misses = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.ttl_sec > 0 and self.max_entries > 0
+
+    def get(self, token: str) -> Optional[Principal]:
+        entry = self._entries.get(token)
+        if entry is None:
+            self.misses += 1
+            return None
+        principal, expires_at = entry
+        if time.time() >= expires_at:
+            self._remove(token)
+            self.misses += 1
+            return None
+        self._entries.move_to_end(token)
+        self.hits += 1
+        return principal
+
+    def put(self, token: str, principal: Principal, token_exp: Optional[float]) -> None:
+        if not self.enabled:
+            return
+        expires_at = time.time() + self.ttl_sec
+        if token_exp is not None:
+            expires_at = min(expires_at, float(token_exp))
+        self._remove(token)
+        self._entries[token] = (principal, expires_at)
+        self._tokens_by_user.setdefault(principal.id, set()).add(token)
+        while len(self._entries) > self.max_entries:
+            self._remove(next(iter(self._entries)))
+
+    def invalidate_user(self, user_id: uuid.UUID) -> None:
+        tokens = self._tokens_by_user.pop(user_id, set())
+        for token in tokens:
+            self._entries.pop(token, None)
+        if tokens:
+            logger.info(f"Dropped {len(tokens)} cached principals for user {user_id}.")
+
+    def _remove(self, token: str) -> None:
+        entry = self._entries.pop(token, None)
+        if entry is None:
+            return
+        user_tokens = self._tokens_by_user.get(entry[0].id)
+        if user_tokens is not None:
+            user_tokens.discard(token)
+            if not user_tokens:
+                del self._tokens_by_user[entry[0].id]
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+principal_cache = PrincipalCache(
+    ttl_sec=settings.PRINCIPAL_CACHE_TTL_SEC,
+    max_entries=settings.PRINCIPAL_CACHE_MAX_ENTRIES,
+)
@@ -0,0 +1,63 @@
+import uuid
+import datetime
+from typing import List
+from sqlalchemy import update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.entities.credit_hold import CreditHold
+from core.repositories.credit_hold_repository import AbstractCreditHoldRepository
+from .models import CreditHoldDB
+
+
+class SQLAlchemyCreditHoldRepository(AbstractCreditHoldRepository):
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    def _to_entity(self, db_hold: CreditHoldDB) -> CreditHold | None:
+        if not db_hold:
+            return None
+        return CreditHold(
+            id=db_hold.id,
+            user_id=db_hold.user_id,
+            amount=db_hold.amount,
+            status=db_hold.status,
+            created_at=db_hold.created_at,
+            expires_at=db_hold.expires_at,
+        )
+
+    def _to_db_model(self, hold: CreditHold) -> CreditHoldDB:
+        return CreditHoldDB(
+            id=hold.id,
+            user_id=hold.user_id,
+            amount=hold.amount,
+            status=hold.status,
+            created_at=hold.created_at,
+            expires_at=hold.expires_at,
+        )
+
+    async def add(self, hold: CreditHold) -> CreditHold:
+        """Adds a credit hold using the stored session."""
+        self.session.add(self._to_db_model(hold))
+        await self.session.flush()
+        return hold
+
+    async def transition(self, hold_id: uuid.UUID, from_status: str, to_status: str) -> bool:
+        """Conditional status change; the WHERE on status makes capture/release/expiry race-free."""
+        stmt = (
+            update(CreditHoldDB)
+            .where(CreditHoldDB.id == hold_id, CreditHoldDB.status == from_status)
+            .values(status=to_status)
+        )
+        result = await self.session.execute(stmt)
+        return result.rowcount == 1
+
+    async def expire_overdue(self, now: datetime.datetime) -> List[CreditHold]:
+        stmt = (
+            update(CreditHoldDB)
+            .where(CreditHoldDB.status == "held", CreditHoldDB.expires_at < now)
+            .values(status="expired")
+            .returning(CreditHoldDB)
+        )
+        result = await self.session.execute(stmt)
+        return [self._to_entity(db_hold) for db_hold in result.scalars().all()]
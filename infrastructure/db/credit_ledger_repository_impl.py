@@ -0,0 +1,87 @@
+import uuid
+from typing import List, Optional
+from sqlalchemy import select, update, insert, literal, func
+from sqlalchemy.dialects.postgresql import UUID
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.entities.credit_ledger_entry import CreditLedgerEntry
+from core.repositories.credit_ledger_repository import AbstractCreditLedgerRepository
+from core.repositories.user_repository import InsufficientCreditsError
+from .models import UserDB, CreditLedgerDB
+
+
+class SQLAlchemyCreditLedgerRepository(AbstractCreditLedgerRepository):
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    def _to_entity(self, db_entry: CreditLedgerDB) -> CreditLedgerEntry | None:
+        if not db_entry:
+            return None
+        return CreditLedgerEntry(
+            id=db_entry.id,
+            user_id=db_entry.user_id,
+            amount=db_entry.amount,
+            kind=db_entry.kind,
+            balance_after=db_entry.balance_after,
+            reference_id=db_entry.reference_id,
+            created_at=db_entry.created_at,
+        )
+
+    async def _post(
+        self, user_id: uuid.UUID, amount: int, kind: str, reference_id: Optional[uuid.UUID], require_funds: bool
+    ) -> Optional[int]:
+        """
+        WITH moved AS (UPDATE users SET credits = credits + :amount ... RETURNING id, credits)
+        INSERT INTO credit_ledger (...) SELECT ... FROM moved RETURNING balance_after
+        One round trip; the user row is locked only until the surrounding short transaction commits.
+        """
+        conditions = [UserDB.id == user_id]
+        if require_funds:
+            conditions.append(UserDB.credits >= -amount)
+        moved = (
+            update(UserDB)
+            .where(*conditions)
+            .values(credits=UserDB.credits + amount)
+            .returning(UserDB.id, UserDB.credits)
+            .cte("moved")
+        )
+        stmt = (
+            insert(CreditLedgerDB)
+            .from_select(
+                ["user_id", "amount", "kind", "reference_id", "balance_after", "created_at"],
+                select(
+                    moved.c.id,
+                    literal(amount),
+                    literal(kind),
+                    literal(reference_id, UUID(as_uuid=True)),
+                    moved.c.credits,
+                    func.now(),
+                ),
+            )
+            .returning(CreditLedgerDB.balance_after)
+        )
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none()
+
+    async def charge(self, user_id: uuid.UUID, amount: int, reference_id: Optional[uuid.UUID] = None) -> int:
+        new_balance = await self._post(user_id, -amount, "charge", reference_id, require_funds=True)
+        if new_balance is None:
+            raise InsufficientCreditsError(user_id, amount)
+        return new_balance
+
+    async def credit(
+        self, user_id: uuid.UUID, amount: int, kind: str, reference_id: Optional[uuid.UUID] = None
+    ) -> Optional[int]:
+        return await self._post(user_id, amount, kind, reference_id, require_funds=False)
+
+    async def get_entries(self, user_id: uuid.UUID, limit: int = 100, offset: int = 0) -> List[CreditLedgerEntry]:
+        stmt = (
+            select(CreditLedgerDB)
+            .where(CreditLedgerDB.user_id == user_id)
+            .order_by(CreditLedgerDB.id.desc())
+            .limit(limit)
+            .offset(offset)
+        )
+        result = await self.session.execute(stmt)
+        return [self._to_entity(db_entry) for db_entry in result.scalars().all()]
@@ -0,0 +1,39 @@
+import asyncio
+import logging
+
+from config.settings import settings
+from core.use_cases.billing_use_cases import BillingUseCases
+from .database import AsyncSessionFactory
+from .credit_ledger_repository_impl import SQLAlchemyCreditLedgerRepository
+from .credit_hold_repository_impl import SQLAlchemyCreditHoldRepository
+
+logger = logging.getLogger(__name__)
+
+
+async def release_expired_holds_once() -> int:
+    """Refunds expired credit holds in one short transaction. Returns how many were released."""
+    async with AsyncSessionFactory() as session:
+        billing = BillingUseCases(
+            ledger_repo=SQLAlchemyCreditLedgerRepository(session=session),
+            hold_repo=SQLAlchemyCreditHoldRepository(session=session),
+            hold_ttl_sec=settings.CREDIT_HOLD_TTL_SEC,
+        )
+        try:
+            expired = await billing.release_expired_holds()
+            await session.commit()
+        except Exception:
+            await session.rollback()
+            raise
+    return len(expired)
+
+
+async def run_hold_sweeper() -> None:
+    """Background loop started from the app lifespan; cancelled on shutdown."""
+    while True:
+        try:
+            await release_expired_holds_once()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Credit hold sweep failed")
+        await asyncio.sleep(settings.CREDIT_HOLD_SWEEP_INTERVAL_SEC)
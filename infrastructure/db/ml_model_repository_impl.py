@@ -1,11 +1,14 @@
 import uuid
 from typing import Optional, List
 from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession # Keep import here
 
 from core.entities.ml_model import MLModel
 from core.repositories.ml_model_repository import AbstractMLModelRepository
-from .models import MLModelDB
+from .models import MLModelDB, CatalogVersionDB
+
+CATALOG_NAME = "ml_models"
 
 class SQLAlchemyMLModelRepository(AbstractMLModelRepository):
 
@@ -40,8 +43,17 @@ class SQLAlchemyMLModelRepository(AbstractMLModelRepository):
         self.session.add(db_model)
         await self.session.flush()
         await self.session.refresh(db_model)
+        await self._bump_catalog_version()
         return self._to_entity(db_model)
 
+    async def _bump_catalog_version(self) -> None:
+        stmt = insert(CatalogVersionDB).values(name=CATALOG_NAME, version=1)
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[CatalogVersionDB.name],
+            set_={"version": CatalogVersionDB.version + 1},
+        )
+        await self.session.execute(stmt)
+
     async def get_by_id(self, model_id: uuid.UUID) -> Optional[MLModel]:
         """Gets a model by ID using the stored session."""
         stmt = select(MLModelDB).where(MLModelDB.id == model_id)
@@ -61,4 +73,10 @@ class SQLAlchemyMLModelRepository(AbstractMLModelRepository):
         stmt = select(MLModelDB).order_by(MLModelDB.name)
         result = await self.session.execute(stmt)
         db_models = result.scalars().all()
-        return [self._to_entity(db_model) for db_model in db_models if db_model] # Add check
\ No newline at end of file
+        return [self._to_entity(db_model) for db_model in db_models if db_model] # Add check
+
+    async def get_catalog_version(self) -> int:
+        """Reads the catalog counter using the stored session; 0 before the first model is added."""
+        stmt = select(CatalogVersionDB.version).where(CatalogVersionDB.name == CATALOG_NAME)
+        result = await self.session.execute(stmt)
+        return result.scalar_one_or_none() or 0
@@ -0,0 +1,105 @@
+import asyncio
+import logging
+import uuid
+from typing import Dict, List, Optional
+
+from config.settings import settings
+from core.entities.ml_model import MLModel
+from core.repositories.ml_model_repository import AbstractMLModelRepository
+from .database import AsyncSessionFactory
+from .ml_model_repository_impl import SQLAlchemyMLModelRepository
+
+logger = logging.getLogger(__name__)
+
+
+class ModelCatalog:
+    """
+    Process-wide snapshot of the ml_models table, tagged with the catalog version it was read at.
+    A background task reloads it when the version row changes (another process registered a
+    model); local writes mark it stale, and a lookup miss re-checks the version before failing.
+    """
+
+    def __init__(self):
+        self.version: Optional[int] = None
+        self._by_name: Dict[str, MLModel] = {}
+        self._stale = True
+        self._lock = asyncio.Lock()
+
+    @property
+    def loaded(self) -> bool:
+        return self.version is not None and not self._stale
+
+    def get(self, name: str) -> Optional[MLModel]:
+        return self._by_name.get(name)
+
+    def list_all(self) -> List[MLModel]:
+        return sorted(self._by_name.values(), key=lambda model: model.name)
+
+    def mark_stale(self) -> None:
+        self._stale = True
+
+    async def refresh(self, repo: AbstractMLModelRepository, force: bool = False) -> bool:
+        """Reloads from `repo` if the catalog version moved. Returns whether it reloaded."""
+        async with self._lock:
+            version = await repo.get_catalog_version()
+            if not force and not self._stale and version == self.version:
+                return False
+            models = await repo.list_all()
+            self._by_name = {model.name: model for model in models}
+            self.version = version
+            self._stale = False
+        logger.info(f"Model catalog loaded: {len(models)} models at version {version}.")
+        return True
+
+
+model_catalog = ModelCatalog()
+
+
+class CachedMLModelRepository(AbstractMLModelRepository):
+    """Serves name lookups and listings from the model catalog; everything else goes to `inner`."""
+
+    def __init__(self, inner: AbstractMLModelRepository, catalog: ModelCatalog):
+        self.inner = inner
+        self.catalog = catalog
+
+    async def add(self, model: MLModel) -> MLModel:
+        added = await self.inner.add(model)
+        self.catalog.mark_stale()
+        return added
+
+    async def get_by_id(self, model_id: uuid.UUID) -> Optional[MLModel]:
+        return await self.inner.get_by_id(model_id)
+
+    async def get_by_name(self, name: str) -> Optional[MLModel]:
+        if self.catalog.loaded:
+            model = self.catalog.get(name)
+            if model is not None:
+                return model
+        # Unknown name or stale snapshot: it may have just been registered elsewhere
+        await self.catalog.refresh(self.inner)
+        return self.catalog.get(name)
+
+    async def list_all(self) -> List[MLModel]:
+        if not self.catalog.loaded:
+            await self.catalog.refresh(self.inner)
+        return self.catalog.list_all()
+
+    async def get_catalog_version(self) -> int:
+        return await self.inner.get_catalog_version()
+
+
+async def refresh_model_catalog(force: bool = False) -> bool:
+    async with AsyncSessionFactory() as session:
+        return await model_catalog.refresh(SQLAlchemyMLModelRepository(session=session), force=force)
+
+
+async def run_catalog_refresher() -> None:
+    """Background loop started from the app lifespan; cancelled on shutdown."""
+    while True:
+        await asyncio.sleep(settings.MODEL_CATALOG_REFRESH_SEC)
+        try:
+            await refresh_model_catalog()
+        except asyncio.CancelledError:
+            raise
+        except Exception:
+            logger.exception("Model catalog refresh failed")
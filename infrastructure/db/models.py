@@ -1,10 +1,11 @@
 import uuid
 import datetime
 from sqlalchemy import (
-    Column, String, Integer, Boolean, DateTime, ForeignKey, JSON, Text
+    Column, String, Integer, BigInteger, Boolean, Date, DateTime, Float, ForeignKey, JSON, Text, Index
 )
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import relationship
+from sqlalchemy.sql import func
 from .database import Base
 
 class UserDB(Base):
@@ -34,6 +35,14 @@ class MLModelDB(Base):
     predictions = relationship("PredictionDB", back_populates="model")
 
 
+class CatalogVersionDB(Base):
+    """One counter per cached table, bumped on every write so API processes know to reload."""
+    __tablename__ = "catalog_versions"
+
+    name = Column(String, primary_key=True)
+    version = Column(BigInteger, nullable=False, default=0)
+
+
 class PredictionDB(Base):
     __tablename__ = "predictions"
 
@@ -49,3 +58,82 @@ class PredictionDB(Base):
 
     user = relationship("UserDB", back_populates="predictions")
     model = relationship("MLModelDB", back_populates="predictions")
+
+
+# Serves keyset pagination of a user's history newest-first: (timestamp, id) < cursor
+Index(
+    "ix_predictions_user_id_timestamp_id",
+    PredictionDB.user_id, PredictionDB.timestamp.desc(), PredictionDB.id.desc(),
+)
+
+
+class CreditHoldDB(Base):
+    __tablename__ = "credit_holds"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
+    amount = Column(Integer, nullable=False)
+    status = Column(String, nullable=False, default="held") # 'held', 'captured', 'released', 'expired'
+    created_at = Column(DateTime(timezone=True), default=datetime.datetime.utcnow, nullable=False)
+    expires_at = Column(DateTime(timezone=True), nullable=False)
+
+    # The sweeper looks for held holds past their expiry
+    __table_args__ = (Index("ix_credit_holds_status_expires_at", "status", "expires_at"),)
+
+
+class CreditLedgerDB(Base):
+    """Append-only; users.credits is the running total of these rows."""
+    __tablename__ = "credit_ledger"
+
+    id = Column(BigInteger, primary_key=True, autoincrement=True)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False)
+    amount = Column(Integer, nullable=False) # negative for charges
+    kind = Column(String, nullable=False) # 'charge', 'refund', 'grant'
+    reference_id = Column(UUID(as_uuid=True), nullable=True) # credit hold id
+    balance_after = Column(Integer, nullable=False)
+    created_at = Column(DateTime(timezone=True), server_default=func.now(), nullable=False)
+
+    __table_args__ = (Index("ix_credit_ledger_user_id_id", "user_id", "id"),)
+
+
+class UsageRollupDB(Base):
+    """Per user, model and UTC day totals, upserted as each prediction is recorded."""
+    __tablename__ = "usage_rollups"
+
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), primary_key=True)
+    model_name = Column(Text, primary_key=True)
+    day = Column(Date, primary_key=True)
+    request_count = Column(Integer, nullable=False, default=0)
+    success_count = Column(Integer, nullable=False, default=0)
+    failed_count = Column(Integer, nullable=False, default=0)
+    credits_charged = Column(BigInteger, nullable=False, default=0)
+    audio_seconds = Column(Float, nullable=False, default=0.0)
+
+
+class TranscriptionJobDB(Base):
+    """Durable queue of asynchronous transcriptions, claimed by workers with FOR UPDATE SKIP LOCKED."""
+    __tablename__ = "transcription_jobs"
+
+    id = Column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
+    user_id = Column(UUID(as_uuid=True), ForeignKey("users.id"), nullable=False, index=True)
+    model_name = Column(Text, ForeignKey("ml_models.name"), nullable=False)
+    audio_path = Column(Text, nullable=False)
+    filename = Column(Text, nullable=False)
+    content_type = Column(String, nullable=True)
+    size_bytes = Column(BigInteger, nullable=True)
+    language = Column(String, nullable=True)
+    task = Column(String, nullable=True)
+    callback_url = Column(Text, nullable=True)
+    status = Column(String, nullable=False, default="queued") # 'queued', 'running', 'completed', 'failed'
+    attempts = Column(Integer, nullable=False, default=0)
+    run_after = Column(DateTime(timezone=True), nullable=False) # lease expiry while running
+    prediction_id = Column(UUID(as_uuid=True), ForeignKey("predictions.id"), nullable=True)
+    result_text = Column(Text, nullable=True)
+    error_message = Column(Text, nullable=True)
+    webhook_status = Column(String, nullable=True)
+    created_at = Column(DateTime(timezone=True), default=datetime.datetime.utcnow, nullable=False)
+    started_at = Column(DateTime(timezone=True), nullable=True)
+    finished_at = Column(DateTime(timezone=True), nullable=True)
+
+    # Workers look for queued or lease-expired running jobs in run_after order
+    __table_args__ = (Index("ix_transcription_jobs_status_run_after", "status", "run_after"),)
@@ -1,6 +1,8 @@
 import uuid
-from typing import List, Optional
-from sqlalchemy import select
+import datetime
+from typing import Any, AsyncIterator, Dict, List, Optional, Tuple
+from sqlalchemy import insert, select, tuple_
+from sqlalchemy.orm import defer
 from sqlalchemy.ext.asyncio import AsyncSession # Keep import here
 
 from core.entities.prediction import Prediction
@@ -12,7 +14,7 @@ class SQLAlchemyPredictionRepository(AbstractPredictionRepository):
     def __init__(self, session: AsyncSession):
         self.session = session # Store session injected via constructor
 
-    def _to_entity(self, db_pred: PredictionDB) -> Prediction | None:
+    def _to_entity(self, db_pred: PredictionDB, include_output: bool = True) -> Prediction | None:
         if not db_pred:
             return None
         return Prediction(
@@ -20,7 +22,7 @@ class SQLAlchemyPredictionRepository(AbstractPredictionRepository):
             user_id=db_pred.user_id,
             model_name=db_pred.model_name,
             input_data=db_pred.input_data,
-            output_data=db_pred.output_data,
+            output_data=db_pred.output_data if include_output else None, # deferred column, never lazy-load it
             timestamp=db_pred.timestamp,
             status=db_pred.status,
             cost_charged=db_pred.cost_charged,
@@ -48,6 +50,25 @@ class SQLAlchemyPredictionRepository(AbstractPredictionRepository):
         # No refresh typically needed if entity default factory sets ID
         return prediction
 
+    async def add_many(self, predictions: List[Prediction]) -> List[Prediction]:
+        """Bulk-inserts prediction records in a single INSERT using the stored session."""
+        if predictions:
+            await self.session.execute(insert(PredictionDB), [
+                {
+                    "id": prediction.id,
+                    "user_id": prediction.user_id,
+                    "model_name": prediction.model_name,
+                    "input_data": prediction.input_data,
+                    "output_data": prediction.output_data,
+                    "timestamp": prediction.timestamp,
+                    "status": prediction.status,
+                    "cost_charged": prediction.cost_charged,
+                    "error_message": prediction.error_message,
+                }
+                for prediction in predictions
+            ])
+        return predictions
+
     async def get_by_id(self, prediction_id: uuid.UUID) -> Optional[Prediction]:
         """Gets a prediction by ID using the stored session."""
         stmt = select(PredictionDB).where(PredictionDB.id == prediction_id)
@@ -65,3 +86,54 @@ class SQLAlchemyPredictionRepository(AbstractPredictionRepository):
         result = await self.session.execute(stmt)
         db_preds = result.scalars().all()
         return [self._to_entity(db_pred) for db_pred in db_preds if db_pred] # Add check
+
+    async def get_page_by_user_id(
+        self,
+        user_id: uuid.UUID,
+        limit: int = 100,
+        after: Optional[Tuple[datetime.datetime, uuid.UUID]] = None,
+        include_output: bool = True,
+    ) -> List[Prediction]:
+        """Keyset page using the stored session; every page is one index range scan of `limit` rows."""
+        stmt = select(PredictionDB).where(PredictionDB.user_id == user_id)
+        if after is not None:
+            stmt = stmt.where(tuple_(PredictionDB.timestamp, PredictionDB.id) < tuple_(*after))
+        if not include_output:
+            stmt = stmt.options(defer(PredictionDB.output_data))
+        stmt = stmt.order_by(PredictionDB.timestamp.desc(), PredictionDB.id.desc()).limit(limit)
+        result = await self.session.execute(stmt)
+        return [self._to_entity(db_pred, include_output=include_output) for db_pred in result.scalars().all()]
+
+    async def stream_rows(
+        self,
+        user_id: Optional[uuid.UUID] = None,
+        since: Optional[datetime.datetime] = None,
+        until: Optional[datetime.datetime] = None,
+        model_name: Optional[str] = None,
+        status: Optional[str] = None,
+        include_output: bool = True,
+        batch_size: int = 1000,
+    ) -> AsyncIterator[Dict[str, Any]]:
+        """Streams plain column rows (no ORM objects) with yield_per using the stored session."""
+        columns = [
+            PredictionDB.id, PredictionDB.user_id, PredictionDB.model_name, PredictionDB.timestamp,
+            PredictionDB.status, PredictionDB.cost_charged, PredictionDB.error_message, PredictionDB.input_data,
+        ]
+        if include_output:
+            columns.append(PredictionDB.output_data)
+        stmt = select(*columns)
+        if user_id is not None:
+            stmt = stmt.where(PredictionDB.user_id == user_id)
+        if since is not None:
+            stmt = stmt.where(PredictionDB.timestamp >= since)
+        if until is not None:
+            stmt = stmt.where(PredictionDB.timestamp < until)
+        if model_name is not None:
+            stmt = stmt.where(PredictionDB.model_name == model_name)
+        if status is not None:
+            stmt = stmt.where(PredictionDB.status == status)
+        stmt = stmt.order_by(PredictionDB.timestamp, PredictionDB.id).execution_options(yield_per=batch_size)
+
+        result = await self.session.stream(stmt)
+        async for row in result.mappings():
+            yield dict(row)
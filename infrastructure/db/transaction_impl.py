@@ -0,0 +1,16 @@
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.repositories.transaction import AbstractTransactionManager
+
+
+class SQLAlchemyTransactionManager(AbstractTransactionManager):
+    """Commits the request-scoped session; its connection goes back to the pool until next used."""
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    async def commit(self) -> None:
+        await self.session.commit()
+
+    async def rollback(self) -> None:
+        await self.session.rollback()
@@ -0,0 +1,154 @@
+import uuid
+import datetime
+from typing import Optional
+from sqlalchemy import select, update
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.entities.transcription_job import TranscriptionJob
+from core.repositories.transcription_job_repository import AbstractTranscriptionJobRepository
+from .models import TranscriptionJobDB
+
+
+class SQLAlchemyTranscriptionJobRepository(AbstractTranscriptionJobRepository):
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    def _to_entity(self, db_job: TranscriptionJobDB) -> TranscriptionJob | None:
+        if not db_job:
+            return None
+        return TranscriptionJob(
+            id=db_job.id,
+            user_id=db_job.user_id,
+            model_name=db_job.model_name,
+            audio_path=db_job.audio_path,
+            filename=db_job.filename,
+            content_type=db_job.content_type,
+            size_bytes=db_job.size_bytes,
+            language=db_job.language,
+            task=db_job.task,
+            callback_url=db_job.callback_url,
+            status=db_job.status,
+            attempts=db_job.attempts,
+            run_after=db_job.run_after,
+            prediction_id=db_job.prediction_id,
+            result_text=db_job.result_text,
+            error_message=db_job.error_message,
+            webhook_status=db_job.webhook_status,
+            created_at=db_job.created_at,
+            started_at=db_job.started_at,
+            finished_at=db_job.finished_at,
+        )
+
+    def _to_db_model(self, job: TranscriptionJob) -> TranscriptionJobDB:
+        return TranscriptionJobDB(
+            id=job.id,
+            user_id=job.user_id,
+            model_name=job.model_name,
+            audio_path=job.audio_path,
+            filename=job.filename,
+            content_type=job.content_type,
+            size_bytes=job.size_bytes,
+            language=job.language,
+            task=job.task,
+            callback_url=job.callback_url,
+            status=job.status,
+            attempts=job.attempts,
+            run_after=job.run_after,
+            prediction_id=job.prediction_id,
+            result_text=job.result_text,
+            error_message=job.error_message,
+            webhook_status=job.webhook_status,
+            created_at=job.created_at,
+            started_at=job.started_at,
+            finished_at=job.finished_at,
+        )
+
+    async def add(self, job: TranscriptionJob) -> TranscriptionJob:
+        """Adds a transcription job using the stored session."""
+        self.session.add(self._to_db_model(job))
+        await self.session.flush()
+        return job
+
+    async def get_by_id(self, job_id: uuid.UUID) -> Optional[TranscriptionJob]:
+        """Gets a transcription job by ID using the stored session."""
+        result = await self.session.execute(select(TranscriptionJobDB).filter(TranscriptionJobDB.id == job_id))
+        return self._to_entity(result.scalars().first())
+
+    async def claim(self, now: datetime.datetime, lease_until: datetime.datetime) -> Optional[TranscriptionJob]:
+        """
+        One statement: the subquery locks the oldest due row, skipping rows other workers
+        have locked, and the UPDATE leases it. The caller commits right away to release the lock.
+        """
+        due = (
+            select(TranscriptionJobDB.id)
+            .where(TranscriptionJobDB.status.in_(("queued", "running")), TranscriptionJobDB.run_after <= now)
+            .order_by(TranscriptionJobDB.run_after)
+            .limit(1)
+            .with_for_update(skip_locked=True)
+            .scalar_subquery()
+        )
+        stmt = (
+            update(TranscriptionJobDB)
+            .where(TranscriptionJobDB.id == due)
+            .values(
+                status="running",
+                attempts=TranscriptionJobDB.attempts + 1,
+                run_after=lease_until,
+                started_at=now,
+            )
+            .returning(TranscriptionJobDB)
+        )
+        result = await self.session.execute(stmt)
+        return self._to_entity(result.scalars().first())
+
+    async def finish(
+        self,
+        job_id: uuid.UUID,
+        attempt: int,
+        status: str,
+        prediction_id: Optional[uuid.UUID] = None,
+        result_text: Optional[str] = None,
+        error_message: Optional[str] = None,
+    ) -> Optional[TranscriptionJob]:
+        stmt = (
+            update(TranscriptionJobDB)
+            .where(
+                TranscriptionJobDB.id == job_id,
+                TranscriptionJobDB.status == "running",
+                TranscriptionJobDB.attempts == attempt,
+            )
+            .values(
+                status=status,
+                prediction_id=prediction_id,
+                result_text=result_text,
+                error_message=error_message,
+                finished_at=datetime.datetime.now(datetime.timezone.utc),
+            )
+            .returning(TranscriptionJobDB)
+        )
+        result = await self.session.execute(stmt)
+        return self._to_entity(result.scalars().first())
+
+    async def requeue(
+        self, job_id: uuid.UUID, attempt: int, run_after: datetime.datetime, error_message: Optional[str] = None, count_attempt: bool = True
+    ) -> bool:
+        values = {"status": "queued", "run_after": run_after, "error_message": error_message}
+        if not count_attempt:
+            values["attempts"] = TranscriptionJobDB.attempts - 1
+        stmt = (
+            update(TranscriptionJobDB)
+            .where(
+                TranscriptionJobDB.id == job_id,
+                TranscriptionJobDB.status == "running",
+                TranscriptionJobDB.attempts == attempt,
+            )
+            .values(**values)
+        )
+        result = await self.session.execute(stmt)
+        return result.rowcount == 1
+
+    async def set_webhook_status(self, job_id: uuid.UUID, webhook_status: str) -> None:
+        await self.session.execute(
+            update(TranscriptionJobDB).where(TranscriptionJobDB.id == job_id).values(webhook_status=webhook_status)
+        )
@@ -0,0 +1,78 @@
+import uuid
+import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from sqlalchemy import select
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.entities.prediction import Prediction
+from core.entities.usage_rollup import UsageRollup
+from core.repositories.usage_repository import AbstractUsageRepository
+from .models import UsageRollupDB
+
+
+class SQLAlchemyUsageRepository(AbstractUsageRepository):
+
+    def __init__(self, session: AsyncSession):
+        self.session = session
+
+    def _to_entity(self, db_rollup: UsageRollupDB) -> UsageRollup | None:
+        if not db_rollup:
+            return None
+        return UsageRollup(
+            user_id=db_rollup.user_id,
+            model_name=db_rollup.model_name,
+            day=db_rollup.day,
+            request_count=db_rollup.request_count,
+            success_count=db_rollup.success_count,
+            failed_count=db_rollup.failed_count,
+            credits_charged=db_rollup.credits_charged,
+            audio_seconds=db_rollup.audio_seconds,
+        )
+
+    async def record(self, prediction: Prediction, audio_seconds: float = 0.0) -> None:
+        await self.record_many([(prediction, audio_seconds)])
+
+    async def record_many(self, items: List[Tuple[Prediction, float]]) -> None:
+        """Folds the predictions into one row per (user, model, day) and upserts them in one statement."""
+        rows: Dict[Tuple[uuid.UUID, str, datetime.date], Dict[str, Any]] = {}
+        for prediction, audio_seconds in items:
+            day = prediction.timestamp.astimezone(datetime.timezone.utc).date()
+            row = rows.setdefault((prediction.user_id, prediction.model_name, day), {
+                "user_id": prediction.user_id, "model_name": prediction.model_name, "day": day,
+                "request_count": 0, "success_count": 0, "failed_count": 0,
+                "credits_charged": 0, "audio_seconds": 0.0,
+            })
+            success = 1 if prediction.status == "success" else 0
+            row["request_count"] += 1
+            row["success_count"] += success
+            row["failed_count"] += 1 - success
+            row["credits_charged"] += prediction.cost_charged
+            row["audio_seconds"] += audio_seconds
+        if not rows:
+            return
+
+        stmt = insert(UsageRollupDB).values(list(rows.values()))
+        stmt = stmt.on_conflict_do_update(
+            index_elements=[UsageRollupDB.user_id, UsageRollupDB.model_name, UsageRollupDB.day],
+            set_={
+                "request_count": UsageRollupDB.request_count + stmt.excluded.request_count,
+                "success_count": UsageRollupDB.success_count + stmt.excluded.success_count,
+                "failed_count": UsageRollupDB.failed_count + stmt.excluded.failed_count,
+                "credits_charged": UsageRollupDB.credits_charged + stmt.excluded.credits_charged,
+                "audio_seconds": UsageRollupDB.audio_seconds + stmt.excluded.audio_seconds,
+            },
+        )
+        await self.session.execute(stmt)
+
+    async def get_by_user_id(
+        self, user_id: uuid.UUID, since: Optional[datetime.date] = None, until: Optional[datetime.date] = None
+    ) -> List[UsageRollup]:
+        stmt = select(UsageRollupDB).where(UsageRollupDB.user_id == user_id)
+        if since is not None:
+            stmt = stmt.where(UsageRollupDB.day >= since)
+        if until is not None:
+            stmt = stmt.where(UsageRollupDB.day < until)
+        stmt = stmt.order_by(UsageRollupDB.day, UsageRollupDB.model_name)
+        result = await self.session.execute(stmt)
+        return [self._to_entity(db_rollup) for db_rollup in result.scalars().all()]
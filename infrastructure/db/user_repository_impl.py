@@ -1,6 +1,6 @@
 import uuid
 from typing import Optional
-from sqlalchemy import select
+from sqlalchemy import select, update
 from sqlalchemy.ext.asyncio import AsyncSession  # Keep import here
 
 from core.entities.user import User
@@ -80,3 +80,20 @@ class SQLAlchemyUserRepository(AbstractUserRepository):
             # No refresh needed typically unless reading back immediately within same complex logic block
             return self._to_entity(db_user)
         return None
+
+    async def set_active(self, user_id: uuid.UUID, is_active: bool) -> Optional[User]:
+        """Activates or deactivates a user using the stored session."""
+        stmt = select(UserDB).where(UserDB.id == user_id)
+        result = await self.session.execute(stmt)
+        db_user = result.scalar_one_or_none()
+
+        if db_user:
+            db_user.is_active = is_active
+            await self.session.flush()
+            return self._to_entity(db_user)
+        return None
+
+    async def update_password_hash(self, user_id: uuid.UUID, hashed_password: str) -> None:
+        """Replaces the stored password hash using the stored session."""
+        stmt = update(UserDB).where(UserDB.id == user_id).values(hashed_password=hashed_password)
+        await self.session.execute(stmt)
@@ -0,0 +1,278 @@
+import asyncio
+import hashlib
+import logging
+import math
+import time
+from collections import deque
+from contextlib import asynccontextmanager
+from typing import Any, AsyncIterator, Deque, Dict, Iterable, List, Optional, Set
+
+import httpx
+
+from config.settings import settings
+from core.repositories.prediction_repository import PredictionServiceUnavailableError
+
+logger = logging.getLogger(__name__)
+
+
+def is_replica_failure(exc: BaseException) -> bool:
+    """Errors that say something about the replica (counted by its breaker), as opposed to a bad request."""
+    if isinstance(exc, httpx.HTTPStatusError):
+        return exc.response.status_code >= 500 or exc.response.status_code == 429
+    # PoolTimeout is local: waiting for one of our own connections says nothing about the replica
+    return isinstance(exc, httpx.TransportError) and not isinstance(exc, httpx.PoolTimeout)
+
+
+class CircuitBreaker:
+    """
+    closed -> open after `failure_threshold` consecutive failures; open rejects immediately for
+    `open_sec`; then half-open lets a single probe through, which closes or re-opens the circuit.
+    """
+
+    CLOSED = "closed"
+    OPEN = "open"
+    HALF_OPEN = "half_open"
+
+    def __init__(self, failure_threshold: int, open_sec: float):
+        self.failure_threshold = max(1, failure_threshold)
+        self.open_sec = open_sec
+        self._state = self.CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self.times_opened = 0
+        self.rejected = 0
+        self._probe_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self._state == self.OPEN and time.monotonic() - self.opened_at >= self.open_sec:
+            self._state = self.HALF_OPEN
+        return self._state
+
+    def allows_request(self) -> bool:
+        state = self.state
+        return state == self.CLOSED or (state == self.HALF_OPEN and not self._probe_in_flight)
+
+    def retry_after(self) -> float:
+        return max(0.0, self.opened_at + self.open_sec - time.monotonic())
+
+    def on_attempt(self) -> bool:
+        """Returns whether this attempt is the half-open probe; pass that on to on_done()."""
+        if self.state == self.HALF_OPEN and not self._probe_in_flight:
+            self._probe_in_flight = True
+            return True
+        return False
+
+    def on_done(self, was_probe: bool) -> None:
+        """
+        Always called when an attempt ends, also when it was cancelled (e.g. a losing hedge).
+        Only the probe itself frees the probe slot; older requests finishing don't.
+        """
+        if was_probe:
+            self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        self.consecutive_failures = 0
+        self._state = self.CLOSED
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        state = self.state
+        if state == self.OPEN:
+            return # late failures of requests started before it opened don't extend the open period
+        if state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            self.times_opened += 1
+            self._state = self.OPEN
+            self.opened_at = time.monotonic()
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "state": self.state,
+            "consecutive_failures": self.consecutive_failures,
+            "times_opened": self.times_opened,
+            "rejected": self.rejected,
+        }
+
+
+class AsrEndpoint:
+    """One ASR replica as seen by this API process."""
+
+    def __init__(self, url: str):
+        self.url = url.rstrip("/")
+        self.healthy = True # optimistic until the first check says otherwise
+        self.outstanding = 0
+        self.requests = 0
+        self.failures = 0
+        self.spillovers = 0 # requests routed here although it isn't a preferred replica for the model
+        self.loaded_models: Set[str] = set() # as reported by the replica's /health
+        self.last_checked: Optional[float] = None
+        self.breaker = CircuitBreaker(settings.ASR_BREAKER_FAILURE_THRESHOLD, settings.ASR_BREAKER_OPEN_SEC)
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "healthy": self.healthy,
+            "outstanding": self.outstanding,
+            "requests": self.requests,
+            "failures": self.failures,
+            "spillovers": self.spillovers,
+            "loaded_models": sorted(self.loaded_models),
+            "breaker": self.breaker.stats(),
+        }
+
+
+class AsrBalancer:
+    """
+    Client-side routing over ASR replicas. Each model name maps to `affinity` preferred
+    replicas by rendezvous hashing, so a replica keeps only its share of models warm and
+    adding/removing a replica only moves that replica's models. Among the preferred replicas
+    the least-outstanding one wins (already-loaded first); when all of them have
+    `max_outstanding` requests in flight the request spills over to the least-loaded healthy
+    replica. Health comes from periodic GET /health checks plus connect failures; replicas
+    whose circuit breaker is open are skipped, and with none left requests fail fast.
+    """
+
+    LATENCY_WINDOW = 200 # successful requests per model kept for the hedge delay
+    LATENCY_MIN_SAMPLES = 20
+
+    def __init__(self, urls: List[str], affinity: int = 2, max_outstanding: int = 8):
+        if not urls:
+            raise ValueError("At least one ASR endpoint is required.")
+        self.endpoints = [AsrEndpoint(url) for url in urls]
+        self.affinity = max(1, affinity)
+        self.max_outstanding = max(1, max_outstanding)
+        self._latencies: Dict[str, Deque[float]] = {}
+        self.retries = 0
+        self.hedges = 0
+        self.hedge_wins = 0
+        self.fast_failures = 0
+
+    @staticmethod
+    def _score(model_name: str, endpoint: AsrEndpoint) -> int:
+        return int.from_bytes(hashlib.blake2b(f"{model_name}|{endpoint.url}".encode(), digest_size=8).digest(), "big")
+
+    def preferred(self, model_name: str) -> List[AsrEndpoint]:
+        """All endpoints in rendezvous order for `model_name`, healthy ones first."""
+        ranked = sorted(self.endpoints, key=lambda e: self._score(model_name, e), reverse=True)
+        return [e for e in ranked if e.healthy] + [e for e in ranked if not e.healthy]
+
+    def choose(self, model_name: str, exclude: Iterable[str] = ()) -> AsrEndpoint:
+        """`exclude` holds URLs already tried for this request; they're only reused if nothing else is left."""
+        ranked = []
+        for endpoint in self.preferred(model_name):
+            if endpoint.breaker.allows_request():
+                ranked.append(endpoint)
+            else:
+                endpoint.breaker.rejected += 1
+        if not ranked:
+            self.fast_failures += 1
+            retry_after = min(e.breaker.retry_after() for e in self.endpoints)
+            raise PredictionServiceUnavailableError(
+                "All ASR replicas are failing, circuit open.", retry_after=max(1, math.ceil(retry_after))
+            )
+        excluded = set(exclude)
+        ranked = [e for e in ranked if e.url not in excluded] or ranked
+        healthy = [e for e in ranked if e.healthy] or ranked # nothing healthy: try anyway
+        candidates = healthy[:self.affinity]
+
+        def load_key(endpoint: AsrEndpoint):
+            return (endpoint.outstanding, model_name not in endpoint.loaded_models)
+
+        available = [e for e in candidates if e.outstanding < self.max_outstanding]
+        if available:
+            return min(available, key=lambda e: (model_name not in e.loaded_models, e.outstanding))
+
+        spill = [e for e in healthy[self.affinity:] if e.outstanding < self.max_outstanding]
+        if spill:
+            chosen = min(spill, key=load_key)
+            chosen.spillovers += 1
+            return chosen
+        return min(candidates, key=load_key) # everything saturated: queue at a preferred replica
+
+    @asynccontextmanager
+    async def acquire(self, model_name: str, exclude: Iterable[str] = ()) -> AsyncIterator[AsrEndpoint]:
+        """
+        Routes one attempt and feeds its outcome to the replica's breaker. The body should
+        call raise_for_status() so 5xx/429 responses count as failures.
+        """
+        endpoint = self.choose(model_name, exclude)
+        is_probe = endpoint.breaker.on_attempt()
+        endpoint.outstanding += 1
+        endpoint.requests += 1
+        started = time.perf_counter()
+        try:
+            yield endpoint
+        except Exception as e:
+            if is_replica_failure(e):
+                endpoint.failures += 1
+                state_before = endpoint.breaker.state
+                endpoint.breaker.record_failure()
+                if state_before != CircuitBreaker.OPEN and endpoint.breaker.state == CircuitBreaker.OPEN:
+                    logger.warning(f"ASR endpoint {endpoint.url} circuit opened after: {e!r}")
+            else:
+                endpoint.breaker.record_success() # the replica answered; the request was the problem
+            if isinstance(e, (httpx.ConnectError, httpx.ConnectTimeout)):
+                endpoint.healthy = False # taken out until the next successful health check
+                logger.warning(f"ASR endpoint {endpoint.url} unreachable, marked unhealthy.")
+            raise
+        else:
+            endpoint.breaker.record_success()
+            self._latencies.setdefault(model_name, deque(maxlen=self.LATENCY_WINDOW)).append(
+                time.perf_counter() - started
+            )
+        finally:
+            endpoint.breaker.on_done(is_probe)
+            endpoint.outstanding -= 1
+
+    def hedge_delay(self, model_name: str) -> Optional[float]:
+        """p95 latency of recent successful requests for the model, or None until there's enough data."""
+        window = self._latencies.get(model_name)
+        if not window or len(window) < self.LATENCY_MIN_SAMPLES:
+            return None
+        ordered = sorted(window)
+        p95 = ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))]
+        return max(settings.ASR_HEDGE_MIN_DELAY_SEC, p95)
+
+    def available_count(self) -> int:
+        return sum(1 for e in self.endpoints if e.healthy and e.breaker.allows_request())
+
+    async def check_health(self, client: httpx.AsyncClient) -> None:
+        async def check(endpoint: AsrEndpoint) -> None:
+            try:
+                response = await client.get(f"{endpoint.url}/health", timeout=settings.ASR_HEALTH_CHECK_TIMEOUT_SEC)
+                response.raise_for_status()
+                endpoint.loaded_models = set((response.json().get("models") or {}).keys())
+                if not endpoint.healthy:
+                    logger.info(f"ASR endpoint {endpoint.url} is healthy again.")
+                endpoint.healthy = True
+            except Exception as e:
+                if endpoint.healthy:
+                    logger.warning(f"ASR endpoint {endpoint.url} failed its health check: {e}")
+                endpoint.healthy = False
+            endpoint.last_checked = time.time()
+
+        await asyncio.gather(*(check(endpoint) for endpoint in self.endpoints))
+
+    async def run_health_checks(self, client: httpx.AsyncClient, interval_sec: float) -> None:
+        """Background loop started from the app lifespan; cancelled on shutdown."""
+        while True:
+            await self.check_health(client)
+            await asyncio.sleep(interval_sec)
+
+    def stats(self) -> Dict[str, Any]:
+        return {endpoint.url: endpoint.stats() for endpoint in self.endpoints}
+
+    def resilience_stats(self) -> Dict[str, Any]:
+        return {
+            "retries": self.retries,
+            "hedges": self.hedges,
+            "hedge_wins": self.hedge_wins,
+            "fast_failures": self.fast_failures,
+            "open_circuits": sum(1 for e in self.endpoints if e.breaker.state != CircuitBreaker.CLOSED),
+        }
+
+
+asr_balancer = AsrBalancer(
+    urls=settings.asr_service_urls,
+    affinity=settings.ASR_MODEL_AFFINITY,
+    max_outstanding=settings.ASR_REPLICA_MAX_OUTSTANDING,
+)
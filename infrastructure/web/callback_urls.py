@@ -0,0 +1,57 @@
+import asyncio
+import socket
+import ipaddress
+from typing import Any, Dict, Tuple
+
+import httpx
+
+from config.settings import settings
+
+
+class UnsafeCallbackUrlError(ValueError):
+    """The callback URL is malformed, not allowed, or resolves to an internal address."""
+
+
+def _allowed_hosts() -> set[str]:
+    return {host.strip().lower() for host in settings.JOB_WEBHOOK_ALLOWED_HOSTS.split(",") if host.strip()}
+
+
+def _is_internal(ip: ipaddress.IPv4Address | ipaddress.IPv6Address) -> bool:
+    if isinstance(ip, ipaddress.IPv6Address) and ip.ipv4_mapped:
+        ip = ip.ipv4_mapped
+    # Covers private, loopback, link-local (incl. 169.254.169.254), shared, reserved and unspecified ranges
+    return not ip.is_global or ip.is_multicast
+
+
+async def resolve_callback_url(url: str) -> Tuple[httpx.URL, Dict[str, str], Dict[str, Any]]:
+    """
+    Resolves a user-supplied callback URL and pins it to the checked address, so DNS can't
+    change between the check and the request. Returns the URL to request plus the Host
+    header and TLS SNI extension that keep the original name. Hosts in
+    JOB_WEBHOOK_ALLOWED_HOSTS are trusted; with the allowlist set, no other host is accepted.
+    """
+    try:
+        parsed = httpx.URL(url)
+    except httpx.InvalidURL as e:
+        raise UnsafeCallbackUrlError(f"Invalid callback URL: {e}")
+    host = parsed.host.lower()
+    if parsed.scheme not in ("http", "https") or not host:
+        raise UnsafeCallbackUrlError("callback_url must be an absolute http(s) URL.")
+    allowed = _allowed_hosts()
+    if allowed and host not in allowed:
+        raise UnsafeCallbackUrlError(f"Callbacks to '{host}' are not allowed.")
+
+    port = parsed.port or (443 if parsed.scheme == "https" else 80)
+    try:
+        infos = await asyncio.get_running_loop().getaddrinfo(host, port, type=socket.SOCK_STREAM)
+    except socket.gaierror as e:
+        raise UnsafeCallbackUrlError(f"Could not resolve callback host '{host}': {e}")
+    addresses = [ipaddress.ip_address(info[4][0].split("%")[0]) for info in infos]
+    if host not in allowed:
+        internal = [ip for ip in addresses if _is_internal(ip)]
+        if internal:
+            raise UnsafeCallbackUrlError(f"Callback host '{host}' resolves to an internal address ({internal[0]}).")
+
+    headers = {"Host": parsed.netloc.decode("ascii")}
+    extensions = {"sni_hostname": host} if parsed.scheme == "https" else {}
+    return parsed.copy_with(host=str(addresses[0])), headers, extensions
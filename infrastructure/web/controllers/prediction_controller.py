@@ -1,18 +1,67 @@
+import os
+import asyncio
+import uuid
+import base64
+import shutil
+import zipfile
+import tempfile
+import mimetypes
 import logging
-from typing import List, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form
+import datetime
+from typing import List, Optional, Tuple
+from fastapi import APIRouter, Depends, HTTPException, status, UploadFile, File, Form, Query, Request, Response
+from fastapi.responses import StreamingResponse
 
 from core.use_cases.prediction_use_cases import PredictionUseCases
-from core.use_cases.user_use_cases import UserUseCases
-from core.entities.user import User as UserEntity
+from core.use_cases.transcription_job_use_cases import TranscriptionJobUseCases
+from core.repositories.user_repository import InsufficientCreditsError
+from core.repositories.prediction_repository import PredictionServiceUnavailableError
+from core.entities.principal import Principal
+from core.entities.audio_input import AudioInput
+from core.entities.transcription_job import TranscriptionJob
 from infrastructure.web.schemas import prediction_schemas
-from infrastructure.web.dependencies.use_cases import get_prediction_use_case, get_user_use_case
+from infrastructure.web.dependencies.use_cases import get_prediction_use_case, get_transcription_job_use_case
 from infrastructure.web.dependencies.auth import get_current_active_user
+from infrastructure.web.dependencies.repositories import open_prediction_repository
+from infrastructure.web.export import iter_ndjson, iter_csv
+from infrastructure.web.callback_urls import UnsafeCallbackUrlError, resolve_callback_url
+from config.settings import settings
 
 logger = logging.getLogger(__name__)
 router = APIRouter(prefix="/predict", tags=["Predictions"], dependencies=[Depends(get_current_active_user)])
 
 
+def _encode_cursor(timestamp: datetime.datetime, prediction_id: uuid.UUID) -> str:
+    return base64.urlsafe_b64encode(f"{timestamp.isoformat()}|{prediction_id}".encode()).decode()
+
+
+def _decode_cursor(cursor: str) -> Tuple[datetime.datetime, uuid.UUID]:
+    try:
+        timestamp, prediction_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.datetime.fromisoformat(timestamp), uuid.UUID(prediction_id)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid cursor.")
+
+
+def _spool_size(file) -> int:
+    file.seek(0, 2)
+    size = file.tell()
+    file.seek(0)
+    return size
+
+
+def _upload_to_audio(upload: UploadFile) -> AudioInput:
+    """Wraps the upload's spool file; nothing is read into memory here."""
+    size = upload.size if upload.size is not None else _spool_size(upload.file)
+    return AudioInput(
+        filename=upload.filename or "uploaded_audio", # Ensure filename is not None
+        content_type=upload.content_type,
+        source=upload.file,
+        size_bytes=size,
+        chunk_size=settings.ASR_UPLOAD_CHUNK_BYTES,
+    )
+
+
 # TODO: fit PredictionRequest
 @router.post(
     "/{db_model}/transcribe",
@@ -24,9 +73,8 @@ async def transcribe_audio_with_model(
     audio_file: UploadFile = File(..., description="The input audio file."),
     language: Optional[str] = Form("ru", description="Optional: Target language code for transcription"),
     task: Optional[str] = Form("transcribe", description="ASR task: 'transcribe' or 'translate' (to English)."),
-    current_user: UserEntity = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
     prediction_use_cases: PredictionUseCases = Depends(get_prediction_use_case),
-    user_use_cases: UserUseCases = Depends(get_user_use_case),
 ):
     """
     Transcribes an uploaded audio file using the specified ASR model.
@@ -39,23 +87,19 @@ async def transcribe_audio_with_model(
         raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid file type. Please upload an audio file (e.g., mp3, wav, m4a).")
 
     try:
-        audio_content = await audio_file.read()
-        if not audio_content:
+        audio = _upload_to_audio(audio_file)
+        if not audio.size_bytes:
             logger.warning(f"Empty audio file uploaded by user '{current_user.username}'")
             raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Audio file cannot be empty.")
 
-        transcribed_text, prediction_db_id, model_identifier_used_str, final_status = await prediction_use_cases.make_prediction(
+        transcribed_text, prediction_db_id, model_identifier_used_str, final_status, updated_credits = await prediction_use_cases.make_prediction(
             user_id=current_user.id,
             model_name=db_model,
-            audio_file_content=audio_content,
-            audio_filename=audio_file.filename or "uploaded_audio", # Ensure filename is not None
-            audio_content_type=audio_file.content_type,
+            audio=audio,
             asr_language_param=language,
             asr_task_param=task
         )
 
-        updated_credits = await user_use_cases.check_user_credits(current_user.id)
-
         response_payload = prediction_schemas.PredictionResponse(
             prediction_id=prediction_db_id,
             model_name=db_model,
@@ -67,6 +111,17 @@ async def transcribe_audio_with_model(
 
         return response_payload
 
+    except HTTPException:
+        raise
+    except InsufficientCreditsError as e:
+        logger.info(f"User '{current_user.username}' has insufficient credits for '{db_model}': {e}")
+        raise HTTPException(status_code=status.HTTP_402_PAYMENT_REQUIRED, detail=str(e))
+    except PredictionServiceUnavailableError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Transcription service is temporarily unavailable, please retry.",
+            headers={"Retry-After": str(e.retry_after)},
+        )
     except Exception as e:
         logger.exception(f"Unexpected controller error for user '{current_user.username}', model '{db_model}'")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="An unexpected internal server error occurred.")
@@ -75,20 +130,247 @@ async def transcribe_audio_with_model(
             await audio_file.close()
 
 
+AUDIO_EXTENSIONS = (".wav", ".mp3", ".m4a", ".flac", ".ogg", ".webm", ".opus", ".aac")
+ZIP_CONTENT_TYPES = ("application/zip", "application/x-zip-compressed")
+
+
+def _is_zip(upload: UploadFile) -> bool:
+    return upload.content_type in ZIP_CONTENT_TYPES or (upload.filename or "").lower().endswith(".zip")
+
+
+def _unpack_zip(upload: UploadFile) -> List[AudioInput]:
+    """
+    Audio members of an uploaded zip archive, each extracted to its own spool file (on disk past 1 MB).
+    Sizes are checked against the limits before extracting and again while copying, since the ones
+    recorded in the archive may lie.
+    """
+    items: List[AudioInput] = []
+    extracted_total = 0
+    try:
+        with zipfile.ZipFile(upload.file) as archive:
+            for member in archive.infolist():
+                if member.is_dir() or not member.filename.lower().endswith(AUDIO_EXTENSIONS):
+                    continue
+                if len(items) >= settings.BATCH_MAX_FILES:
+                    raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"At most {settings.BATCH_MAX_FILES} files per batch.")
+                member_limit = min(settings.BATCH_MAX_MEMBER_BYTES, settings.BATCH_MAX_ARCHIVE_BYTES - extracted_total)
+                if member.file_size > member_limit:
+                    raise _archive_too_large(upload)
+                content_type = mimetypes.guess_type(member.filename)[0] or "application/octet-stream"
+                spool = tempfile.SpooledTemporaryFile(max_size=1024 * 1024)
+                items.append(AudioInput(
+                    filename=member.filename,
+                    content_type=content_type,
+                    source=spool,
+                    size_bytes=member.file_size,
+                    chunk_size=settings.ASR_UPLOAD_CHUNK_BYTES,
+                ))
+                with archive.open(member) as extracted:
+                    while chunk := extracted.read(settings.ASR_UPLOAD_CHUNK_BYTES):
+                        if spool.tell() + len(chunk) > member_limit:
+                            raise _archive_too_large(upload)
+                        spool.write(chunk)
+                extracted_total += spool.tell()
+    except BaseException as e:
+        # The caller only closes the files of archives that were unpacked completely
+        for item in items:
+            item.source.close()
+        if isinstance(e, zipfile.BadZipFile):
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"'{upload.filename}' is not a valid zip archive.")
+        raise
+    return items
+
+
+def _archive_too_large(upload: UploadFile) -> HTTPException:
+    return HTTPException(
+        status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+        detail=f"'{upload.filename}' unpacks to more than {settings.BATCH_MAX_MEMBER_BYTES} bytes per file "
+               f"or {settings.BATCH_MAX_ARCHIVE_BYTES} bytes in total.",
+    )
+
+
+@router.post(
+    "/{db_model}/transcribe/batch",
+    response_model=prediction_schemas.BatchPredictionResponse,
+    description="Transcribe many audio files (or zip archives of them) in one request"
+)
+async def transcribe_batch_with_model(
+    db_model: str,
+    audio_files: List[UploadFile] = File(..., description="Audio files and/or zip archives of audio files."),
+    language: Optional[str] = Form("ru", description="Optional: Target language code for transcription"),
+    task: Optional[str] = Form("transcribe", description="ASR task: 'transcribe' or 'translate' (to English)."),
+    current_user: Principal = Depends(get_current_active_user),
+    prediction_use_cases: PredictionUseCases = Depends(get_prediction_use_case),
+):
+    """
+    Reserves credits for the whole batch once, transcribes with bounded concurrency and
+    returns per-file results. Credits for failed files are refunded.
+    """
+    items: List[AudioInput] = []
+    try:
+        for upload in audio_files:
+            if _is_zip(upload):
+                items.extend(await asyncio.to_thread(_unpack_zip, upload)) # decompression is blocking
+            elif upload.content_type and upload.content_type.startswith("audio/"):
+                audio = _upload_to_audio(upload)
+                if audio.size_bytes:
+                    items.append(audio)
+            else:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"Invalid file type for '{upload.filename}'.")
+            if len(items) > settings.BATCH_MAX_FILES:
+                raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=f"At most {settings.BATCH_MAX_FILES} files per batch.")
+        if not items:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="No audio files in the request.")
+
+        logger.info(f"Controller: batch of {len(items)} files for db_model '{db_model}' by user '{current_user.username}'")
+        results, credits_remaining = await prediction_use_cases.make_batch_prediction(
+            user_id=current_user.id,
+            model_name=db_model,
+            audio_files=items,
+            asr_language_param=language,
+            asr_task_param=task,
+            concurrency=settings.BATCH_ASR_CONCURRENCY,
+        )
+        succeeded = sum(1 for r in results if r["status"] == "success")
+        return prediction_schemas.BatchPredictionResponse(
+            model_name=db_model,
+            succeeded=succeeded,
+            failed=len(results) - succeeded,
+            credits_charged=sum(r["cost_charged"] for r in results),
+            credits_remaining=credits_remaining,
+            items=[prediction_schemas.BatchPredictionItem(**r) for r in results],
+        )
+
+    except HTTPException:
+        raise
+    except InsufficientCreditsError as e:
+        logger.info(f"User '{current_user.username}' has insufficient credits for a batch on '{db_model}': {e}")
+        raise HTTPException(status_code=status.HTTP_402_PAYMENT_REQUIRED, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except Exception as e:
+        logger.exception(f"Unexpected controller error in batch for user '{current_user.username}', model '{db_model}'")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="An unexpected internal server error occurred.")
+    finally:
+        for audio in items:
+            if audio.source not in (upload.file for upload in audio_files):
+                audio.source.close() # spool files extracted from archives
+        for upload in audio_files:
+            await upload.close()
+
+
+def _store_job_audio(upload: UploadFile) -> Tuple[str, int]:
+    """Copies the upload into JOB_AUDIO_DIR, where it waits for a worker. Blocking."""
+    os.makedirs(settings.JOB_AUDIO_DIR, exist_ok=True)
+    path = os.path.join(settings.JOB_AUDIO_DIR, uuid.uuid4().hex)
+    upload.file.seek(0)
+    with open(path, "wb") as target:
+        shutil.copyfileobj(upload.file, target, settings.ASR_UPLOAD_CHUNK_BYTES)
+        size = target.tell()
+    return path, size
+
+
+@router.post(
+    "/{db_model}/jobs",
+    response_model=prediction_schemas.TranscriptionJobRead,
+    status_code=status.HTTP_202_ACCEPTED,
+    description="Queue an audio file for asynchronous transcription"
+)
+async def submit_transcription_job(
+    db_model: str,
+    request: Request,
+    response: Response,
+    audio_file: UploadFile = File(..., description="The input audio file."),
+    language: Optional[str] = Form("ru", description="Optional: Target language code for transcription"),
+    task: Optional[str] = Form("transcribe", description="ASR task: 'transcribe' or 'translate' (to English)."),
+    callback_url: Optional[str] = Form(None, description="Optional: URL that receives a POST with the result when the job finishes."),
+    current_user: Principal = Depends(get_current_active_user),
+    job_use_cases: TranscriptionJobUseCases = Depends(get_transcription_job_use_case),
+):
+    """
+    Returns as soon as the audio is stored and the job queued; poll the Location URL or
+    wait for the callback. Credits are charged when the job completes.
+    """
+    if not audio_file.content_type or not audio_file.content_type.startswith("audio/"):
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Invalid file type. Please upload an audio file (e.g., mp3, wav, m4a).")
+    if callback_url:
+        try:
+            await resolve_callback_url(callback_url) # checked again at delivery, this is for early feedback
+        except UnsafeCallbackUrlError as e:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
+    audio_path = None
+    try:
+        audio_path, size = await asyncio.to_thread(_store_job_audio, audio_file)
+        if not size:
+            raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail="Audio file cannot be empty.")
+        job = await job_use_cases.submit_job(TranscriptionJob(
+            user_id=current_user.id,
+            model_name=db_model,
+            audio_path=audio_path,
+            filename=audio_file.filename or "uploaded_audio",
+            content_type=audio_file.content_type,
+            size_bytes=size,
+            language=language,
+            task=task,
+            callback_url=callback_url,
+        ))
+        audio_path = None # owned by the job now; the worker deletes it
+    except HTTPException:
+        raise
+    except InsufficientCreditsError as e:
+        raise HTTPException(status_code=status.HTTP_402_PAYMENT_REQUIRED, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=str(e))
+    except Exception as e:
+        logger.exception(f"Could not queue a transcription job for user '{current_user.username}', model '{db_model}'")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="An unexpected internal server error occurred.")
+    finally:
+        if audio_path:
+            await asyncio.to_thread(os.remove, audio_path)
+        await audio_file.close()
+
+    response.headers["Location"] = str(request.url_for("get_transcription_job", job_id=job.id))
+    return job
+
+
+@router.get("/jobs/{job_id}", response_model=prediction_schemas.TranscriptionJobRead)
+async def get_transcription_job(
+    job_id: uuid.UUID,
+    current_user: Principal = Depends(get_current_active_user),
+    job_use_cases: TranscriptionJobUseCases = Depends(get_transcription_job_use_case),
+):
+    """ Current state of one of the user's transcription jobs, including the transcript once completed. """
+    job = await job_use_cases.get_job(current_user.id, job_id)
+    if job is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="Job not found")
+    return job
+
+
 @router.get("/history", response_model=List[prediction_schemas.PredictionRecord])
 async def get_prediction_history(
-    current_user: UserEntity = Depends(get_current_active_user),
+    response: Response,
+    current_user: Principal = Depends(get_current_active_user),
     prediction_use_cases: PredictionUseCases = Depends(get_prediction_use_case),
-    limit: int = 100,
-    offset: int = 0
+    limit: int = Query(100, ge=1, le=1000),
+    offset: int = Query(0, ge=0, description="Deprecated: use `cursor`. Deep offsets scan every skipped row."),
+    cursor: Optional[str] = Query(None, description="Opaque cursor from the X-Next-Cursor header of the previous page."),
+    include_output: bool = Query(True, description="Set to false to omit transcripts and return summaries only."),
 ):
     """
-    List information about last `limit` users requests.
+    List information about last `limit` users requests, newest first.
+    When more rows may follow, the X-Next-Cursor response header holds the cursor for the next page.
     """
+    after = _decode_cursor(cursor) if cursor else None
     try:
-        predictions = await prediction_use_cases.get_user_predictions(
-            user_id=current_user.id, limit=limit, offset=offset
-        )
+        if offset and after is None:
+            predictions = await prediction_use_cases.get_user_predictions(
+                user_id=current_user.id, limit=limit, offset=offset
+            )
+        else:
+            predictions = await prediction_use_cases.get_user_predictions_page(
+                user_id=current_user.id, limit=limit, after=after, include_output=include_output
+            )
 
         response_payload = [
             prediction_schemas.PredictionRecord(
@@ -96,7 +378,7 @@ async def get_prediction_history(
                 user_id=predict.user_id,
                 model_name=predict.model_name,
                 input_data=predict.input_data,
-                output_data=predict.output_data,
+                output_data=predict.output_data if include_output else None,
                 timestamp=predict.timestamp,
                 status=predict.status,
                 cost_charged=predict.cost_charged,
@@ -105,7 +387,56 @@ async def get_prediction_history(
             for predict in predictions
         ]
 
+        if len(predictions) == limit:
+            response.headers["X-Next-Cursor"] = _encode_cursor(predictions[-1].timestamp, predictions[-1].id)
         return response_payload
     except Exception as e:
         logger.exception(f"Error retrieving prediction history for user {current_user.id}.")
-        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to retrieve prediction history.")
\ No newline at end of file
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Failed to retrieve prediction history.")
+
+
+EXPORT_FIELDS = [
+    "id", "user_id", "model_name", "timestamp", "status", "cost_charged", "error_message", "input_data", "output_data",
+]
+
+
+@router.get("/export", description="Stream prediction history as NDJSON or CSV")
+async def export_prediction_history(
+    current_user: Principal = Depends(get_current_active_user),
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    since: Optional[datetime.datetime] = Query(None, description="Inclusive lower bound on the prediction timestamp."),
+    until: Optional[datetime.datetime] = Query(None, description="Exclusive upper bound on the prediction timestamp."),
+    model_name: Optional[str] = None,
+    prediction_status: Optional[str] = Query(None, alias="status"),
+    include_output: bool = True,
+    all_users: bool = Query(False, description="Admins only: export every user's predictions."),
+):
+    """
+    Streams matching predictions oldest first straight from a server-side cursor, so memory
+    stays constant however many rows are exported.
+    """
+    if all_users and not current_user.is_admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin privileges required")
+
+    async def rows():
+        async with open_prediction_repository() as repo:
+            async for row in repo.stream_rows(
+                user_id=None if all_users else current_user.id,
+                since=since,
+                until=until,
+                model_name=model_name,
+                status=prediction_status,
+                include_output=include_output,
+            ):
+                yield row
+
+    logger.info(f"Controller: {format} export for user '{current_user.username}' (all_users={all_users})")
+    fields = EXPORT_FIELDS if include_output else EXPORT_FIELDS[:-1]
+    if format == "csv":
+        body, media_type = iter_csv(rows(), fields), "text/csv"
+    else:
+        body, media_type = iter_ndjson(rows()), "application/x-ndjson"
+    filename = f"predictions-{datetime.datetime.now(datetime.timezone.utc):%Y%m%dT%H%M%S}.{format}"
+    return StreamingResponse(
+        body, media_type=media_type, headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
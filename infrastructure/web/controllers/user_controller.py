@@ -1,14 +1,22 @@
 from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordRequestForm
+import uuid
 import logging
+import datetime
+from typing import List, Optional
 
 from core.use_cases.user_use_cases import UserUseCases
-from core.entities.user import User as UserEntity
+from core.use_cases.usage_use_cases import UsageUseCases
+from core.entities.principal import Principal
+from core.repositories.transaction import AbstractTransactionManager
 
 from infrastructure.web.schemas import user_schemas, token_schemas
-from infrastructure.web.dependencies.use_cases import get_user_use_case
-from infrastructure.web.dependencies.auth import get_current_active_user
+from infrastructure.web.dependencies.use_cases import get_user_use_case, get_usage_use_case
+from infrastructure.web.dependencies.repositories import get_transaction_manager
+from infrastructure.web.dependencies.auth import get_current_active_user, get_current_admin_user
 from infrastructure.auth.jwt_handler import jwt_handler
+from infrastructure.auth.principal_cache import principal_cache
+from infrastructure.auth.hashing import HashingBusyError
 
 logger = logging.getLogger(__name__)
 
@@ -33,6 +41,12 @@ async def register_user(
         )
         return user
 
+    except HashingBusyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many concurrent registrations, please retry.",
+            headers={"Retry-After": str(e.retry_after)},
+        )
     except Exception as e:
         logger.exception(f"Error during user registration for {user_data.username}: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Internal server error during registration")
@@ -46,9 +60,16 @@ async def login_for_access_token(
     """
     Authenticate user and return JWT token. Session is managed via injected dependencies.
     """
-    user = await user_use_cases.authenticate_user(
-        username=form_data.username,
-        password=form_data.password,
+    try:
+        user = await user_use_cases.authenticate_user(
+            username=form_data.username,
+            password=form_data.password,
+        )
+    except HashingBusyError as e:
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail="Too many concurrent logins, please retry.",
+            headers={"Retry-After": str(e.retry_after)},
         )
     if not user:
         raise HTTPException(
@@ -65,17 +86,21 @@ async def login_for_access_token(
 
 @router.get("/me", response_model=user_schemas.UserRead)
 async def read_users_me(
-    current_user: UserEntity = Depends(get_current_active_user)
+    current_user: Principal = Depends(get_current_active_user),
+    user_use_cases: UserUseCases = Depends(get_user_use_case)
 ):
     """
     Get current logged-in user's details.
     """
-    return current_user
+    user = await user_use_cases.get_user_by_id(current_user.id)
+    if user is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    return user
 
 
 @router.get("/me/credits", response_model=dict)
 async def get_my_credits(
-    current_user: UserEntity = Depends(get_current_active_user),
+    current_user: Principal = Depends(get_current_active_user),
     user_use_cases: UserUseCases = Depends(get_user_use_case)
 ):
     """ Get the current user's credit balance using Use Case. Session managed implicitly. """
@@ -86,5 +111,62 @@ async def get_my_credits(
         logger.exception(f"Error fetching credits for user {current_user.username}: {e}")
         raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Could not fetch credits.")
 
+
+@router.get("/me/credits/ledger", response_model=List[user_schemas.CreditLedgerRecord])
+async def get_my_credit_ledger(
+    current_user: Principal = Depends(get_current_active_user),
+    user_use_cases: UserUseCases = Depends(get_user_use_case),
+    limit: int = 100,
+    offset: int = 0
+):
+    """ List the current user's credit movements, newest first. """
+    try:
+        return await user_use_cases.get_credit_ledger(current_user.id, limit=limit, offset=offset)
+    except Exception as e:
+        logger.exception(f"Error fetching credit ledger for user {current_user.username}: {e}")
+        raise HTTPException(status_code=status.HTTP_500_INTERNAL_SERVER_ERROR, detail="Could not fetch credit ledger.")
+
+@router.get("/me/usage", response_model=user_schemas.UsageSummary)
+async def get_my_usage(
+    current_user: Principal = Depends(get_current_active_user),
+    usage_use_cases: UsageUseCases = Depends(get_usage_use_case),
+    since: Optional[datetime.date] = None,
+    until: Optional[datetime.date] = None
+):
+    """ Usage per model and UTC day for `since <= day < until`, served from the rollups. """
+    return await usage_use_cases.get_usage_summary(current_user.id, since=since, until=until)
+
+
+@router.get("/{user_id}/usage", response_model=user_schemas.UsageSummary)
+async def get_user_usage(
+    user_id: uuid.UUID,
+    admin: Principal = Depends(get_current_admin_user),
+    usage_use_cases: UsageUseCases = Depends(get_usage_use_case),
+    since: Optional[datetime.date] = None,
+    until: Optional[datetime.date] = None
+):
+    """ Usage summary of any user, e.g. for invoicing. Admin only. """
+    return await usage_use_cases.get_usage_summary(user_id, since=since, until=until)
+
+
+@router.patch("/{user_id}/active", response_model=user_schemas.UserRead)
+async def set_user_active(
+    user_id: uuid.UUID,
+    update: user_schemas.UserActiveUpdate,
+    admin: Principal = Depends(get_current_admin_user),
+    user_use_cases: UserUseCases = Depends(get_user_use_case),
+    tx: AbstractTransactionManager = Depends(get_transaction_manager)
+):
+    """ Activate or deactivate a user. Admin only; takes effect immediately on this process. """
+    try:
+        user = await user_use_cases.set_user_active(user_id, update.is_active)
+    except ValueError:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail="User not found")
+    # Commit before invalidating so a concurrent request can't re-cache the old state
+    await tx.commit()
+    principal_cache.invalidate_user(user_id)
+    logger.info(f"Admin '{admin.username}' set is_active={update.is_active} for user {user_id}")
+    return user
+
 # TODO: Logout endpoint
 # TODO: Replenishment of balance
\ No newline at end of file
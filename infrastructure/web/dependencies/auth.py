@@ -1,20 +1,24 @@
+import uuid
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 
 from infrastructure.auth.jwt_handler import jwt_handler 
+from infrastructure.auth.principal_cache import principal_cache
 from .repositories import get_user_repository
 from core.repositories.user_repository import AbstractUserRepository
-from core.entities.user import User as UserEntity
+from core.entities.principal import Principal
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="/api/v1/users/token")
 
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
     user_repo: AbstractUserRepository = Depends(get_user_repository)
-) -> UserEntity:
+) -> Principal:
     """
-    Dependency to get the current authenticated user from the token.
-    Uses injected repository (which contains the request-scoped session).
+    Dependency to get the current authenticated principal from the token.
+    Served from the principal cache when possible; otherwise loaded by id through the
+    injected repository. FastAPI resolves it once per request even when both the router
+    and the endpoint depend on it.
     """
     credentials_exception = HTTPException(
         status_code=status.HTTP_401_UNAUTHORIZED,
@@ -32,23 +36,35 @@ async def get_current_user(
     if username is None or user_id_str is None:
         raise credentials_exception
 
-    user = await user_repo.get_by_username(username=username)
+    principal = principal_cache.get(token)
+    if principal is None:
+        try:
+            user_id = uuid.UUID(user_id_str)
+        except ValueError:
+            raise credentials_exception
+        user = await user_repo.get_by_id(user_id)
+        if user is None or user.username != username:
+            raise credentials_exception
+        principal = Principal(id=user.id, username=user.username, is_active=user.is_active, is_admin=user.is_admin)
+        principal_cache.put(token, principal, payload.get("exp"))
 
-    if user is None:
-        raise credentials_exception
-    if not user.is_active:
+    if not principal.is_active:
          raise HTTPException(status_code=400, detail="Inactive user")
 
-    if str(user.id) != user_id_str:
-        raise credentials_exception 
-
-    return user
+    return principal
 
 async def get_current_active_user(
-    current_user: UserEntity = Depends(get_current_user)
-) -> UserEntity:
+    current_user: Principal = Depends(get_current_user)
+) -> Principal:
     """
     Dependency wrapper to ensure the user is active (already checked by get_current_user).
     """
     # Check is implicitly done by get_current_user now
     return current_user
+
+async def get_current_admin_user(
+    current_user: Principal = Depends(get_current_active_user)
+) -> Principal:
+    if not current_user.is_admin:
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="Admin privileges required")
+    return current_user
@@ -1,11 +1,112 @@
+import time
 import httpx
-from typing import AsyncGenerator
+from typing import Any, AsyncGenerator, Dict
 import logging
 from config.settings import settings
 
 logger = logging.getLogger(__name__)
 
 _asr_http_client_instance: httpx.AsyncClient | None = None
+_asr_transport: "InstrumentedTransport | None" = None
+
+
+class InstrumentedTransport(httpx.AsyncBaseTransport):
+    """Wraps the pooled transport to count requests in flight and requests that waited for a connection."""
+
+    def __init__(self, transport: httpx.AsyncHTTPTransport, max_connections: int):
+        self._transport = transport
+        self.max_connections = max_connections
+        self.in_flight = 0
+        self.peak_in_flight = 0
+        self.requests = 0
+        self.pool_waits = 0 # requests that started with every connection busy
+        self.errors = 0
+        self._request_sec_total = 0.0
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        if self.in_flight >= self.max_connections:
+            self.pool_waits += 1
+        self.in_flight += 1
+        self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+        self.requests += 1
+        started = time.perf_counter()
+        try:
+            return await self._transport.handle_async_request(request)
+        except Exception:
+            self.errors += 1
+            raise
+        finally:
+            self.in_flight -= 1
+            self._request_sec_total += time.perf_counter() - started
+
+    async def aclose(self) -> None:
+        await self._transport.aclose()
+
+    def stats(self) -> Dict[str, Any]:
+        # httpcore's pool is not public API; report what it exposes, if anything
+        connections = getattr(getattr(self._transport, "_pool", None), "connections", [])
+        idle = sum(1 for c in connections if c.is_idle())
+        return {
+            "max_connections": self.max_connections,
+            "open_connections": len(connections),
+            "idle_connections": idle,
+            "active_connections": len(connections) - idle,
+            "in_flight": self.in_flight,
+            "peak_in_flight": self.peak_in_flight,
+            "requests": self.requests,
+            "pool_waits": self.pool_waits,
+            "errors": self.errors,
+            "avg_request_ms": round(1000 * self._request_sec_total / max(1, self.requests), 2),
+        }
+
+
+def _http2_available() -> bool:
+    try:
+        import h2  # noqa: F401 -- installed with httpx[http2]
+        return True
+    except ImportError:
+        return False
+
+
+def create_asr_http_client() -> httpx.AsyncClient:
+    """Builds the process-wide ASR client; called once from the app lifespan."""
+    global _asr_http_client_instance, _asr_transport
+    http2 = settings.ASR_HTTP2 and _http2_available()
+    if settings.ASR_HTTP2 and not http2:
+        logger.warning("ASR_HTTP2 is set but the 'h2' package is missing; using HTTP/1.1.")
+    limits = httpx.Limits(
+        max_connections=settings.ASR_HTTP_MAX_CONNECTIONS,
+        max_keepalive_connections=settings.ASR_HTTP_MAX_KEEPALIVE_CONNECTIONS,
+        keepalive_expiry=settings.ASR_HTTP_KEEPALIVE_EXPIRY_SEC,
+    )
+    timeout = httpx.Timeout(
+        connect=settings.ASR_CONNECT_TIMEOUT_SEC,
+        read=settings.ASR_REQUEST_TIMEOUT_SEC,
+        write=settings.ASR_REQUEST_TIMEOUT_SEC,
+        pool=settings.ASR_POOL_TIMEOUT_SEC,
+    )
+    _asr_transport = InstrumentedTransport(
+        httpx.AsyncHTTPTransport(limits=limits, http2=http2, retries=0),
+        max_connections=settings.ASR_HTTP_MAX_CONNECTIONS,
+    )
+    _asr_http_client_instance = httpx.AsyncClient(
+        base_url=settings.ASR_SERVICE_URL, transport=_asr_transport, timeout=timeout
+    )
+    logger.info(f"ASR HTTP client created (max_connections={limits.max_connections}, http2={http2}).")
+    return _asr_http_client_instance
+
+
+async def close_asr_http_client() -> None:
+    global _asr_http_client_instance, _asr_transport
+    if _asr_http_client_instance is not None:
+        await _asr_http_client_instance.aclose()
+    _asr_http_client_instance = None
+    _asr_transport = None
+
+
+def asr_http_client_stats() -> Dict[str, Any]:
+    return _asr_transport.stats() if _asr_transport is not None else {}
+
 
 async def get_asr_http_client() -> AsyncGenerator[httpx.AsyncClient, None]:
     """
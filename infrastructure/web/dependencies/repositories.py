@@ -1,3 +1,5 @@
+from contextlib import asynccontextmanager
+from typing import AsyncIterator
 from fastapi import Depends
 from sqlalchemy.ext.asyncio import AsyncSession
 import httpx
@@ -12,18 +14,30 @@ from core.repositories.prediction_repository import (
     AbstractPredictionRepository,
     AbstractPredictionService,
 )
+from core.repositories.credit_hold_repository import AbstractCreditHoldRepository
+from core.repositories.credit_ledger_repository import AbstractCreditLedgerRepository
+from core.repositories.transaction import AbstractTransactionManager
+from core.repositories.usage_repository import AbstractUsageRepository
+from core.repositories.transcription_job_repository import AbstractTranscriptionJobRepository
 
 # Import Concrete Implementations
 from infrastructure.db.user_repository_impl import SQLAlchemyUserRepository
 from infrastructure.db.ml_model_repository_impl import SQLAlchemyMLModelRepository
+from infrastructure.db.model_catalog import CachedMLModelRepository, model_catalog
 from infrastructure.db.prediction_repository_impl import SQLAlchemyPredictionRepository
+from infrastructure.db.credit_hold_repository_impl import SQLAlchemyCreditHoldRepository
+from infrastructure.db.credit_ledger_repository_impl import SQLAlchemyCreditLedgerRepository
+from infrastructure.db.transaction_impl import SQLAlchemyTransactionManager
+from infrastructure.db.usage_repository_impl import SQLAlchemyUsageRepository
+from infrastructure.db.transcription_job_repository_impl import SQLAlchemyTranscriptionJobRepository
 
 from infrastructure.web.prediction_service_impl import HttpServicePrediction, HttpServiceMLModel
-from config.settings import settings
+from infrastructure.web.asr_balancer import asr_balancer
 from .ml_model import get_asr_http_client
 
 # Import session dependency
 from .db import get_db_session
+from infrastructure.db.database import AsyncSessionFactory
 
 # Dependency functions to provide repository instances with injected session
 
@@ -38,8 +52,8 @@ def get_user_repository(
 def get_ml_model_repository(
     session: AsyncSession = Depends(get_db_session),
 ) -> AbstractMLModelRepository:
-    """Provides an ML model repository instance scoped to the request session."""
-    return SQLAlchemyMLModelRepository(session=session)
+    """Provides an ML model repository scoped to the request session, reading through the model catalog."""
+    return CachedMLModelRepository(SQLAlchemyMLModelRepository(session=session), model_catalog)
 
 
 def get_prediction_repository(
@@ -49,13 +63,58 @@ def get_prediction_repository(
     return SQLAlchemyPredictionRepository(session=session)
 
 
+@asynccontextmanager
+async def open_prediction_repository() -> AsyncIterator[AbstractPredictionRepository]:
+    """
+    Prediction repository with its own session, for streaming responses that outlive the
+    request-scoped session (it is closed before the response body is sent).
+    """
+    async with AsyncSessionFactory() as session:
+        yield SQLAlchemyPredictionRepository(session=session)
+
+
+def get_credit_hold_repository(
+    session: AsyncSession = Depends(get_db_session),
+) -> AbstractCreditHoldRepository:
+    """Provides a credit hold repository instance scoped to the request session."""
+    return SQLAlchemyCreditHoldRepository(session=session)
+
+
+def get_credit_ledger_repository(
+    session: AsyncSession = Depends(get_db_session),
+) -> AbstractCreditLedgerRepository:
+    """Provides a credit ledger repository instance scoped to the request session."""
+    return SQLAlchemyCreditLedgerRepository(session=session)
+
+
+def get_usage_repository(
+    session: AsyncSession = Depends(get_db_session),
+) -> AbstractUsageRepository:
+    """Provides a usage rollup repository instance scoped to the request session."""
+    return SQLAlchemyUsageRepository(session=session)
+
+
+def get_transcription_job_repository(
+    session: AsyncSession = Depends(get_db_session),
+) -> AbstractTranscriptionJobRepository:
+    """Provides a transcription job repository instance scoped to the request session."""
+    return SQLAlchemyTranscriptionJobRepository(session=session)
+
+
+def get_transaction_manager(
+    session: AsyncSession = Depends(get_db_session),
+) -> AbstractTransactionManager:
+    """Lets use cases commit the request session early."""
+    return SQLAlchemyTransactionManager(session=session)
+
+
 def get_prediction_service(
     http_client: httpx.AsyncClient = Depends(get_asr_http_client),
 ) -> AbstractPredictionService:
-    return HttpServicePrediction(settings.ASR_SERVICE_URL + "/transcribe", http_client)
+    return HttpServicePrediction(asr_balancer, http_client, "/transcribe")
 
 
 def get_ml_model_service(
     http_client: httpx.AsyncClient = Depends(get_asr_http_client),
 ) -> AbstractMLModelService:
-    return HttpServiceMLModel(settings.ASR_SERVICE_URL + "/models", http_client)
+    return HttpServiceMLModel(asr_balancer, http_client, "/models")
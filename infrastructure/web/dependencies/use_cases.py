@@ -4,22 +4,37 @@ import httpx
 from core.use_cases.user_use_cases import UserUseCases
 from core.use_cases.model_use_cases import ModelUseCases
 from core.use_cases.prediction_use_cases import PredictionUseCases
+from core.use_cases.billing_use_cases import BillingUseCases
+from core.use_cases.usage_use_cases import UsageUseCases
+from core.use_cases.transcription_job_use_cases import TranscriptionJobUseCases
 
 from core.repositories.user_repository import AbstractUserRepository
 from core.repositories.ml_model_repository import AbstractMLModelRepository, AbstractMLModelService
 from core.repositories.prediction_repository import AbstractPredictionRepository, AbstractPredictionService
+from core.repositories.credit_hold_repository import AbstractCreditHoldRepository
+from core.repositories.credit_ledger_repository import AbstractCreditLedgerRepository
+from core.repositories.transaction import AbstractTransactionManager
+from core.repositories.usage_repository import AbstractUsageRepository
+from core.repositories.transcription_job_repository import AbstractTranscriptionJobRepository
+from config.settings import settings
 from .repositories import (
     get_user_repository,
     get_ml_model_repository,
     get_prediction_repository,
     get_prediction_service,
-    get_ml_model_service
+    get_ml_model_service,
+    get_credit_hold_repository,
+    get_credit_ledger_repository,
+    get_transaction_manager,
+    get_usage_repository,
+    get_transcription_job_repository,
 )
 
 def get_user_use_case(
-    user_repo: AbstractUserRepository = Depends(get_user_repository)
+    user_repo: AbstractUserRepository = Depends(get_user_repository),
+    ledger_repo: AbstractCreditLedgerRepository = Depends(get_credit_ledger_repository),
 ) -> UserUseCases:
-    return UserUseCases(user_repo=user_repo)
+    return UserUseCases(user_repo=user_repo, ledger_repo=ledger_repo)
 
 def get_model_use_case(
     model_repo: AbstractMLModelRepository = Depends(get_ml_model_repository),
@@ -27,15 +42,46 @@ def get_model_use_case(
 ) -> ModelUseCases:
     return ModelUseCases(model_repo=model_repo, prediction_service=prediction_service)
 
+def get_billing_use_case(
+    ledger_repo: AbstractCreditLedgerRepository = Depends(get_credit_ledger_repository),
+    hold_repo: AbstractCreditHoldRepository = Depends(get_credit_hold_repository),
+) -> BillingUseCases:
+    return BillingUseCases(ledger_repo=ledger_repo, hold_repo=hold_repo, hold_ttl_sec=settings.CREDIT_HOLD_TTL_SEC)
+
 def get_prediction_use_case(
     user_repo: AbstractUserRepository = Depends(get_user_repository),
     model_repo: AbstractMLModelRepository = Depends(get_ml_model_repository),
     prediction_repo: AbstractPredictionRepository = Depends(get_prediction_repository),
-    prediction_service: AbstractPredictionService = Depends(get_prediction_service) # Use ASR client
+    prediction_service: AbstractPredictionService = Depends(get_prediction_service), # Use ASR client
+    usage_repo: AbstractUsageRepository = Depends(get_usage_repository),
+    billing: BillingUseCases = Depends(get_billing_use_case),
+    tx: AbstractTransactionManager = Depends(get_transaction_manager),
 ) -> PredictionUseCases:
     return PredictionUseCases(
         user_repo=user_repo,
         model_repo=model_repo,
         prediction_repo=prediction_repo,
-        prediction_service=prediction_service
-    )
\ No newline at end of file
+        prediction_service=prediction_service,
+        usage_repo=usage_repo,
+        billing=billing,
+        tx=tx,
+    )
+
+def get_usage_use_case(
+    usage_repo: AbstractUsageRepository = Depends(get_usage_repository)
+) -> UsageUseCases:
+    return UsageUseCases(usage_repo=usage_repo)
+
+def get_transcription_job_use_case(
+    job_repo: AbstractTranscriptionJobRepository = Depends(get_transcription_job_repository),
+    user_repo: AbstractUserRepository = Depends(get_user_repository),
+    model_repo: AbstractMLModelRepository = Depends(get_ml_model_repository),
+    tx: AbstractTransactionManager = Depends(get_transaction_manager),
+) -> TranscriptionJobUseCases:
+    return TranscriptionJobUseCases(
+        job_repo=job_repo,
+        user_repo=user_repo,
+        model_repo=model_repo,
+        tx=tx,
+        max_attempts=settings.JOB_MAX_ATTEMPTS,
+    )
@@ -0,0 +1,47 @@
+import io
+import csv
+import json
+import datetime
+import uuid
+from typing import Any, AsyncIterator, Dict, List
+
+ROWS_PER_CHUNK = 500 # rows serialized into one response body chunk
+
+
+def _json_default(value: Any) -> Any:
+    if isinstance(value, (datetime.datetime, datetime.date)):
+        return value.isoformat()
+    if isinstance(value, uuid.UUID):
+        return str(value)
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+async def iter_ndjson(rows: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[str]:
+    """One JSON object per line, flushed every ROWS_PER_CHUNK rows."""
+    lines: List[str] = []
+    async for row in rows:
+        lines.append(json.dumps(row, default=_json_default, ensure_ascii=False))
+        if len(lines) >= ROWS_PER_CHUNK:
+            yield "\n".join(lines) + "\n"
+            lines = []
+    if lines:
+        yield "\n".join(lines) + "\n"
+
+
+async def iter_csv(rows: AsyncIterator[Dict[str, Any]], fields: List[str]) -> AsyncIterator[str]:
+    """CSV with a header row; dict/list cells (input_data) are written as JSON."""
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=fields, extrasaction="ignore")
+    writer.writeheader()
+    count = 0
+    async for row in rows:
+        writer.writerow({
+            key: json.dumps(value, default=_json_default, ensure_ascii=False) if isinstance(value, (dict, list)) else value
+            for key, value in row.items()
+        })
+        count += 1
+        if count % ROWS_PER_CHUNK == 0:
+            yield buffer.getvalue()
+            buffer.seek(0)
+            buffer.truncate()
+    yield buffer.getvalue()
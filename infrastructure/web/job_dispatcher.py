@@ -0,0 +1,227 @@
+import asyncio
+import hashlib
+import hmac
+import json
+import logging
+import os
+from typing import Any, Dict, Optional
+
+import httpx
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from config.settings import settings
+from core.entities.audio_input import AudioInput
+from core.entities.transcription_job import TranscriptionJob
+from core.use_cases.billing_use_cases import BillingUseCases
+from core.use_cases.prediction_use_cases import PredictionUseCases
+from core.use_cases.transcription_job_use_cases import TranscriptionJobUseCases
+from infrastructure.db.database import AsyncSessionFactory
+from infrastructure.db.credit_hold_repository_impl import SQLAlchemyCreditHoldRepository
+from infrastructure.db.credit_ledger_repository_impl import SQLAlchemyCreditLedgerRepository
+from infrastructure.db.ml_model_repository_impl import SQLAlchemyMLModelRepository
+from infrastructure.db.model_catalog import CachedMLModelRepository, model_catalog
+from infrastructure.db.prediction_repository_impl import SQLAlchemyPredictionRepository
+from infrastructure.db.transaction_impl import SQLAlchemyTransactionManager
+from infrastructure.db.transcription_job_repository_impl import SQLAlchemyTranscriptionJobRepository
+from infrastructure.db.usage_repository_impl import SQLAlchemyUsageRepository
+from infrastructure.db.user_repository_impl import SQLAlchemyUserRepository
+from infrastructure.web.asr_balancer import AsrBalancer, asr_balancer
+from infrastructure.web.callback_urls import UnsafeCallbackUrlError, resolve_callback_url
+from infrastructure.web.prediction_service_impl import HttpServicePrediction
+
+logger = logging.getLogger(__name__)
+
+# A job's lease must outlive its ASR call (plus connect retries), or a second worker would start it too
+JOB_LEASE_SEC = settings.JOB_ASR_TIMEOUT_SEC + 120
+
+
+def _job_use_cases(session: AsyncSession) -> TranscriptionJobUseCases:
+    return TranscriptionJobUseCases(
+        job_repo=SQLAlchemyTranscriptionJobRepository(session=session),
+        user_repo=SQLAlchemyUserRepository(session=session),
+        model_repo=CachedMLModelRepository(SQLAlchemyMLModelRepository(session=session), model_catalog),
+        tx=SQLAlchemyTransactionManager(session=session),
+        max_attempts=settings.JOB_MAX_ATTEMPTS,
+        lease_sec=JOB_LEASE_SEC,
+    )
+
+
+class JobDispatcher:
+    """
+    Runs `workers` coroutines that claim transcription jobs from Postgres and transcribe them
+    one at a time each, so this process never has more than `workers` jobs at the ASR service
+    no matter how many are queued. Claiming pauses while every ASR replica's circuit is open.
+    Jobs survive restarts: an interrupted job is handed back on shutdown, and one whose worker
+    died is claimed again once its lease expires.
+    """
+
+    def __init__(self, balancer: AsrBalancer, workers: int):
+        self.balancer = balancer
+        self.workers = workers
+        self.active = 0
+        self.completed = 0
+        self.failed = 0
+        self.requeued = 0
+        self.webhooks_delivered = 0
+        self.webhooks_failed = 0
+
+    async def _process_one(self, asr_client: httpx.AsyncClient, webhook_client: httpx.AsyncClient) -> bool:
+        """Claims and runs one job. Returns False when the queue had nothing due."""
+        async with AsyncSessionFactory() as session:
+            jobs = _job_use_cases(session)
+            job = await jobs.claim_next_job()
+            if job is None:
+                return False
+            if job.status == "running":
+                prediction_use_cases = PredictionUseCases(
+                    user_repo=jobs.user_repo,
+                    model_repo=jobs.model_repo,
+                    prediction_repo=SQLAlchemyPredictionRepository(session=session),
+                    prediction_service=HttpServicePrediction(
+                        self.balancer,
+                        asr_client,
+                        "/transcribe",
+                        timeout=httpx.Timeout(settings.JOB_ASR_TIMEOUT_SEC, connect=settings.ASR_CONNECT_TIMEOUT_SEC),
+                    ),
+                    usage_repo=SQLAlchemyUsageRepository(session=session),
+                    billing=BillingUseCases(
+                        ledger_repo=SQLAlchemyCreditLedgerRepository(session=session),
+                        hold_repo=SQLAlchemyCreditHoldRepository(session=session),
+                        hold_ttl_sec=JOB_LEASE_SEC,
+                    ),
+                    tx=jobs.tx,
+                )
+                job = await self._run(jobs, job, prediction_use_cases)
+                if job is None or job.status == "queued":
+                    return True
+
+        await asyncio.to_thread(_remove_audio, job.audio_path)
+        if job.status == "completed":
+            self.completed += 1
+        else:
+            self.failed += 1
+        if job.callback_url:
+            delivered = await self._deliver_webhook(webhook_client, job)
+            async with AsyncSessionFactory() as session:
+                await _job_use_cases(session).record_webhook(job.id, delivered)
+        return True
+
+    async def _run(
+        self, jobs: TranscriptionJobUseCases, job: TranscriptionJob, prediction_use_cases: PredictionUseCases
+    ) -> Optional[TranscriptionJob]:
+        try:
+            source = await asyncio.to_thread(open, job.audio_path, "rb")
+        except FileNotFoundError:
+            # Lost its audio, e.g. JOB_AUDIO_DIR isn't shared between the processes running workers
+            logger.error(f"Audio of transcription job {job.id} is missing at {job.audio_path}.")
+            return await jobs.fail_job(job, "Job audio is missing.")
+
+        self.active += 1
+        try:
+            audio = AudioInput(
+                filename=job.filename,
+                content_type=job.content_type,
+                source=source,
+                size_bytes=job.size_bytes,
+                chunk_size=settings.ASR_UPLOAD_CHUNK_BYTES,
+            )
+            job = await jobs.run_job(job, audio, prediction_use_cases)
+            if job is not None and job.status == "queued":
+                self.requeued += 1
+            return job
+        except asyncio.CancelledError:
+            # Shutdown: give the job back right away rather than after its lease (the lifespan
+            # waits for this). A hold taken for it is refunded by the expiry sweeper.
+            await self._release(job)
+            raise
+        finally:
+            self.active -= 1
+            await asyncio.to_thread(source.close)
+
+    async def _release(self, job: TranscriptionJob) -> None:
+        try:
+            async with AsyncSessionFactory() as session:
+                await _job_use_cases(session).release_job(job)
+            logger.info(f"Transcription job {job.id} handed back to the queue.")
+        except Exception:
+            logger.exception(f"Could not hand back transcription job {job.id}; it is retried after its lease.")
+
+    async def _deliver_webhook(self, client: httpx.AsyncClient, job: TranscriptionJob) -> bool:
+        body = json.dumps({
+            "job_id": str(job.id),
+            "status": job.status,
+            "model_name": job.model_name,
+            "prediction_id": str(job.prediction_id) if job.prediction_id else None,
+            "result": job.result_text,
+            "error_message": job.error_message,
+            "finished_at": job.finished_at.isoformat() if job.finished_at else None,
+        }).encode()
+        headers = {"Content-Type": "application/json", "X-Job-Id": str(job.id)}
+        if settings.JOB_WEBHOOK_SECRET:
+            signature = hmac.new(settings.JOB_WEBHOOK_SECRET.encode(), body, hashlib.sha256).hexdigest()
+            headers["X-Webhook-Signature"] = f"sha256={signature}"
+
+        for attempt in range(settings.JOB_WEBHOOK_ATTEMPTS):
+            try:
+                # Re-checked on every delivery: the host's DNS may point somewhere else by now
+                target, host_header, extensions = await resolve_callback_url(job.callback_url)
+            except UnsafeCallbackUrlError as e:
+                logger.warning(f"Webhook for job {job.id} not sent: {e}")
+                break
+            try:
+                response = await client.post(
+                    target, content=body, headers={**headers, **host_header}, extensions=extensions
+                )
+                response.raise_for_status()
+                self.webhooks_delivered += 1
+                return True
+            except httpx.HTTPError as e:
+                logger.warning(f"Webhook for job {job.id} to {job.callback_url} failed (attempt {attempt + 1}): {e!r}")
+                if attempt + 1 < settings.JOB_WEBHOOK_ATTEMPTS:
+                    await asyncio.sleep(2 ** attempt)
+        self.webhooks_failed += 1
+        return False
+
+    async def _worker(self, worker_no: int, asr_client: httpx.AsyncClient, webhook_client: httpx.AsyncClient) -> None:
+        while True:
+            try:
+                if self.balancer.available_count() == 0:
+                    # Every replica is down or its circuit is open: leave jobs queued instead of failing them
+                    await asyncio.sleep(settings.JOB_POLL_INTERVAL_SEC)
+                    continue
+                if not await self._process_one(asr_client, webhook_client):
+                    await asyncio.sleep(settings.JOB_POLL_INTERVAL_SEC)
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                logger.exception(f"Transcription job worker {worker_no} failed")
+                await asyncio.sleep(settings.JOB_POLL_INTERVAL_SEC)
+
+    async def run(self, asr_client: httpx.AsyncClient) -> None:
+        """Background task started from the app lifespan; cancelled on shutdown."""
+        # No redirects: a checked callback host must not bounce the request to an internal one
+        async with httpx.AsyncClient(
+            timeout=settings.JOB_WEBHOOK_TIMEOUT_SEC, follow_redirects=False, trust_env=False
+        ) as webhook_client:
+            await asyncio.gather(*(self._worker(i, asr_client, webhook_client) for i in range(self.workers)))
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "workers": self.workers,
+            "active": self.active,
+            "completed": self.completed,
+            "failed": self.failed,
+            "requeued": self.requeued,
+            "webhooks_delivered": self.webhooks_delivered,
+            "webhooks_failed": self.webhooks_failed,
+        }
+
+
+def _remove_audio(path: str) -> None:
+    try:
+        os.remove(path)
+    except FileNotFoundError:
+        pass
+
+
+job_dispatcher = JobDispatcher(asr_balancer, workers=settings.JOB_WORKERS)
@@ -1,11 +1,22 @@
-from core.repositories.prediction_repository import AbstractPredictionService
+import io
+import math
+import uuid
+import random
+import asyncio
+import logging
+import dataclasses
+from core.repositories.prediction_repository import AbstractPredictionService, PredictionServiceUnavailableError
 from core.repositories.ml_model_repository import AbstractMLModelService
-from typing import Optional, Any
+from core.entities.audio_input import AudioInput
+from typing import AsyncIterator, Dict, Optional, Any, Set
 
 # from ...core.entities.prediction import Prediction
 # from ...core.entities.ml_model import MLModel
 import httpx
 from config.settings import settings
+from infrastructure.web.asr_balancer import AsrBalancer, AsrEndpoint, is_replica_failure
+
+logger = logging.getLogger(__name__)
 
 
 class HttpServiceBase:
@@ -15,11 +26,137 @@ class HttpServiceBase:
         self.client = client
 
 
+async def _multipart_body(
+    boundary: str, fields: Dict[str, str], file_field: str, audio: AudioInput
+) -> AsyncIterator[bytes]:
+    """multipart/form-data body whose file part is streamed chunk by chunk from `audio`."""
+    for name, value in fields.items():
+        yield (
+            f'--{boundary}\r\nContent-Disposition: form-data; name="{name}"\r\n\r\n{value}\r\n'
+        ).encode()
+    filename = audio.filename.replace('"', "%22").replace("\r", "").replace("\n", "")
+    yield (
+        f'--{boundary}\r\nContent-Disposition: form-data; name="{file_field}"; filename="{filename}"\r\n'
+        f"Content-Type: {audio.content_type or 'application/octet-stream'}\r\n\r\n"
+    ).encode()
+    async for chunk in audio.iter_chunks():
+        yield chunk
+    yield f"\r\n--{boundary}--\r\n".encode()
+
+
+def _retry_after(response: Optional[httpx.Response], endpoint: Optional[AsrEndpoint]) -> int:
+    """The replica's Retry-After (seconds form) if it sent one, else how long its circuit stays open."""
+    header = response.headers.get("Retry-After", "") if response is not None else ""
+    if header.strip().isdigit():
+        return max(1, int(header))
+    return max(1, math.ceil(endpoint.breaker.retry_after())) if endpoint is not None else 1
+
+
 class HttpServicePrediction(AbstractPredictionService, HttpServiceBase):
+    """
+    Sends each request to the ASR replica the balancer picks for the model; `path` is appended to its URL.
+
+    Retries (jittered exponential backoff, on another replica) only cover failures where the
+    request never reached a replica, so a transcription is never run twice by accident.
+    With ASR_HEDGE_ENABLED a short clip that is still running after the model's p95 latency
+    is also sent to a second replica, and the first answer wins.
+    """
+
+    # Connection never established: nothing was processed, safe to send again
+    RETRYABLE_ERRORS = (httpx.ConnectError, httpx.ConnectTimeout)
+
+    def __init__(
+        self,
+        balancer: AsrBalancer,
+        client: httpx.AsyncClient,
+        path: str = "/transcribe",
+        timeout: Optional[httpx.Timeout] = None, # overrides the client's, e.g. for long-running jobs
+    ):
+        super().__init__(path, client)
+        self.balancer = balancer
+        self.timeout = timeout
+
+    async def _attempt(self, model_name: str, form_data: Dict[str, str], file: AudioInput, tried: Set[str]) -> dict:
+        # Streamed with chunked transfer encoding: memory per request is one chunk, not the file
+        boundary = uuid.uuid4().hex
+        endpoint = None
+        try:
+            async with self.balancer.acquire(model_name, exclude=tried) as endpoint:
+                tried.add(endpoint.url)
+                response = await self.client.post(
+                    endpoint.url + self.url,
+                    content=_multipart_body(boundary, form_data, "audio_file", file),
+                    headers={"Content-Type": f"multipart/form-data; boundary={boundary}"},
+                    timeout=self.timeout or httpx.USE_CLIENT_DEFAULT,
+                )
+                response.raise_for_status()  # Raises for 4xx/5xx client/server errors; 5xx/429 trip the breaker
+        # The breaker has recorded these by now; callers get an error they can back off on
+        except httpx.HTTPStatusError as e:
+            if not is_replica_failure(e):
+                raise
+            raise PredictionServiceUnavailableError(
+                f"ASR replica {endpoint.url} answered {e.response.status_code}.",
+                retry_after=_retry_after(e.response, endpoint),
+            ) from e
+        except httpx.TimeoutException as e:
+            if isinstance(e, self.RETRYABLE_ERRORS):
+                raise # retried by the caller
+            raise PredictionServiceUnavailableError(
+                f"ASR request timed out: {e!r}", retry_after=_retry_after(None, endpoint)
+            ) from e
+        return response.json()
+
+    async def _attempt_with_retries(self, model_name: str, form_data: Dict[str, str], file: AudioInput, tried: Set[str]) -> dict:
+        for attempt in range(settings.ASR_RETRY_ATTEMPTS + 1):
+            try:
+                return await self._attempt(model_name, form_data, file, tried)
+            except self.RETRYABLE_ERRORS as e:
+                if attempt == settings.ASR_RETRY_ATTEMPTS:
+                    raise PredictionServiceUnavailableError(f"ASR service unreachable: {e!r}") from e
+                # Full jitter keeps concurrent retries from arriving in lockstep
+                delay = random.uniform(0, min(settings.ASR_RETRY_BACKOFF_MAX_SEC, settings.ASR_RETRY_BACKOFF_BASE_SEC * 2 ** attempt))
+                self.balancer.retries += 1
+                logger.info(f"Retrying ASR request for '{model_name}' in {delay:.2f}s after: {e!r}")
+                await asyncio.sleep(delay)
+
+    async def _hedged(self, model_name: str, form_data: Dict[str, str], file: AudioInput, delay: float) -> dict:
+        # Two requests can't share one file position, so each gets its own in-memory copy
+        data = await asyncio.to_thread(lambda: (file.source.seek(0), file.source.read())[1])
+        copies = [dataclasses.replace(file, source=io.BytesIO(data)) for _ in range(2)]
+        tried: Set[str] = set()
+
+        primary = asyncio.create_task(self._attempt_with_retries(model_name, form_data, copies[0], tried))
+        pending = {primary}
+        try:
+            done, pending = await asyncio.wait(pending, timeout=delay)
+            if primary in done:
+                # Finished within the delay: no hedge, its result or error is the answer
+                file.size_bytes, file.sha256 = copies[0].size_bytes, copies[0].sha256
+                return primary.result()
+            self.balancer.hedges += 1
+            pending.add(asyncio.create_task(self._attempt_with_retries(model_name, form_data, copies[1], tried)))
+            error: Optional[BaseException] = None
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        if task is not primary:
+                            self.balancer.hedge_wins += 1
+                        winner = copies[0] if task is primary else copies[1]
+                        file.size_bytes, file.sha256 = winner.size_bytes, winner.sha256
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+            if pending:
+                await asyncio.gather(*pending, return_exceptions=True)
+
     async def get_prediction(
         self,
         model_name,
-        file: bytes,  # TODO: data class
+        file: AudioInput,
         lang: Optional[str] = None,
         task: Optional[str] = None,
     ) -> dict[str:Any]:
@@ -28,26 +165,30 @@ class HttpServicePrediction(AbstractPredictionService, HttpServiceBase):
             form_data["language"] = lang
         if task:
             form_data["task"] = task
-        
-        files_payload = {
-            "audio_file": ("upload.wav", file, "application/octet-stream")
-        }
 
-        response = await self.client.post(
-            self.url,
-            data=form_data,
-            files=files_payload,
-            timeout=settings.ASR_REQUEST_TIMEOUT_SEC,
-        )
+        if (
+            settings.ASR_HEDGE_ENABLED
+            and file.size_bytes is not None
+            and file.size_bytes <= settings.ASR_HEDGE_MAX_BYTES
+            and self.balancer.available_count() > 1
+        ):
+            delay = self.balancer.hedge_delay(model_name)
+            if delay is not None:
+                return await self._hedged(model_name, form_data, file, delay)
 
+        return await self._attempt_with_retries(model_name, form_data, file, set())
 
-        response.raise_for_status()  # Raises for 4xx/5xx client/server errors
-        asr_response_data = response.json()
 
-        return asr_response_data
+class HttpServiceMLModel(AbstractMLModelService, HttpServiceBase):
+    """
+    Registers models on every healthy ASR replica: affinity only decides where a model is
+    normally served, and any replica must be able to take a spilled-over request.
+    """
 
+    def __init__(self, balancer: AsrBalancer, client: httpx.AsyncClient, path: str = "/models"):
+        super().__init__(path, client)
+        self.balancer = balancer
 
-class HttpServiceMLModel(AbstractMLModelService, HttpServiceBase):
     async def upload_model(
         self,
         name: str,
@@ -60,7 +201,12 @@ class HttpServiceMLModel(AbstractMLModelService, HttpServiceBase):
             "model_name": model_name,
         }
 
-        await self.client.post(
-            self.url, json=form_data, timeout=settings.ASR_REQUEST_TIMEOUT_SEC
+        endpoints = [e for e in self.balancer.endpoints if e.healthy] or self.balancer.endpoints
+        results = await asyncio.gather(
+            *(self.client.post(endpoint.url + self.url, json=form_data) for endpoint in endpoints),
+            return_exceptions=True,
         )
+        for endpoint, result in zip(endpoints, results):
+            if isinstance(result, Exception):
+                logger.warning(f"Registering model '{name}' on {endpoint.url} failed: {result}")
         # TODO: return ok request or model or model id ???
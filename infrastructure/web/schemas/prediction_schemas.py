@@ -39,6 +39,49 @@ class PredictionResponse(BaseModel):
     )
 
 
+class BatchPredictionItem(BaseModel):
+    """Outcome of one file in a batch transcription."""
+
+    filename: str
+    prediction_id: uuid.UUID
+    status: str = Field(..., description="'success' or 'failed'")
+    result: Optional[str] = Field(None, description="Transcribed text")
+    cost_charged: int
+    error_message: Optional[str] = None
+
+
+class BatchPredictionResponse(BaseModel):
+    """Response after a batch transcription; failed files are refunded."""
+
+    model_name: str
+    succeeded: int
+    failed: int
+    credits_charged: int
+    credits_remaining: int
+    items: List[BatchPredictionItem]
+
+
+class TranscriptionJobRead(BaseModel):
+    """State of an asynchronous transcription job, as returned on submit and when polling."""
+
+    id: uuid.UUID
+    model_name: str
+    filename: str
+    status: str = Field(..., description="'queued', 'running', 'completed' or 'failed'")
+    attempts: int
+    prediction_id: Optional[uuid.UUID] = None
+    result_text: Optional[str] = Field(None, description="Transcribed text once completed")
+    error_message: Optional[str] = None
+    callback_url: Optional[str] = None
+    webhook_status: Optional[str] = Field(None, description="'delivered' or 'failed' once the callback was attempted")
+    created_at: datetime.datetime
+    started_at: Optional[datetime.datetime] = None
+    finished_at: Optional[datetime.datetime] = None
+
+    class Config:
+        from_attributes = True
+
+
 class PredictionRecord(BaseModel):  # For retrieving history
     id: uuid.UUID
     user_id: uuid.UUID
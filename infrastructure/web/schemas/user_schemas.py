@@ -1,4 +1,6 @@
 import uuid
+import datetime
+from typing import List, Optional
 from pydantic import BaseModel, Field, EmailStr
 
 # Base model for common user fields
@@ -17,3 +19,44 @@ class UserRead(UserBase):
 
     class Config:
         from_attributes = True # Updated from orm_mode=True for Pydantic v2
+
+# Schema for activating/deactivating a user (admin request)
+class UserActiveUpdate(BaseModel):
+    is_active: bool
+
+# Schema for one credit ledger movement (response)
+class CreditLedgerRecord(BaseModel):
+    id: int
+    amount: int
+    kind: str
+    balance_after: int
+    reference_id: Optional[uuid.UUID] = None
+    created_at: datetime.datetime
+
+    class Config:
+        from_attributes = True
+
+# Schema for one (model, day) usage rollup (response)
+class UsageRollupRecord(BaseModel):
+    model_name: str
+    day: datetime.date
+    request_count: int
+    success_count: int
+    failed_count: int
+    credits_charged: int
+    audio_seconds: float
+
+    class Config:
+        from_attributes = True
+
+# Schema for a usage summary over a date range (response)
+class UsageSummary(BaseModel):
+    user_id: uuid.UUID
+    since: Optional[datetime.date] = None
+    until: Optional[datetime.date] = None
+    request_count: int
+    success_count: int
+    failed_count: int
+    credits_charged: int
+    audio_seconds: float
+    days: List[UsageRollupRecord]
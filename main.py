@@ -1,5 +1,6 @@
+import asyncio
 import logging
-from fastapi import FastAPI, Request, status
+from fastapi import Depends, FastAPI, Request, status
 from fastapi.responses import JSONResponse
 from fastapi.exceptions import RequestValidationError
 from contextlib import asynccontextmanager
@@ -7,7 +8,14 @@ from contextlib import asynccontextmanager
 # Routers
 from infrastructure.web.controllers import user_controller, model_controller, prediction_controller
 from infrastructure.web.dependencies.use_cases import get_model_use_case
+from infrastructure.web.dependencies.auth import get_current_admin_user
 from infrastructure.db.database import create_tables
+from infrastructure.db.hold_sweeper import run_hold_sweeper
+from infrastructure.db.model_catalog import refresh_model_catalog, run_catalog_refresher
+from infrastructure.auth.hashing import hashing_executor
+from infrastructure.auth.principal_cache import principal_cache
+from infrastructure.web.asr_balancer import asr_balancer
+from infrastructure.web.job_dispatcher import job_dispatcher
 # Import the module directly to set its global variable
 from infrastructure.web.dependencies import ml_model as http_client_module
 from config.settings import settings
@@ -20,17 +28,30 @@ logger = logging.getLogger(__name__)
 async def lifespan(app: FastAPI):
     logger.info("Main Billing API starting up...")
     logger.info(f"Database URL: {settings.DATABASE_URL}")
-    logger.info(f"ASR Service URL: {settings.ASR_SERVICE_URL}")
+    logger.info(f"ASR Service URLs: {settings.asr_service_urls}")
 
     await create_tables()
     logger.info("Database tables checked/created.")
+    await refresh_model_catalog(force=True)
+    asr_client = http_client_module.create_asr_http_client()
+    background_tasks = [
+        asyncio.create_task(run_hold_sweeper()),
+        asyncio.create_task(run_catalog_refresher()),
+        asyncio.create_task(asr_balancer.run_health_checks(asr_client, settings.ASR_HEALTH_CHECK_INTERVAL_SEC)),
+    ]
+    if settings.JOB_WORKERS > 0:
+        background_tasks.append(asyncio.create_task(job_dispatcher.run(asr_client)))
+        logger.info(f"Started {settings.JOB_WORKERS} transcription job workers.")
     yield
 
     logger.info("Main Billing API shutting down...")
-    if http_client_module._asr_http_client_instance:
-        logger.info("Closing ASR HTTP client...")
-        await http_client_module._asr_http_client_instance.close()
-        logger.info("ASR HTTP client closed.")
+    for task in background_tasks:
+        task.cancel()
+    await asyncio.gather(*background_tasks, return_exceptions=True)
+    hashing_executor.shutdown()
+    logger.info("Closing ASR HTTP client...")
+    await http_client_module.close_asr_http_client()
+    logger.info("ASR HTTP client closed.")
     logger.info("Main Billing API shutdown complete.")
 
 
@@ -66,6 +87,18 @@ app.include_router(prediction_controller.router, prefix=api_prefix)
 async def read_root():
     return {"message": "Welcome to the ML Billing Service API (ASR Enabled)!"}
 
+@app.get("/metrics", tags=["Root"], dependencies=[Depends(get_current_admin_user)])
+async def read_metrics():
+    """ Internal state (replica URLs, breakers, pools, queues); admin only. """
+    return {
+        "password_hashing": hashing_executor.stats(),
+        "principal_cache": principal_cache.stats(),
+        "asr_http_client": http_client_module.asr_http_client_stats(),
+        "asr_endpoints": asr_balancer.stats(),
+        "asr_resilience": asr_balancer.resilience_stats(),
+        "transcription_jobs": job_dispatcher.stats(),
+    }
+
 # For uvicorn reload in development (if not using Docker's CMD reload)
 if __name__ == "__main__":
     import uvicorn
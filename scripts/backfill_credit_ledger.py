@@ -0,0 +1,42 @@
+"""
+Writes an opening 'grant' ledger entry for every user that has a balance but no ledger rows yet,
+so the ledger sums to users.credits for accounts created before the ledger existed.
+
+    python -m scripts.backfill_credit_ledger
+
+Run from the repository root. Safe to re-run: users that already have entries are skipped.
+"""
+import asyncio
+import logging
+
+from sqlalchemy import select, insert, literal, func, exists
+
+from infrastructure.db.database import AsyncSessionFactory, create_tables
+from infrastructure.db.models import UserDB, CreditLedgerDB
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+async def backfill() -> int:
+    await create_tables()
+    async with AsyncSessionFactory() as session:
+        stmt = (
+            insert(CreditLedgerDB)
+            .from_select(
+                ["user_id", "amount", "kind", "balance_after", "created_at"],
+                select(UserDB.id, UserDB.credits, literal("grant"), UserDB.credits, func.now())
+                .where(UserDB.credits != 0)
+                .where(~exists().where(CreditLedgerDB.user_id == UserDB.id)),
+            )
+            .returning(CreditLedgerDB.id)
+        )
+        result = await session.execute(stmt)
+        inserted = len(result.all())
+        await session.commit()
+    return inserted
+
+
+if __name__ == "__main__":
+    count = asyncio.run(backfill())
+    logger.info(f"Wrote opening ledger entries for {count} users.")
@@ -0,0 +1,67 @@
+"""
+Rebuilds usage_rollups from the predictions table.
+
+    python -m scripts.backfill_usage_rollups                      # everything
+    python -m scripts.backfill_usage_rollups --since 2025-01-01   # only days from this date on
+
+Run from the repository root. The rebuilt days are replaced in one transaction while the
+rollup table is locked against concurrent upserts, so predictions recorded meanwhile are
+neither lost nor counted twice. Audio seconds come from input_data.audio_duration_sec,
+which older predictions don't have (they count as 0).
+"""
+import argparse
+import asyncio
+import datetime
+import logging
+
+from sqlalchemy import Date, Float, case, cast, delete, func, insert, select, text
+
+from infrastructure.db.database import AsyncSessionFactory, create_tables
+from infrastructure.db.models import PredictionDB, UsageRollupDB
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+
+async def backfill(since: datetime.date | None) -> int:
+    await create_tables()
+    day = cast(func.timezone("UTC", PredictionDB.timestamp), Date)
+    success = case((PredictionDB.status == "success", 1), else_=0)
+    aggregated = select(
+        PredictionDB.user_id,
+        PredictionDB.model_name,
+        day,
+        func.count(),
+        func.sum(success),
+        func.count() - func.sum(success),
+        func.sum(PredictionDB.cost_charged),
+        func.coalesce(func.sum(cast(PredictionDB.input_data["audio_duration_sec"].as_string(), Float)), 0.0),
+    ).group_by(PredictionDB.user_id, PredictionDB.model_name, day)
+    clear = delete(UsageRollupDB)
+    if since is not None:
+        aggregated = aggregated.where(PredictionDB.timestamp >= datetime.datetime.combine(since, datetime.time(), datetime.timezone.utc))
+        clear = clear.where(UsageRollupDB.day >= since)
+
+    async with AsyncSessionFactory() as session:
+        await session.execute(text("LOCK TABLE usage_rollups IN EXCLUSIVE MODE"))
+        await session.execute(clear)
+        result = await session.execute(
+            insert(UsageRollupDB)
+            .from_select(
+                ["user_id", "model_name", "day", "request_count", "success_count",
+                 "failed_count", "credits_charged", "audio_seconds"],
+                aggregated,
+            )
+            .returning(UsageRollupDB.day)
+        )
+        rows = len(result.all())
+        await session.commit()
+    return rows
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--since", type=datetime.date.fromisoformat, default=None)
+    args = parser.parse_args()
+    count = asyncio.run(backfill(args.since))
+    logger.info(f"Wrote {count} usage rollup rows.")
@@ -0,0 +1,44 @@
+"""
+Adds ix_predictions_user_id_timestamp_id (used by the prediction history pagination) to an
+existing database; create_tables only creates indexes together with new tables.
+
+    python -m scripts.create_prediction_history_index
+
+Run from the repository root. The index is built CONCURRENTLY, so predictions keep being
+written meanwhile. Safe to re-run: an existing index is left alone, and one left invalid by an
+interrupted build is dropped and built again.
+"""
+import asyncio
+import logging
+
+from sqlalchemy import text
+
+from infrastructure.db.database import engine
+
+logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logger = logging.getLogger(__name__)
+
+INDEX_NAME = "ix_predictions_user_id_timestamp_id"
+
+
+async def create_index() -> None:
+    async with engine.connect() as conn:
+        # CREATE INDEX CONCURRENTLY can't run inside a transaction block
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        invalid = await conn.scalar(text(
+            "SELECT NOT i.indisvalid FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid "
+            "WHERE c.relname = :name"
+        ), {"name": INDEX_NAME})
+        if invalid:
+            logger.warning(f"Dropping invalid index {INDEX_NAME} left by an interrupted build.")
+            await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {INDEX_NAME}"))
+        await conn.execute(text(
+            f"CREATE INDEX CONCURRENTLY IF NOT EXISTS {INDEX_NAME} "
+            "ON predictions (user_id, timestamp DESC, id DESC)"
+        ))
+    await engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(create_index())
+    logger.info(f"Index {INDEX_NAME} is in place.")
@@ -0,0 +1,40 @@
+"""Test doubles for the ASR service, shared by the tests and the balancer benchmark."""
+import asyncio
+import random
+from collections import OrderedDict
+
+import httpx
+
+
+class StubReplica:
+    """
+    An in-process ASR replica served through httpx.MockTransport. It keeps at most `warm_models`
+    models loaded (LRU); a request for one it doesn't have pays `cold_sec` on top of `service_sec`.
+    """
+
+    def __init__(self, url: str, warm_models: int, service_sec: float, cold_sec: float):
+        self.url = url
+        self.warm_models = warm_models
+        self.service_sec = service_sec
+        self.cold_sec = cold_sec
+        self.loaded: "OrderedDict[str, None]" = OrderedDict()
+        self.requests = 0
+        self.cold_loads = 0
+
+    async def handle(self, request: httpx.Request) -> httpx.Response:
+        if request.url.path == "/health":
+            return httpx.Response(200, json={"status": "ok", "models": {name: {} for name in self.loaded}})
+        body = await request.aread()
+        model = body.split(b'name="model_identifier"\r\n\r\n', 1)[1].split(b"\r\n", 1)[0].decode()
+        self.requests += 1
+        delay = self.service_sec * random.uniform(0.5, 1.5)
+        if model in self.loaded:
+            self.loaded.move_to_end(model)
+        else:
+            self.cold_loads += 1
+            delay += self.cold_sec
+            self.loaded[model] = None
+            while len(self.loaded) > self.warm_models:
+                self.loaded.popitem(last=False)
+        await asyncio.sleep(delay)
+        return httpx.Response(200, json={"status": "success", "transcribed_text": "ok", "audio_duration_sec": 1.0})
@@ -0,0 +1,93 @@
+import io
+import asyncio
+import random
+
+import httpx
+import pytest
+
+from core.entities.audio_input import AudioInput
+from core.repositories.prediction_repository import PredictionServiceUnavailableError
+from infrastructure.web.asr_balancer import AsrBalancer
+from infrastructure.web.prediction_service_impl import HttpServicePrediction
+from tests.asr_stubs import StubReplica
+
+
+def _replicas(count: int, service_sec: float = 0.002):
+    return {
+        f"http://asr-{i}": StubReplica(f"http://asr-{i}", warm_models=100, service_sec=service_sec, cold_sec=0.01)
+        for i in range(count)
+    }
+
+
+async def _drive(replicas, balancer: AsrBalancer, workload, concurrency: int = 16) -> None:
+    async def route(request: httpx.Request) -> httpx.Response:
+        return await replicas[f"{request.url.scheme}://{request.url.host}"].handle(request)
+
+    async with httpx.AsyncClient(transport=httpx.MockTransport(route)) as client:
+        service = HttpServicePrediction(balancer, client, "/transcribe")
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def one(model: str) -> None:
+            async with semaphore:
+                audio = AudioInput(filename="a.wav", content_type="audio/wav", source=io.BytesIO(b"\0" * 64))
+                await service.get_prediction(model_name=model, file=audio)
+
+        await asyncio.gather(*(one(model) for model in workload))
+
+
+@pytest.fixture(autouse=True)
+def seeded():
+    random.seed(1)
+
+
+def test_affinity_spreads_load_evenly_and_bounds_cold_loads():
+    replicas = _replicas(4)
+    balancer = AsrBalancer(list(replicas), affinity=2, max_outstanding=100)
+    models = [f"model-{i}" for i in range(16)]
+    asyncio.run(_drive(replicas, balancer, models * 25))
+
+    counts = [r.requests for r in replicas.values()]
+    assert sum(counts) == 400
+    assert max(counts) / min(counts) <= 1.75
+    assert sum(r.cold_loads for r in replicas.values()) <= len(models) * balancer.affinity
+    assert sum(e.spillovers for e in balancer.endpoints) == 0
+
+
+def test_saturated_preferred_replica_spills_over():
+    replicas = _replicas(4, service_sec=0.02)
+    balancer = AsrBalancer(list(replicas), affinity=1, max_outstanding=2)
+    preferred = balancer.preferred("model-0")[0]
+    asyncio.run(_drive(replicas, balancer, ["model-0"] * 40, concurrency=8))
+
+    assert sum(e.spillovers for e in balancer.endpoints) > 0
+    assert replicas[preferred.url].requests < 40
+    assert sum(1 for r in replicas.values() if r.requests) > 1
+
+
+def test_unhealthy_preferred_replica_is_routed_around():
+    replicas = _replicas(3)
+    balancer = AsrBalancer(list(replicas), affinity=1, max_outstanding=100)
+    preferred = balancer.preferred("model-0")[0]
+    preferred.healthy = False
+    asyncio.run(_drive(replicas, balancer, ["model-0"] * 20))
+
+    assert replicas[preferred.url].requests == 0
+    assert sum(r.requests for r in replicas.values()) == 20
+
+
+def test_open_circuit_is_routed_around_and_all_open_fails_fast():
+    replicas = _replicas(3)
+    balancer = AsrBalancer(list(replicas), affinity=1, max_outstanding=100)
+    preferred = balancer.preferred("model-0")[0]
+    for _ in range(preferred.breaker.failure_threshold):
+        preferred.breaker.record_failure()
+    asyncio.run(_drive(replicas, balancer, ["model-0"] * 20))
+    assert replicas[preferred.url].requests == 0
+    assert preferred.breaker.rejected > 0
+
+    for endpoint in balancer.endpoints:
+        for _ in range(endpoint.breaker.failure_threshold):
+            endpoint.breaker.record_failure()
+    with pytest.raises(PredictionServiceUnavailableError):
+        asyncio.run(_drive(replicas, balancer, ["model-0"]))
+    assert balancer.fast_failures == 1
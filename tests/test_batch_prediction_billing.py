@@ -0,0 +1,124 @@
+import io
+import uuid
+import asyncio
+import datetime
+from types import SimpleNamespace
+
+from core.entities.audio_input import AudioInput
+from core.repositories.user_repository import InsufficientCreditsError
+from core.use_cases.billing_use_cases import BillingUseCases
+from core.use_cases.prediction_use_cases import PredictionUseCases
+
+
+class FakeLedger:
+    def __init__(self, balance: int):
+        self.balance = balance
+        self.entries = []
+
+    async def charge(self, user_id, amount, reference_id=None):
+        if self.balance < amount:
+            raise InsufficientCreditsError(user_id, amount)
+        self.balance -= amount
+        self.entries.append(("charge", amount, reference_id))
+        return self.balance
+
+    async def credit(self, user_id, amount, kind, reference_id=None):
+        self.balance += amount
+        self.entries.append((kind, amount, reference_id))
+        return self.balance
+
+
+class FakeHolds:
+    def __init__(self):
+        self.holds = {}
+
+    async def add(self, hold):
+        self.holds[hold.id] = hold
+        return hold
+
+    async def transition(self, hold_id, from_status, to_status):
+        hold = self.holds[hold_id]
+        if hold.status != from_status:
+            return False
+        hold.status = to_status
+        return True
+
+    async def expire_overdue(self, now):
+        expired = [h for h in self.holds.values() if h.status == "held" and h.expires_at < now]
+        for hold in expired:
+            hold.status = "expired"
+        return expired
+
+
+class FakeModels:
+    async def get_by_name(self, name):
+        return SimpleNamespace(name=name, cost=2)
+
+
+class FakePredictions:
+    def __init__(self):
+        self.saved = []
+
+    async def add_many(self, predictions):
+        self.saved.extend(predictions)
+
+
+class FakeUsage:
+    async def record_many(self, usage):
+        pass
+
+
+class FakeTx:
+    async def commit(self):
+        pass
+
+    async def rollback(self):
+        pass
+
+
+class SlowAsr:
+    async def get_prediction(self, model_name, file, lang=None, task=None):
+        await asyncio.sleep(0.3)
+        async for _ in file.iter_chunks():
+            pass
+        return {"status": "success", "transcribed_text": "hello", "audio_duration_sec": 1.0}
+
+
+def test_long_batch_is_settled_against_its_hold():
+    """Four rounds of 0.3 s calls outlive the 1 s per-request TTL; the sweeper must not refund the hold meanwhile."""
+    ledger, holds = FakeLedger(balance=100), FakeHolds()
+    billing = BillingUseCases(ledger_repo=ledger, hold_repo=holds, hold_ttl_sec=1)
+    use_cases = PredictionUseCases(
+        user_repo=None,
+        model_repo=FakeModels(),
+        prediction_repo=FakePredictions(),
+        prediction_service=SlowAsr(),
+        usage_repo=FakeUsage(),
+        billing=billing,
+        tx=FakeTx(),
+    )
+    audio = [
+        AudioInput(filename=f"{i}.wav", content_type="audio/wav", source=io.BytesIO(b"audio"), size_bytes=5)
+        for i in range(4)
+    ]
+
+    async def run():
+        async def sweeper():
+            while True:
+                await billing.release_expired_holds()
+                await asyncio.sleep(0.05)
+
+        sweeping = asyncio.create_task(sweeper())
+        try:
+            return await use_cases.make_batch_prediction(uuid.uuid4(), "whisper", audio, concurrency=1)
+        finally:
+            sweeping.cancel()
+
+    results, credits_remaining = asyncio.run(run())
+
+    (hold,) = holds.holds.values()
+    assert hold.status == "captured"
+    assert hold.expires_at - hold.created_at > datetime.timedelta(seconds=3.9)
+    assert [kind for kind, _, _ in ledger.entries] == ["charge"] # no refund, no fallback charge
+    assert all(r["status"] == "success" for r in results)
+    assert credits_remaining == ledger.balance == 92
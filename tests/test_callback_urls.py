@@ -0,0 +1,44 @@
+import asyncio
+
+import httpx
+import pytest
+
+from config.settings import settings
+from infrastructure.web.callback_urls import UnsafeCallbackUrlError, resolve_callback_url
+
+
+def _resolve(url: str):
+    return asyncio.run(resolve_callback_url(url))
+
+
+@pytest.mark.parametrize("url", [
+    "http://127.0.0.1:8000/hook",
+    "http://localhost/hook",
+    "http://169.254.169.254/latest/meta-data/",
+    "http://10.1.2.3/hook",
+    "http://192.168.0.10/hook",
+    "http://[::1]:9000/hook",
+    "http://[::ffff:127.0.0.1]/hook",
+    "http://0.0.0.0/hook",
+    "ftp://93.184.216.34/hook",
+    "/relative/hook",
+])
+def test_internal_or_malformed_callbacks_are_rejected(url):
+    with pytest.raises(UnsafeCallbackUrlError):
+        _resolve(url)
+
+
+def test_public_callback_is_pinned_to_its_address():
+    target, headers, extensions = _resolve("https://93.184.216.34:8443/hook?x=1")
+    assert target == httpx.URL("https://93.184.216.34:8443/hook?x=1")
+    assert headers == {"Host": "93.184.216.34:8443"}
+    assert extensions == {"sni_hostname": "93.184.216.34"}
+
+
+def test_allowlist_restricts_hosts_and_may_admit_internal_ones(monkeypatch):
+    monkeypatch.setattr(settings, "JOB_WEBHOOK_ALLOWED_HOSTS", "localhost")
+    target, headers, _ = _resolve("http://localhost:9000/hook")
+    assert target.host in ("127.0.0.1", "::1")
+    assert headers == {"Host": "localhost:9000"}
+    with pytest.raises(UnsafeCallbackUrlError):
+        _resolve("http://93.184.216.34/hook")
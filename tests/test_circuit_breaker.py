@@ -0,0 +1,91 @@
+import pytest
+
+from infrastructure.web import asr_balancer as balancer_module
+from infrastructure.web.asr_balancer import CircuitBreaker
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(balancer_module.time, "monotonic", clock)
+    return clock
+
+
+def _opened(clock) -> CircuitBreaker:
+    breaker = CircuitBreaker(failure_threshold=3, open_sec=10)
+    for _ in range(3):
+        breaker.record_failure()
+    return breaker
+
+
+def test_opens_after_threshold_consecutive_failures(clock):
+    breaker = CircuitBreaker(failure_threshold=3, open_sec=10)
+    breaker.record_failure()
+    breaker.record_failure()
+    breaker.record_success() # resets the streak
+    breaker.record_failure()
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.allows_request()
+
+    breaker.record_failure()
+    assert breaker.state == CircuitBreaker.OPEN
+    assert not breaker.allows_request()
+    assert breaker.times_opened == 1
+
+
+def test_half_open_after_open_period_and_probe_success_closes(clock):
+    breaker = _opened(clock)
+    clock.now += 9.9
+    assert breaker.state == CircuitBreaker.OPEN
+    clock.now += 0.2
+    assert breaker.state == CircuitBreaker.HALF_OPEN and breaker.allows_request()
+
+    assert breaker.on_attempt() is True
+    assert not breaker.allows_request() # single probe
+    breaker.record_success()
+    breaker.on_done(True)
+    assert breaker.state == CircuitBreaker.CLOSED and breaker.allows_request()
+
+
+def test_probe_failure_reopens(clock):
+    breaker = _opened(clock)
+    clock.now += 10
+    assert breaker.on_attempt() is True
+    breaker.record_failure()
+    breaker.on_done(True)
+    assert breaker.state == CircuitBreaker.OPEN
+    assert breaker.times_opened == 2
+    clock.now += 5
+    assert not breaker.allows_request() # a fresh open period
+
+
+def test_older_request_finishing_does_not_free_the_probe_slot(clock):
+    breaker = CircuitBreaker(failure_threshold=3, open_sec=10)
+    assert breaker.on_attempt() is False # started while closed
+    for _ in range(3):
+        breaker.record_failure()
+    clock.now += 10
+
+    assert breaker.on_attempt() is True # the probe
+    breaker.on_done(False) # the request that began before the circuit opened ends
+    assert not breaker.allows_request()
+    assert breaker.on_attempt() is False
+
+    breaker.on_done(True)
+    assert breaker.allows_request()
+
+
+def test_late_failures_do_not_extend_the_open_period(clock):
+    breaker = _opened(clock)
+    clock.now += 6
+    breaker.record_failure()
+    clock.now += 4
+    assert breaker.state == CircuitBreaker.HALF_OPEN
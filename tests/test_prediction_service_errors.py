@@ -0,0 +1,64 @@
+import io
+import asyncio
+
+import httpx
+import pytest
+
+from core.entities.audio_input import AudioInput
+from core.repositories.prediction_repository import PredictionServiceUnavailableError
+from infrastructure.web.asr_balancer import AsrBalancer
+from infrastructure.web.prediction_service_impl import HttpServicePrediction
+
+
+def _predict(handler, balancer: AsrBalancer):
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            service = HttpServicePrediction(balancer, client, "/transcribe")
+            audio = AudioInput(filename="a.wav", content_type="audio/wav", source=io.BytesIO(b"audio"), size_bytes=5)
+            return await service.get_prediction("whisper", audio)
+
+    return asyncio.run(run())
+
+
+@pytest.fixture
+def balancer() -> AsrBalancer:
+    return AsrBalancer(["http://asr-a:8011"], affinity=1, max_outstanding=8)
+
+
+def test_overloaded_replica_becomes_unavailable_with_its_retry_after(balancer):
+    async def handler(request):
+        await request.aread()
+        return httpx.Response(429, headers={"Retry-After": "7"}, json={"detail": "queue full"})
+
+    with pytest.raises(PredictionServiceUnavailableError) as error:
+        _predict(handler, balancer)
+    assert error.value.retry_after == 7
+
+
+def test_server_error_becomes_unavailable_and_counts_against_the_breaker(balancer):
+    async def handler(request):
+        await request.aread()
+        return httpx.Response(503)
+
+    with pytest.raises(PredictionServiceUnavailableError) as error:
+        _predict(handler, balancer)
+    assert error.value.retry_after >= 1
+    assert balancer.endpoints[0].breaker.consecutive_failures == 1
+
+
+def test_read_timeout_becomes_unavailable(balancer):
+    async def handler(request):
+        raise httpx.ReadTimeout("slow", request=request)
+
+    with pytest.raises(PredictionServiceUnavailableError):
+        _predict(handler, balancer)
+
+
+def test_client_errors_are_not_masked(balancer):
+    async def handler(request):
+        await request.aread()
+        return httpx.Response(400, json={"detail": "bad audio"})
+
+    with pytest.raises(httpx.HTTPStatusError):
+        _predict(handler, balancer)
+    assert balancer.endpoints[0].breaker.consecutive_failures == 0
@@ -0,0 +1,108 @@
+import io
+import asyncio
+from collections import deque
+
+import httpx
+import pytest
+
+from config.settings import settings
+from core.entities.audio_input import AudioInput
+from core.repositories.prediction_repository import PredictionServiceUnavailableError
+from infrastructure.web.asr_balancer import AsrBalancer
+from infrastructure.web.prediction_service_impl import HttpServicePrediction
+
+URLS = ["http://asr-a:8011", "http://asr-b:8011"]
+
+
+def _service(handler) -> HttpServicePrediction:
+    balancer = AsrBalancer(URLS, affinity=2, max_outstanding=8)
+    for _ in range(AsrBalancer.LATENCY_MIN_SAMPLES + 10):
+        balancer._latencies.setdefault("whisper", deque()).append(0.01)
+    client = httpx.AsyncClient(transport=httpx.MockTransport(handler))
+    return HttpServicePrediction(balancer, client, "/transcribe")
+
+
+def _audio() -> AudioInput:
+    return AudioInput(filename="a.wav", content_type="audio/wav", source=io.BytesIO(b"RIFFaudio"), size_bytes=9)
+
+
+@pytest.fixture(autouse=True)
+def hedging_enabled(monkeypatch):
+    monkeypatch.setattr(settings, "ASR_HEDGE_ENABLED", True)
+    monkeypatch.setattr(settings, "ASR_HEDGE_MIN_DELAY_SEC", 0.05)
+
+
+def test_fast_primary_is_returned_without_hedging():
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        return httpx.Response(200, json={"status": "success", "transcribed_text": str(request.url.host)})
+
+    async def run():
+        service = _service(handler)
+        audio = _audio()
+        result = await service.get_prediction("whisper", audio)
+        return service, audio, result
+
+    service, audio, result = asyncio.run(run())
+    assert result["status"] == "success"
+    assert service.balancer.hedges == 0
+    assert audio.size_bytes == 9 and audio.sha256 is not None
+
+
+def test_hedge_wins_when_primary_is_slow():
+    calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        calls.append(request.url.host)
+        if len(calls) == 1:
+            await asyncio.sleep(2) # the primary; cancelled once the hedge answers
+        return httpx.Response(200, json={"status": "success", "transcribed_text": request.url.host})
+
+    async def run():
+        service = _service(handler)
+        result = await service.get_prediction("whisper", _audio())
+        return service, result
+
+    service, result = asyncio.run(run())
+    assert len(calls) == 2 and calls[0] != calls[1] # hedge went to the other replica
+    assert result["transcribed_text"] == calls[1]
+    assert service.balancer.hedges == 1
+    assert service.balancer.hedge_wins == 1
+    assert all(e.outstanding == 0 for e in service.balancer.endpoints)
+
+
+def test_error_is_raised_when_both_attempts_fail():
+    calls = []
+
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        calls.append(request.url.host)
+        if len(calls) == 1:
+            await asyncio.sleep(0.2)
+        return httpx.Response(500, json={"detail": "boom"})
+
+    async def run():
+        service = _service(handler)
+        with pytest.raises(PredictionServiceUnavailableError):
+            await service.get_prediction("whisper", _audio())
+        return service
+
+    service = asyncio.run(run())
+    assert len(calls) == 2
+    assert service.balancer.hedges == 1
+    assert service.balancer.hedge_wins == 0
+
+
+def test_fast_primary_error_is_raised_without_hedging():
+    async def handler(request: httpx.Request) -> httpx.Response:
+        await request.aread()
+        return httpx.Response(500, json={"detail": "boom"})
+
+    async def run():
+        service = _service(handler)
+        with pytest.raises(PredictionServiceUnavailableError):
+            await service.get_prediction("whisper", _audio())
+        return service
+
+    assert asyncio.run(run()).balancer.hedges == 0
@@ -0,0 +1,230 @@
+import io
+import uuid
+import asyncio
+import datetime
+import dataclasses
+from types import SimpleNamespace
+
+import httpx
+
+from core.entities.audio_input import AudioInput
+from core.entities.transcription_job import TranscriptionJob
+from core.repositories.prediction_repository import PredictionServiceUnavailableError
+from core.use_cases.billing_use_cases import BillingUseCases
+from core.use_cases.prediction_use_cases import PredictionUseCases
+from core.use_cases.transcription_job_use_cases import TranscriptionJobUseCases
+from infrastructure.web.asr_balancer import AsrBalancer
+from infrastructure.web.prediction_service_impl import HttpServicePrediction
+
+
+def _now() -> datetime.datetime:
+    return datetime.datetime.now(datetime.timezone.utc)
+
+
+class FakeJobs:
+    """Keeps jobs in memory and, like the SQL repository, only finishes or requeues the attempt that is still running."""
+
+    def __init__(self, *jobs: TranscriptionJob):
+        self.jobs = {job.id: job for job in jobs}
+
+    async def claim(self, now, lease_until):
+        for job in self.jobs.values():
+            if job.status in ("queued", "running") and job.run_after <= now:
+                job.status, job.attempts, job.run_after = "running", job.attempts + 1, lease_until
+                return dataclasses.replace(job)
+        return None
+
+    def _running(self, job_id, attempt):
+        job = self.jobs[job_id]
+        return job if job.status == "running" and job.attempts == attempt else None
+
+    async def finish(self, job_id, attempt, status, prediction_id=None, result_text=None, error_message=None):
+        job = self._running(job_id, attempt)
+        if job is None:
+            return None
+        job.status, job.prediction_id, job.result_text = status, prediction_id, result_text
+        job.error_message, job.finished_at = error_message, _now()
+        return dataclasses.replace(job)
+
+    async def requeue(self, job_id, attempt, run_after, error_message=None, count_attempt=True):
+        job = self._running(job_id, attempt)
+        if job is None:
+            return False
+        job.status, job.run_after, job.error_message = "queued", run_after, error_message
+        if not count_attempt:
+            job.attempts -= 1
+        return True
+
+
+class FakeTx:
+    async def commit(self):
+        pass
+
+    async def rollback(self):
+        pass
+
+
+class StubPredictions:
+    """Stands in for PredictionUseCases: returns or raises whatever it was given."""
+
+    def __init__(self, outcome):
+        self.outcome = outcome
+
+    async def make_prediction(self, **kwargs):
+        if isinstance(self.outcome, Exception):
+            raise self.outcome
+        return self.outcome
+
+
+def _job(**kwargs) -> TranscriptionJob:
+    return TranscriptionJob(user_id=uuid.uuid4(), model_name="whisper", audio_path="/tmp/job.wav", filename="a.wav", **kwargs)
+
+
+def _audio() -> AudioInput:
+    return AudioInput(filename="a.wav", content_type="audio/wav", source=io.BytesIO(b"audio"), size_bytes=5)
+
+
+def _use_cases(repo: FakeJobs, max_attempts: int = 3) -> TranscriptionJobUseCases:
+    return TranscriptionJobUseCases(job_repo=repo, user_repo=None, model_repo=None, tx=FakeTx(), max_attempts=max_attempts)
+
+
+def test_job_out_of_attempts_is_failed_instead_of_run():
+    """A worker died mid-job on every attempt; the next claim must give up rather than start a fourth."""
+    repo = FakeJobs(_job(status="running", attempts=3, run_after=_now() - datetime.timedelta(seconds=1)))
+
+    job = asyncio.run(_use_cases(repo, max_attempts=3).claim_next_job())
+
+    assert job.status == "failed"
+    assert job.attempts == 4
+    assert "Gave up after 3 attempts" in job.error_message
+
+
+def test_unavailable_asr_requeues_until_the_attempt_limit():
+    repo = FakeJobs(_job())
+    jobs = _use_cases(repo, max_attempts=2)
+    busy = StubPredictions(PredictionServiceUnavailableError("all replicas busy", retry_after=0))
+
+    async def run():
+        first = await jobs.run_job(await jobs.claim_next_job(), _audio(), busy)
+        second = await jobs.run_job(await jobs.claim_next_job(), _audio(), busy)
+        return first, second
+
+    first, second = asyncio.run(run())
+
+    assert first.status == "queued"
+    assert second.status == "failed"
+    assert second.attempts == 2
+
+
+def test_stale_attempt_cannot_finish_or_requeue():
+    """The lease ran out and another worker claimed the job: the first worker's outcome must be dropped."""
+    repo = FakeJobs(_job())
+    jobs = _use_cases(repo)
+
+    async def run():
+        stale = await jobs.claim_next_job()
+        repo.jobs[stale.id].run_after = _now() # lease expired
+        await jobs.claim_next_job()
+        finished = await jobs.run_job(stale, _audio(), StubPredictions(("hello", uuid.uuid4(), "whisper", "success", 10)))
+        requeued = await jobs.run_job(stale, _audio(), StubPredictions(PredictionServiceUnavailableError("busy")))
+        return stale, finished, requeued
+
+    stale, finished, requeued = asyncio.run(run())
+
+    assert finished is None
+    assert requeued is None
+    current = repo.jobs[stale.id]
+    assert (current.status, current.attempts, current.result_text) == ("running", 2, None)
+
+
+def test_release_hands_the_job_back_without_using_an_attempt():
+    repo = FakeJobs(_job())
+    jobs = _use_cases(repo)
+
+    async def run():
+        await jobs.release_job(await jobs.claim_next_job())
+
+    asyncio.run(run())
+
+    (job,) = repo.jobs.values()
+    assert (job.status, job.attempts) == ("queued", 0)
+    assert job.run_after <= _now()
+
+
+class FakeLedger:
+    def __init__(self, balance: int):
+        self.balance = balance
+
+    async def charge(self, user_id, amount, reference_id=None):
+        self.balance -= amount
+        return self.balance
+
+    async def credit(self, user_id, amount, kind, reference_id=None):
+        self.balance += amount
+        return self.balance
+
+
+class FakeHolds:
+    def __init__(self):
+        self.holds = {}
+
+    async def add(self, hold):
+        self.holds[hold.id] = hold
+        return hold
+
+    async def transition(self, hold_id, from_status, to_status):
+        hold = self.holds[hold_id]
+        if hold.status != from_status:
+            return False
+        hold.status = to_status
+        return True
+
+
+class FakeModels:
+    async def get_by_name(self, name):
+        return SimpleNamespace(name=name, cost=2)
+
+
+class FakePredictions:
+    async def add(self, prediction):
+        return prediction
+
+
+class FakeUsage:
+    async def record(self, prediction, audio_seconds):
+        pass
+
+
+def test_overloaded_asr_requeues_the_job_after_its_retry_after():
+    """A replica's 429 is backpressure, not a failed transcription: the job waits out Retry-After and the hold is refunded."""
+    repo = FakeJobs(_job())
+    jobs = _use_cases(repo)
+    ledger, holds = FakeLedger(balance=10), FakeHolds()
+
+    async def handler(request):
+        await request.aread()
+        return httpx.Response(429, headers={"Retry-After": "30"}, json={"detail": "queue full"})
+
+    async def run():
+        async with httpx.AsyncClient(transport=httpx.MockTransport(handler)) as client:
+            predictions = PredictionUseCases(
+                user_repo=None,
+                model_repo=FakeModels(),
+                prediction_repo=FakePredictions(),
+                prediction_service=HttpServicePrediction(
+                    AsrBalancer(["http://asr-a:8011"], affinity=1, max_outstanding=8), client, "/transcribe"
+                ),
+                usage_repo=FakeUsage(),
+                billing=BillingUseCases(ledger_repo=ledger, hold_repo=holds, hold_ttl_sec=60),
+                tx=FakeTx(),
+            )
+            return await jobs.run_job(await jobs.claim_next_job(), _audio(), predictions)
+
+    started = _now()
+    job = asyncio.run(run())
+
+    assert job.status == "queued"
+    assert (job.attempts, repo.jobs[job.id].status) == (1, "queued")
+    assert datetime.timedelta(seconds=29) < job.run_after - started < datetime.timedelta(seconds=35)
+    assert ledger.balance == 10
+    assert [hold.status for hold in holds.holds.values()] == ["released"]